@@ -1,19 +1,17 @@
-from src.data_loading import load_co2_data, load_gdp_data
-from src.data_cleaning import (
-    coerce_types,
-    filter_time_range,
-    drop_missing_core,
-    retain_countries_with_min_years,
-    merge_datasets
-)
+import time
+from functools import partial
 
-from src.feature_engineering import (
-    add_gdp_growth,
-    add_rolling_features,
-    add_baseline_gdp,
-    add_emission_groups,
-    summarise_country_metrics,
-)
+from src.async_io import BackgroundWriter, write_csv
+from src.backends import get_backend
+from src.data_loading import load_concurrently
+from src.figure_cache import remove_stale_figures
+
+from src.aggregation import aggregate_by_group, membership_from_panel
+from src.data_quality import profile_panel
+from src.granger import granger_causality
+from src.out_of_core import build_features_out_of_core, exceeds_budget
+from src.feature_engineering import summarise_country_metrics
+from src.sharded_features import run_sharded_features
 
 from src.exploratory_analysis import (
     plot_global_trends,
@@ -29,6 +27,11 @@ from src.modelling import (
     summarise_model,
 )
 
+from src.results_store import ResultsStore
+from src.robust_regression import fit_regressions
+from src.sensitivity import run_sensitivity
+from src.structural_breaks import detect_structural_breaks
+
 from src.modelling_visualisations import (
     plot_scatter_with_fit,
     plot_residuals_vs_fitted,
@@ -42,35 +45,137 @@ START_YEAR = 2000
 END_YEAR = 2023
 MIN_YEARS = 20
 
-def main():
-    co2 = load_co2_data("data/raw/owid_co2.csv")
-    gdp = load_gdp_data("data/raw/owid_gdp_per_capita.csv")
+# Execution backend for loading, cleaning and feature engineering ("pandas" or "polars")
+BACKEND = "pandas"
+
+# Processes for country-sharded feature engineering (1 = run the steps in sequence)
+FEATURE_WORKERS = 1
+
+# Monte Carlo draws for the sample-construction sensitivity analysis (0 = skip)
+SENSITIVITY_DRAWS = 0
+
+# Weight column for the World and emission-group trend means (None = equal
+# country weights). The OWID inputs carry no population series; register one
+# with src.indicators and merge it into the panel to use e.g. "population".
+TREND_WEIGHT_COL = None
+
+# Memory budget (MB) for loading, cleaning and feature engineering. When the
+# inputs are projected to need more, the pandas backend switches to chunked,
+# partitioned processing through temporary spill files (None = no budget)
+MEMORY_BUDGET_MB = None
+
+# SQLite store that keeps every run's parameters, inputs and results
+RESULTS_DB = "outputs/results.sqlite"
+CO2_PATH = "data/raw/owid_co2.csv"
+GDP_PATH = "data/raw/owid_gdp_per_capita.csv"
+
+def run_pipeline():
+    timings = {}
+    run_start = time.perf_counter()
+    backend = get_backend(BACKEND)
+
+    budget = MEMORY_BUDGET_MB * 2**20 if MEMORY_BUDGET_MB else None
+    if BACKEND == "pandas" and budget and exceeds_budget([CO2_PATH, GDP_PATH], budget):
+        # Out-of-core: the same steps per iso_code partition, within the budget.
+        # The quality profile is built per partition; the whole merged panel
+        # is only kept when the sensitivity draws need it
+        result = build_features_out_of_core(
+            CO2_PATH,
+            GDP_PATH,
+            budget,
+            start_year=START_YEAR,
+            end_year=END_YEAR,
+            min_years=MIN_YEARS,
+            window=5,
+            baseline_year=2000,
+            n_groups=3,
+            keep_merged=SENSITIVITY_DRAWS > 0,
+        )
+        df, merged, step_rows = result.panel, result.merged, result.step_rows
+        quality = result.quality
+    else:
+        # Read and parse the raw inputs concurrently
+        inputs = load_concurrently(
+            {
+                "co2": partial(backend.load_co2_data, CO2_PATH),
+                "gdp": partial(backend.load_gdp_data, GDP_PATH),
+            }
+        )
+        co2, gdp = inputs["co2"], inputs["gdp"]
+
+        co2 = backend.coerce_types(co2)
+        gdp = backend.coerce_types(gdp)
+
+        co2 = backend.filter_time_range(co2, START_YEAR, END_YEAR)
+        gdp = backend.filter_time_range(gdp, START_YEAR, END_YEAR)
+
+        # Rows left after each cleaning step (CO2 side of the merge), for the quality report
+        step_rows = [("co2_input", len(inputs["co2"]))]
+        step_rows.append(("filter_time_range", len(co2)))
+
+        df = backend.merge_datasets(co2, gdp)
+        step_rows.append(("merge_datasets", len(df)))
+        merged = df
+        df = backend.drop_missing_core(df, ["co2_per_capita", "gdp_per_capita"])
+        step_rows.append(("drop_missing_core", len(df)))
+        df = backend.retain_countries_with_min_years(df, MIN_YEARS)
+        step_rows.append(("retain_countries_with_min_years", len(df)))
+
+        # Feature engineering
+        if FEATURE_WORKERS > 1:
+            df = run_sharded_features(
+                backend.to_pandas(df),
+                n_workers=FEATURE_WORKERS,
+                window=5,
+                baseline_year=2000,
+                n_groups=3,
+            )
+        else:
+            df = backend.add_gdp_growth(df)
+            df = backend.add_rolling_features(df, window=5)
+            df = backend.add_baseline_gdp(df, baseline_year=2000)
+            df = backend.add_emission_groups(df, n_groups=3)
 
-    co2 = coerce_types(co2)
-    gdp = coerce_types(gdp)
+            # Modelling and plotting always work on pandas frames
+            df = backend.to_pandas(df)
 
-    co2 = filter_time_range(co2, START_YEAR, END_YEAR)
-    gdp = filter_time_range(gdp, START_YEAR, END_YEAR)
+        # Coverage, gaps, duplicate keys, missing values and growth outliers of the
+        # merged panel before drop_missing_core / retain_countries_with_min_years
+        # remove them; step_rows gives the share of rows each cleaning step drops
+        quality = profile_panel(backend.to_pandas(merged), step_rows=step_rows)
 
-    df = merge_datasets(co2, gdp)
-    df = drop_missing_core(df, ["co2_per_capita", "gdp_per_capita"])
-    df = retain_countries_with_min_years(df, MIN_YEARS)
+    timings["load_clean_features"] = time.perf_counter() - run_start
 
-    # Feature engineering
-    df = add_gdp_growth(df)
-    df = add_rolling_features(df, window=5)
-    df = add_baseline_gdp(df, baseline_year=2000)
-    df = add_emission_groups(df, n_groups=3)
+    quality.to_json("outputs/tables/data_quality.json")
 
     # Save feature table
-    # df.to_csv("data/processed/panel_features.csv", index=False)
+    # write_csv(df, "data/processed/panel_features.csv")
 
     # Country-level summary for modelling
     country_summary = summarise_country_metrics(df)
-    country_summary.to_csv("data/processed/country_summary.csv", index=False)
+    write_csv(country_summary, "data/processed/country_summary.csv")
 
-    # Exploratory Data Analysis
-    plot_global_trends(df, EDA_DIR)
+    # Yearly World and emission-group means (one sparse product for all groups)
+    group_trends = aggregate_by_group(
+        df,
+        membership_from_panel(df, ["emission_group"]),
+        value_cols=["co2_per_capita", "gdp_per_capita", "gdp_pc_growth"],
+        group_cols=["emission_group"],
+        weight_col=TREND_WEIGHT_COL,
+    )
+    write_csv(group_trends, "outputs/tables/group_trends.csv")
+
+    # Exploratory Data Analysis (global trend figures reuse the World series)
+    if TREND_WEIGHT_COL is None:
+        trend_label = "Mean"
+    else:
+        trend_label = f"{TREND_WEIGHT_COL.replace('_', ' ').capitalize()}-weighted Mean"
+    plot_global_trends(
+        df,
+        EDA_DIR,
+        trends=group_trends[group_trends["grouping"] == "world"],
+        stat_label=trend_label,
+    )
     plot_scatter_co2_vs_gdp(df, EDA_DIR)
     plot_volatility_by_emission_group(df, EDA_DIR)
     plot_country_trajectories(df, ["USA", "CHN"], EDA_DIR)
@@ -80,11 +185,21 @@ def main():
 
     # Country-level dataset for modelling
     country_df = compute_country_level_dataset(df)
-    country_df.to_csv("data/processed/country_level_model_dataset.csv", index=False)
+    write_csv(country_df, "data/processed/country_level_model_dataset.csv")
 
     # Correlation analysis
     corr_df = run_correlations(country_df)
-    corr_df.to_csv("outputs/tables/correlations.csv", index=False)
+    write_csv(corr_df, "outputs/tables/correlations.csv")
+
+    # Structural breaks in GDP growth (one row per iso_code, mergeable into country_df)
+    breaks_df = detect_structural_breaks(df, value_col="gdp_pc_growth", model="mean")
+    write_csv(breaks_df, "outputs/tables/structural_breaks.csv")
+
+    # Does past CO2 per capita help predict GDP growth volatility (and vice versa)?
+    granger_df = granger_causality(
+        df, cause_col="co2_per_capita", effect_col="gdp_growth_volatility_5y", max_lag=3, reverse=True
+    )
+    write_csv(granger_df, "outputs/tables/granger_causality.csv")
 
     # Regression 1: volatility
     vol_model = run_regression(
@@ -93,7 +208,7 @@ def main():
         x_cols=["avg_co2_per_capita", "baseline_gdp_pc"],   
     )
     vol_summary = summarise_model(vol_model)
-    vol_summary.to_csv("outputs/tables/regression_volatility_summary.csv", index=False)
+    write_csv(vol_summary, "outputs/tables/regression_volatility_summary.csv")
 
     # Regression 2: mean growth
     growth_model = run_regression(
@@ -102,12 +217,35 @@ def main():
         x_cols=["avg_co2_per_capita", "baseline_gdp_pc"],
     )
     growth_summary = summarise_model(growth_model)
-    growth_summary.to_csv("outputs/tables/regression_growth_summary.csv", index=False)
+    write_csv(growth_summary, "outputs/tables/regression_growth_summary.csv")
+
+    # Robust covariances, Huber and quantile fits of both models in one batch
+    robust_summary = fit_regressions(
+        country_df,
+        y_cols=["gdp_growth_volatility", "mean_gdp_growth"],
+        x_cols=["avg_co2_per_capita", "baseline_gdp_pc"],
+    )
+    write_csv(robust_summary, "outputs/tables/robust_regressions.csv")
 
     # print(vol_summary)
     # print(growth_summary)
 
-    df.to_csv("data/processed/panel.csv", index=False)
+    # Spread of the coefficients and correlations under imputation,
+    # GDP measurement error and country subsampling
+    if SENSITIVITY_DRAWS > 0:
+        sensitivity = run_sensitivity(
+            backend.to_pandas(merged),
+            n_draws=SENSITIVITY_DRAWS,
+            start_year=START_YEAR,
+            end_year=END_YEAR,
+            min_years=MIN_YEARS,
+            baseline_year=2000,
+        )
+        write_csv(sensitivity.summary, "outputs/tables/sensitivity_summary.csv")
+
+    timings["eda_and_modelling"] = time.perf_counter() - run_start - timings["load_clean_features"]
+
+    write_csv(df, "data/processed/panel.csv")
 
     # 1) Scatter + fit: CO2 vs volatility (controls held at mean)
     plot_scatter_with_fit(
@@ -142,5 +280,39 @@ def main():
         title="Regression Coefficients (Growth Model)",
     )
 
+    timings["total"] = time.perf_counter() - run_start
+
+    # Record the run in one transaction: a failure leaves no partial run
+    # behind, and the connection is closed either way
+    with ResultsStore(RESULTS_DB) as store, store.transaction():
+        run_id = store.start_run(
+            params={
+                "backend": BACKEND,
+                "memory_budget_mb": MEMORY_BUDGET_MB,
+                "start_year": START_YEAR,
+                "end_year": END_YEAR,
+                "min_years": MIN_YEARS,
+                "window": 5,
+                "baseline_year": 2000,
+                "n_groups": 3,
+                "trend_weight_col": TREND_WEIGHT_COL,
+            },
+            input_paths=[CO2_PATH, GDP_PATH],
+        )
+        store.save_correlations(run_id, corr_df)
+        store.save_regression(run_id, "volatility", vol_summary)
+        store.save_regression(run_id, "growth", growth_summary)
+        store.save_country_dataset(run_id, country_df)
+        store.record_timings(run_id, timings)
+
+def main():
+    # Output CSVs and figures are written in the background while the
+    # pipeline keeps computing; leaving the block waits for (and checks) them
+    with BackgroundWriter(max_pending=8):
+        run_pipeline()
+
+    # Delete cached figures this run no longer produces
+    remove_stale_figures(FIG_DIR)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
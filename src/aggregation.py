@@ -0,0 +1,125 @@
+"""
+Regional / group aggregation through a sparse country-to-group membership matrix.
+
+Groupings (continent, income group, emission_group, ...) may overlap and a
+country may belong to several groups within one grouping. All groups of all
+groupings are stacked as rows of one sparse (group x country) 0/1 matrix G.
+With the panel laid out as a dense (country x year*indicator) matrix V and
+weights W, every weighted group series is
+
+    (G @ (W * V)) / (G @ (W * observed))
+
+i.e. two sparse matrix products for all groups, years and indicators.
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def membership_from_panel(df: pd.DataFrame, group_cols: list) -> pd.DataFrame:
+    """
+    One row per iso_code with its (first) label for each grouping column,
+    e.g. emission_group from the feature-engineered panel.
+    """
+    missing = {"iso_code", *group_cols} - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+    return df.groupby("iso_code", as_index=False, observed=True)[list(group_cols)].first()
+
+
+def build_membership_matrix(membership: pd.DataFrame, iso_codes, group_cols: list, include_world: bool = True):
+    """
+    Build the sparse (group x country) membership matrix.
+    membership has an iso_code column plus one column per grouping; repeat
+    an iso_code on several rows to place it in several groups.
+    Countries are ordered as in iso_codes; codes not in iso_codes are ignored.
+    Returns (csr_matrix, groups) where groups lists grouping and group per row.
+    """
+    missing = {"iso_code", *group_cols} - set(membership.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    country_pos = pd.Index(iso_codes).get_indexer(membership["iso_code"])
+    known = country_pos >= 0
+
+    rows, cols, labels = [], [], []
+    if include_world:
+        rows.append(np.zeros(len(iso_codes), dtype=np.int64))
+        cols.append(np.arange(len(iso_codes)))
+        labels.append(("world", "World"))
+
+    for grouping in group_cols:
+        values = membership[grouping].astype(object)
+        ok = known & values.notna().to_numpy()
+        codes, uniques = pd.factorize(values[ok], sort=True)
+        rows.append(codes + len(labels))
+        cols.append(country_pos[ok])
+        labels.extend((grouping, str(u)) for u in uniques)
+
+    rows = np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+    cols = np.concatenate(cols) if cols else np.array([], dtype=np.int64)
+    matrix = sparse.coo_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(len(labels), len(iso_codes))
+    ).tocsr()
+    matrix.data[:] = 1.0  # repeated memberships count once
+
+    groups = pd.DataFrame(labels, columns=["grouping", "group"])
+    return matrix, groups
+
+
+def aggregate_by_group(df: pd.DataFrame, membership: pd.DataFrame, value_cols: list, group_cols: list,
+                       weight_col: str = None, include_world: bool = True) -> pd.DataFrame:
+    """
+    Weighted group means of value_cols for every group and year.
+    weight_col (e.g. population or GDP) defaults to equal weights. For each
+    value, only countries with both the value and its weight observed count.
+    Returns a long table: grouping, group, year, n_countries, *value_cols
+    (n_countries = member countries present in that year).
+    Raises ValueError on duplicate (iso_code, year) rows, which the dense
+    (country x year) layout could only resolve by dropping all but one.
+    """
+    required = {"iso_code", "year", *value_cols} | ({weight_col} if weight_col else set())
+    missing = required - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    country_idx, iso_codes = pd.factorize(df["iso_code"], sort=True)
+    year_idx, years = pd.factorize(df["year"], sort=True)
+    duplicated = pd.MultiIndex.from_arrays([country_idx, year_idx]).duplicated()
+    if duplicated.any():
+        examples = sorted(
+            {(iso_codes[c], years[y]) for c, y in zip(country_idx[duplicated], year_idx[duplicated])}
+        )[:5]
+        raise ValueError(f"Duplicate (iso_code, year) rows: {examples}")
+    n_c, n_y, n_v = len(iso_codes), len(years), len(value_cols)
+
+    matrix, groups = build_membership_matrix(membership, iso_codes, group_cols, include_world=include_world)
+
+    values = np.full((n_c, n_y, n_v), np.nan)
+    values[country_idx, year_idx] = df[list(value_cols)].to_numpy(dtype=np.float64)
+    weights = np.full((n_c, n_y), np.nan)
+    weights[country_idx, year_idx] = df[weight_col].to_numpy(dtype=np.float64) if weight_col else 1.0
+    present = np.zeros((n_c, n_y))
+    present[country_idx, year_idx] = 1.0
+
+    observed = ~np.isnan(values) & ~np.isnan(weights)[:, :, None]
+    weighted = np.where(observed, values * weights[:, :, None], 0.0).reshape(n_c, n_y * n_v)
+    total_weight = np.where(observed, weights[:, :, None], 0.0).reshape(n_c, n_y * n_v)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = (matrix @ weighted) / (matrix @ total_weight)
+    means = means.reshape(-1, n_y, n_v)
+    counts = matrix @ present
+
+    n_g = len(groups)
+    out = pd.DataFrame(
+        {
+            "grouping": np.repeat(groups["grouping"].to_numpy(), n_y),
+            "group": np.repeat(groups["group"].to_numpy(), n_y),
+            "year": np.tile(np.asarray(years), n_g),
+            "n_countries": counts.reshape(-1).astype(int),
+        }
+    )
+    for i, col in enumerate(value_cols):
+        out[col] = means[:, :, i].reshape(-1)
+    return out
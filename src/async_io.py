@@ -0,0 +1,133 @@
+"""
+Bounded background I/O for pipeline outputs.
+
+Inside a `with BackgroundWriter():` block, write_csv and save_figure hand
+their disk writes to a small thread pool so they overlap with the next
+computation step. At most max_pending writes are in flight; further
+submissions block until one finishes (back-pressure). Leaving the block
+waits for every write and re-raises the first error, so a run never exits
+with a silently missing output. Outside a block, both helpers write
+synchronously.
+
+Figures are rendered to PNG bytes on the calling thread (pyplot is not
+thread-safe); only the file write happens in the background. DataFrames
+passed to write_csv must not be modified afterwards.
+"""
+from __future__ import annotations
+
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from src.figure_cache import record_figure
+
+_active_writer = None
+
+
+def _write_bytes(path: Path, data: bytes, cache_key: str = None) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    if cache_key is not None:
+        # Only record the fingerprint once the file is fully written
+        record_figure(path, cache_key)
+
+
+def _write_csv(df: pd.DataFrame, path: Path, index: bool) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, index=index)
+
+
+class BackgroundWriter:
+    """
+    Bounded queue of background write jobs.
+    """
+
+    def __init__(self, max_pending: int = 8, workers: int = 2):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures = []
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queue fn(*args, **kwargs); blocks while max_pending jobs are in flight.
+        """
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+        return future
+
+    def flush(self) -> None:
+        """
+        Wait for all queued writes and raise the first error, if any.
+        """
+        futures, self._futures = self._futures, []
+        errors = [f.exception() for f in futures]
+        errors = [e for e in errors if e is not None]
+        if errors:
+            raise errors[0]
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        global _active_writer
+        self._previous = _active_writer
+        _active_writer = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active_writer
+        _active_writer = self._previous
+        if exc_type is None:
+            self.close()
+        else:
+            # Don't mask the original error with a write failure
+            try:
+                self.close()
+            except Exception:
+                pass
+
+
+def write_csv(df: pd.DataFrame, path: str | Path, index: bool = False) -> Path:
+    """
+    Write df to CSV, in the background if a BackgroundWriter is active.
+    """
+    path = Path(path)
+    if _active_writer is None:
+        _write_csv(df, path, index)
+    else:
+        _active_writer.submit(_write_csv, df, path, index)
+    return path
+
+
+def save_figure(path: str | Path, fig=None, cache_key: str = None) -> Path:
+    """
+    Render fig (default: current pyplot figure) and close it, then write the
+    image to path, in the background if a BackgroundWriter is active.
+    cache_key (from figure_cache.figure_fingerprint) is recorded in the
+    figure manifest after the write.
+    """
+    path = Path(path)
+    fig = fig if fig is not None else plt.gcf()
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format=path.suffix.lstrip(".") or "png")
+    plt.close(fig)
+
+    if _active_writer is None:
+        _write_bytes(path, buf.getvalue(), cache_key)
+    else:
+        _active_writer.submit(_write_bytes, path, buf.getvalue(), cache_key)
+    return path
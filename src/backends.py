@@ -0,0 +1,297 @@
+"""
+Execution backends for the loading, cleaning and feature-engineering steps.
+
+The pandas backend wraps the functions in data_loading, data_cleaning and
+feature_engineering unchanged. The polars backend runs the same steps on
+Polars' multi-threaded columnar engine. Either way, modelling and plotting
+receive pandas frames: call backend.to_pandas(df) at the boundary.
+
+Polars is optional and only imported when the polars backend is requested.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from src import data_cleaning, data_loading, feature_engineering
+
+
+@dataclass(frozen=True)
+class Backend:
+    name: str
+    load_co2_data: Callable
+    load_gdp_data: Callable
+    coerce_types: Callable
+    filter_time_range: Callable
+    merge_datasets: Callable
+    drop_missing_core: Callable
+    retain_countries_with_min_years: Callable
+    add_gdp_growth: Callable
+    add_rolling_features: Callable
+    add_baseline_gdp: Callable
+    add_emission_groups: Callable
+    from_pandas: Callable
+    to_pandas: Callable
+
+
+def _identity(df: pd.DataFrame) -> pd.DataFrame:
+    return df
+
+
+def _pandas_backend() -> Backend:
+    return Backend(
+        name="pandas",
+        load_co2_data=data_loading.load_co2_data,
+        load_gdp_data=data_loading.load_gdp_data,
+        coerce_types=data_cleaning.coerce_types,
+        filter_time_range=data_cleaning.filter_time_range,
+        merge_datasets=data_cleaning.merge_datasets,
+        drop_missing_core=data_cleaning.drop_missing_core,
+        retain_countries_with_min_years=data_cleaning.retain_countries_with_min_years,
+        add_gdp_growth=feature_engineering.add_gdp_growth,
+        add_rolling_features=feature_engineering.add_rolling_features,
+        add_baseline_gdp=feature_engineering.add_baseline_gdp,
+        add_emission_groups=feature_engineering.add_emission_groups,
+        from_pandas=_identity,
+        to_pandas=_identity,
+    )
+
+
+def _import_polars():
+    try:
+        import polars as pl
+    except ImportError as exc:
+        raise ImportError(
+            "The 'polars' backend requires the polars package (pip install polars)."
+        ) from exc
+    return pl
+
+
+# ---------------------------------------------------------------------------
+# Polars implementations (mirror the pandas functions step for step)
+# ---------------------------------------------------------------------------
+
+_KEY_COLS = ["iso_code", "country", "year"]
+
+
+def _pl_load_indicator(path: str, indicator_col: str, out_col: str):
+    pl = _import_polars()
+    if not Path(path).exists():
+        raise FileNotFoundError(f"File not found: {path}")
+
+    df = pl.read_csv(path, infer_schema_length=None)
+    rename_map = {"Entity": "country", "Code": "iso_code", "Year": "year"}
+    df = df.rename({k: v for k, v in rename_map.items() if k in df.columns})
+
+    missing = {"country", "iso_code", "year", indicator_col} - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    return (
+        df.rename({indicator_col: out_col})
+        .filter(pl.col("iso_code").is_not_null())
+        .select(["country", "iso_code", "year", out_col])
+    )
+
+
+def _pl_load_co2_data(path: str):
+    return _pl_load_indicator(path, "Annual CO₂ emissions (per capita)", "co2_per_capita")
+
+
+def _pl_load_gdp_data(path: str):
+    return _pl_load_indicator(path, "GDP per capita", "gdp_per_capita")
+
+
+def _pl_coerce_types(df):
+    pl = _import_polars()
+    value_cols = [c for c in df.columns if c not in _KEY_COLS]
+    return df.with_columns(
+        pl.col("year").cast(pl.Int64),
+        # NaN -> null so missing values have a single representation
+        *[pl.col(c).cast(pl.Float64, strict=False).fill_nan(None) for c in value_cols],
+    )
+
+
+def _pl_filter_time_range(df, start_year: int, end_year: int):
+    pl = _import_polars()
+    return df.filter(pl.col("year").is_between(start_year, end_year))
+
+
+def _pl_merge_datasets(co2_df, gdp_df):
+    keys = ["iso_code", "year"]
+    shared = (set(co2_df.columns) & set(gdp_df.columns)) - set(keys)
+    left = co2_df.rename({c: f"{c}_co2" for c in shared})
+    right = gdp_df.rename({c: f"{c}_gdp" for c in shared})
+
+    df = left.join(right, on=keys, how="inner", maintain_order="left")
+
+    # Keep a single country column
+    if "country_co2" in df.columns:
+        df = df.rename({"country_co2": "country"})
+        df = df.drop("country_gdp", strict=False)
+
+    return df
+
+
+def _pl_drop_missing_core(df, core_cols: list):
+    return df.drop_nulls(subset=core_cols)
+
+
+def _pl_retain_countries_with_min_years(df, min_years: int):
+    pl = _import_polars()
+    return df.filter(pl.col("year").n_unique().over("iso_code") >= min_years)
+
+
+def _pl_add_gdp_growth(df):
+    pl = _import_polars()
+    return df.sort(["iso_code", "year"]).with_columns(
+        pl.col("gdp_per_capita").pct_change().over("iso_code").alias("gdp_pc_growth")
+    )
+
+
+def _pl_add_rolling_features(df, window: int = 5):
+    pl = _import_polars()
+    return df.sort(["iso_code", "year"]).with_columns(
+        pl.col("co2_per_capita")
+        .rolling_mean(window, min_samples=window)
+        .over("iso_code")
+        .alias(f"co2_pc_rolling_{window}y"),
+        pl.col("gdp_pc_growth")
+        .rolling_std(window, min_samples=window)
+        .over("iso_code")
+        .alias(f"gdp_growth_volatility_{window}y"),
+    )
+
+
+def _pl_add_baseline_gdp(df, baseline_year: int = 2000):
+    pl = _import_polars()
+    baseline = (
+        df.filter(pl.col("year") == baseline_year)
+        .select(["iso_code", pl.col("gdp_per_capita").alias("baseline_gdp_pc")])
+    )
+    return df.join(baseline, on="iso_code", how="left", maintain_order="left")
+
+
+def _pl_add_emission_groups(df, n_groups: int = 3, mode: str = "static", window: int = 5):
+    """
+    Country averages are reduced in Polars; the (small) per-country table is
+    labelled with the pandas implementation so quantile edges match exactly.
+    The time-varying modes rank every row, so they round-trip through the
+    pandas implementation.
+    """
+    if mode not in {"static", "yearly", "rolling"}:
+        raise ValueError(f"Unknown emission group mode: {mode}")
+    if mode != "static":
+        out = feature_engineering.add_emission_groups(_pl_to_pandas(df), n_groups=n_groups, mode=mode, window=window)
+        return _pl_from_pandas(out)
+
+    pl = _import_polars()
+    country_avg = (
+        df.group_by("iso_code", maintain_order=True)
+        .agg(pl.col("co2_per_capita").mean())
+    )
+    labelled = feature_engineering.label_emission_groups(
+        pd.DataFrame(
+            {
+                "iso_code": country_avg["iso_code"].to_list(),
+                "avg_co2_per_capita": country_avg["co2_per_capita"].to_numpy(),
+            }
+        ),
+        n_groups=n_groups,
+    )
+
+    groups = labelled["emission_group"]
+    categories = [str(c) for c in groups.cat.categories] if hasattr(groups, "cat") else sorted(groups.unique())
+    mapping = pl.DataFrame(
+        {
+            "iso_code": labelled["iso_code"].tolist(),
+            "emission_group": pl.Series(groups.astype(object).tolist(), dtype=pl.Enum(categories)),
+        }
+    )
+    return df.join(mapping, on="iso_code", how="left", maintain_order="left")
+
+
+def _pl_from_pandas(df: pd.DataFrame):
+    """
+    Convert a pandas frame to Polars without requiring pyarrow.
+    Categoricals become Enums, mirroring _pl_to_pandas.
+    """
+    pl = _import_polars()
+    columns = {}
+    for name in df.columns:
+        col = df[name]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            categories = [str(c) for c in col.cat.categories]
+            values = [None if pd.isna(v) else str(v) for v in col.tolist()]
+            columns[name] = pl.Series(values, dtype=pl.Enum(categories))
+        elif pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col):
+            columns[name] = col.to_numpy()
+        else:
+            columns[name] = [None if pd.isna(v) else v for v in col.tolist()]
+    return pl.DataFrame(columns).with_columns(
+        # pandas NaN -> Polars null
+        pl.col(pl.Float64).fill_nan(None)
+    )
+
+
+def _pl_to_pandas(df) -> pd.DataFrame:
+    """
+    Convert to pandas without requiring pyarrow.
+    Enum/Categorical columns come back as pandas Categoricals.
+    """
+    pl = _import_polars()
+    columns = {}
+    for name, series in zip(df.columns, df.get_columns()):
+        if isinstance(series.dtype, pl.Enum):
+            categories = list(series.dtype.categories)
+            columns[name] = pd.Categorical(series.cast(pl.String).to_list(), categories=categories)
+        elif isinstance(series.dtype, pl.Categorical):
+            categories = sorted(series.drop_nulls().unique().cast(pl.String).to_list())
+            columns[name] = pd.Categorical(series.cast(pl.String).to_list(), categories=categories)
+        elif series.dtype == pl.String:
+            columns[name] = pd.array(series.to_list(), dtype="string")
+        else:
+            values = series.to_numpy()
+            if series.dtype.is_float():
+                values = values.astype(np.float64)
+            columns[name] = values
+    return pd.DataFrame(columns)
+
+
+def _polars_backend() -> Backend:
+    _import_polars()
+    return Backend(
+        name="polars",
+        load_co2_data=_pl_load_co2_data,
+        load_gdp_data=_pl_load_gdp_data,
+        coerce_types=_pl_coerce_types,
+        filter_time_range=_pl_filter_time_range,
+        merge_datasets=_pl_merge_datasets,
+        drop_missing_core=_pl_drop_missing_core,
+        retain_countries_with_min_years=_pl_retain_countries_with_min_years,
+        add_gdp_growth=_pl_add_gdp_growth,
+        add_rolling_features=_pl_add_rolling_features,
+        add_baseline_gdp=_pl_add_baseline_gdp,
+        add_emission_groups=_pl_add_emission_groups,
+        from_pandas=_pl_from_pandas,
+        to_pandas=_pl_to_pandas,
+    )
+
+
+BACKENDS = {
+    "pandas": _pandas_backend,
+    "polars": _polars_backend,
+}
+
+
+def get_backend(name: str = "pandas") -> Backend:
+    """
+    Return the execution backend registered under name.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend: {name}. Available: {sorted(BACKENDS)}")
+    return BACKENDS[name]()
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def _pairwise_pearson(values: np.ndarray):
+    """
+    All-pairs Pearson correlation for the columns of a 2D array.
+    Missing values are handled pairwise: each (i, j) entry only uses rows
+    where both columns are observed. Everything is computed from a handful of
+    masked matrix products, so cost grows with one matmul, not with the
+    number of pairs.
+    Returns (r, n) where n is the pairwise observation count.
+    """
+    mask = ~np.isnan(values)
+    m = mask.astype(float)
+
+    # Standardise each column on its observed values first. The pairwise
+    # formula below subtracts sums of products; on raw values far from zero
+    # (e.g. ~1e9) those cancel catastrophically. On standardised values the
+    # remaining pairwise-mean correction is of order one.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        count = m.sum(axis=0)
+        centre = np.where(mask, values, 0.0).sum(axis=0) / count
+        deviation = np.where(mask, values - centre, 0.0)
+        scale = np.sqrt((deviation ** 2).sum(axis=0) / count)
+    scale = np.where(scale > 0, scale, 1.0)
+    x = np.where(mask, (values - centre) / scale, 0.0)
+
+    n = m.T @ m
+    sum_x = x.T @ m           # [i, j] = sum of column i over rows where j is observed
+    sum_xx = (x * x).T @ m
+    sum_xy = x.T @ x
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sum_xy - sum_x * sum_x.T / n
+        var = sum_xx - sum_x ** 2 / n
+        r = cov / np.sqrt(var * var.T)
+
+    r = np.clip(r, -1.0, 1.0)
+    r[n < 2] = np.nan
+    return r, n
+
+
+def _correlation_pvalues(r: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """
+    Two-sided p-values for correlation coefficients from the t-distribution
+    with n - 2 degrees of freedom (same test used by scipy.stats.pearsonr
+    and spearmanr).
+    """
+    dof = n - 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = r * np.sqrt(dof / (1.0 - r ** 2))
+        p = 2 * stats.t.sf(np.abs(t), dof)
+    p[dof <= 0] = np.nan
+    return p
+
+
+def _correlation_arrays(df: pd.DataFrame, columns: list, method: str):
+    """
+    Return (r, p, n) arrays for the requested columns and method.
+    Spearman ranks each column once (ties get average ranks) and reuses the
+    Pearson product on the ranks. Those ranks are only right for pairs whose
+    columns are observed on the same rows; pairs with different missing
+    rows must be ranked within their pairwise-complete sample, as in
+    scipy.stats.spearmanr on the complete pairs and DataFrame.corr. Columns
+    are grouped by missingness pattern, so this takes one rank and one
+    matmul per pair of distinct patterns rather than per pair of columns.
+    """
+    if method not in {"pearson", "spearman"}:
+        raise ValueError(f"Unknown correlation method: {method}")
+
+    data = df[columns].astype(float)
+    if method == "spearman":
+        r, n = _pairwise_pearson(data.rank(method="average").to_numpy())
+
+        mask = data.notna().to_numpy()
+        patterns, group = np.unique(mask.T, axis=0, return_inverse=True)
+        group = group.ravel()
+        for a in range(len(patterns)):
+            for b in range(a + 1, len(patterns)):
+                both = patterns[a] & patterns[b]
+                if both.sum() < 2:
+                    continue
+                cols_a, cols_b = np.flatnonzero(group == a), np.flatnonzero(group == b)
+                cols = np.concatenate([cols_a, cols_b])
+                ranks = data.iloc[both, cols].rank(method="average").to_numpy()
+                block = _pairwise_pearson(ranks)[0][: len(cols_a), len(cols_a):]
+                r[np.ix_(cols_a, cols_b)] = block
+                r[np.ix_(cols_b, cols_a)] = block.T
+    else:
+        r, n = _pairwise_pearson(data.to_numpy())
+    p = _correlation_pvalues(r, n)
+    return r, p, n
+
+
+def _resolve_columns(df: pd.DataFrame, columns) -> list:
+    if columns is None:
+        return list(df.select_dtypes("number").columns)
+
+    columns = list(columns)
+    missing = set(columns) - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+    return columns
+
+
+def correlation_matrix(df: pd.DataFrame, columns: list = None, method: str = "pearson",
+                       stat: str = "r") -> pd.DataFrame:
+    """
+    Wide (column x column) correlation matrix.
+    stat selects what is returned: 'r' (coefficient), 'p' (p-value)
+    or 'n' (pairwise observation count).
+    Defaults to every numeric column in df.
+    """
+    if stat not in {"r", "p", "n"}:
+        raise ValueError(f"Unknown correlation statistic: {stat}")
+
+    columns = _resolve_columns(df, columns)
+    r, p, n = _correlation_arrays(df, columns, method)
+    values = {"r": r, "p": p, "n": n}[stat]
+    return pd.DataFrame(values, index=columns, columns=columns)
+
+
+def all_pairs_correlations(df: pd.DataFrame, columns: list = None, pairs: list = None) -> pd.DataFrame:
+    """
+    Long-format Pearson and Spearman correlations.
+    If pairs is given, only those (x, y) pairs are returned (in order);
+    otherwise every unique pair of columns is returned.
+    Output columns: x, y, n_obs, pearson_r, pearson_p, spearman_r, spearman_p
+    """
+    if pairs is not None:
+        pairs = [tuple(pair) for pair in pairs]
+        columns = list(dict.fromkeys(c for pair in pairs for c in pair))
+    columns = _resolve_columns(df, columns)
+
+    pearson_r, pearson_p, n = _correlation_arrays(df, columns, "pearson")
+    spearman_r, spearman_p, _ = _correlation_arrays(df, columns, "spearman")
+
+    pos = {c: i for i, c in enumerate(columns)}
+    if pairs is None:
+        i, j = np.triu_indices(len(columns), k=1)
+    else:
+        i = np.array([pos[x] for x, _ in pairs], dtype=int)
+        j = np.array([pos[y] for _, y in pairs], dtype=int)
+
+    cols = np.array(columns, dtype=object)
+    return pd.DataFrame(
+        {
+            "x": cols[i],
+            "y": cols[j],
+            "n_obs": n[i, j].astype(int),
+            "pearson_r": pearson_r[i, j],
+            "pearson_p": pearson_p[i, j],
+            "spearman_r": spearman_r[i, j],
+            "spearman_p": spearman_p[i, j],
+        }
+    )
@@ -1,4 +1,5 @@
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 def load_csv(path: str) -> pd.DataFrame:
@@ -55,7 +56,12 @@ def filter_owid_aggregates(df: pd.DataFrame) -> pd.DataFrame:
     return df[~df['iso_code'].str.startswith('OWID_')]
 
 def load_co2_data(path: str) -> pd.DataFrame:
-    df = load_csv(path)
+    return prepare_co2_data(load_csv(path))
+
+def prepare_co2_data(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Raw OWID CO2 export (whole file or one chunk) -> country, iso_code, year, co2_per_capita.
+    """
     df = standardise_owid_columns(df)
 
     # Map the indicator column to our internal name
@@ -69,7 +75,12 @@ def load_co2_data(path: str) -> pd.DataFrame:
     return df[["country", "iso_code", "year", "co2_per_capita"]]
 
 def load_gdp_data(path: str) -> pd.DataFrame:
-    df = load_csv(path)
+    return prepare_gdp_data(load_csv(path))
+
+def prepare_gdp_data(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Raw OWID GDP export (whole file or one chunk) -> country, iso_code, year, gdp_per_capita.
+    """
     df = standardise_owid_columns(df)
 
     gdp_col = "GDP per capita"
@@ -78,4 +89,15 @@ def load_gdp_data(path: str) -> pd.DataFrame:
     df = df.rename(columns={gdp_col: "gdp_per_capita"})
     df = drop_non_country_rows(df)
 
-    return df[["country", "iso_code", "year", "gdp_per_capita"]]
\ No newline at end of file
+    return df[["country", "iso_code", "year", "gdp_per_capita"]]
+
+def load_concurrently(loaders: dict, max_workers: int = None) -> dict:
+    """
+    Run independent loader callables (e.g. functools.partial(load_co2_data, path))
+    in a thread pool and return their results under the same keys.
+    The pandas C parser and Polars both release the GIL while parsing,
+    so reading several files overlaps.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers or len(loaders) or 1) as pool:
+        futures = {name: pool.submit(loader) for name, loader in loaders.items()}
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,216 @@
+"""
+Data-quality profile of the country-year panel.
+
+profile_panel sorts the panel once by (iso_code, year) and derives every
+check from that layout with array operations: per-country coverage, year
+gaps (which silently break pct_change and rolling windows), duplicate
+(iso_code, year) keys, years out of order in the input, extreme growth
+outliers and missing values. Row counts recorded after each cleaning step
+are turned into drop fractions. The result serialises to JSON so it can be
+written on every pipeline run. Because every check is per country,
+combine_reports merges profiles of disjoint country partitions exactly.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ISSUE_COLUMNS = ["iso_code", "year", "issue", "column", "value"]
+
+
+@dataclass(frozen=True)
+class QualityReport:
+    summary: dict
+    countries: pd.DataFrame
+    issues: pd.DataFrame
+
+    def to_dict(self) -> dict:
+        """
+        JSON-serialisable form: summary, one record per country, one per issue.
+        """
+        return {
+            "summary": self.summary,
+            "countries": _records(self.countries),
+            "issues": _records(self.issues),
+        }
+
+    def to_json(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        return path
+
+
+def _records(df: pd.DataFrame) -> list:
+    # Round-trip through pandas' JSON writer: numpy scalars -> Python, NaN -> null
+    return json.loads(df.to_json(orient="records"))
+
+
+def cleaning_step_drops(step_rows: list) -> list:
+    """
+    Turn [(step, rows_after_step), ...] (first entry = input rows) into
+    per-step records with rows dropped and the fraction of incoming rows dropped.
+    """
+    steps = []
+    for (_, before), (name, after) in zip(step_rows[:-1], step_rows[1:]):
+        dropped = before - after
+        steps.append(
+            {
+                "step": name,
+                "rows_in": int(before),
+                "rows_out": int(after),
+                "dropped": int(dropped),
+                "dropped_fraction": float(dropped / before) if before else 0.0,
+            }
+        )
+    return steps
+
+
+def profile_panel(df: pd.DataFrame, value_cols: list = ("co2_per_capita", "gdp_per_capita"),
+                  growth_col: str = "gdp_per_capita", max_abs_growth: float = 0.5,
+                  step_rows: list = None) -> QualityReport:
+    """
+    Profile a panel with iso_code and year columns.
+    Growth of growth_col is measured between rows exactly one year apart;
+    |growth| > max_abs_growth is reported as an outlier.
+    step_rows is an optional [(step, rows), ...] log from the cleaning stage
+    (see cleaning_step_drops).
+    """
+    required = {"iso_code", "year", growth_col, *value_cols}
+    missing = required - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    country_codes, iso_codes = pd.factorize(df["iso_code"], sort=True)
+    years_in = df["year"].to_numpy(dtype=np.int64)
+
+    # One stable sort; within a country, rows keep their input order on equal years
+    order = np.lexsort((years_in, country_codes))
+    codes = country_codes[order]
+    years = years_in[order]
+    n = len(order)
+
+    new_country = np.r_[True, codes[1:] != codes[:-1]] if n else np.array([], dtype=bool)
+    starts = np.flatnonzero(new_country)
+    lengths = np.diff(np.r_[starts, n])
+    ends = starts + lengths - 1
+
+    # Adjacent pairs inside one country
+    same = ~new_country[1:]
+    step = np.diff(years)
+    is_dup = same & (step == 0)
+    is_gap = same & (step > 1)
+    # Input order not increasing in year <=> a sorted neighbour came earlier in the input
+    out_of_order = same & (order[1:] < order[:-1])
+
+    pair_country = codes[1:]
+    n_c = len(iso_codes)
+    dup_rows = np.bincount(pair_country[is_dup], minlength=n_c)
+    n_gaps = np.bincount(pair_country[is_gap], minlength=n_c)
+    missing_years = np.bincount(pair_country[is_gap], weights=step[is_gap] - 1, minlength=n_c)
+    non_monotonic = np.bincount(pair_country[out_of_order], minlength=n_c) > 0
+
+    # Growth between consecutive years only (gaps and duplicates give no growth)
+    level = df[growth_col].to_numpy(dtype=np.float64)[order]
+    consecutive = same & (step == 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = np.where(consecutive, level[1:] / level[:-1] - 1, np.nan)
+    is_outlier = np.abs(growth) > max_abs_growth
+    outliers = np.bincount(pair_country[is_outlier], minlength=n_c)
+
+    first_year = years[starts]
+    last_year = years[ends]
+    distinct_years = lengths - dup_rows
+    span = last_year - first_year + 1
+
+    countries = pd.DataFrame(
+        {
+            "iso_code": np.asarray(iso_codes),
+            "n_rows": lengths,
+            "first_year": first_year,
+            "last_year": last_year,
+            "n_years": distinct_years,
+            "coverage": distinct_years / span,
+            "n_gaps": n_gaps,
+            "missing_years": missing_years.astype(int),
+            "duplicate_rows": dup_rows,
+            "non_monotonic": non_monotonic,
+            "growth_outliers": outliers,
+        }
+    )
+    values = df[list(value_cols)].to_numpy(dtype=np.float64)[order]
+    if n:
+        missing_counts = np.add.reduceat(np.isnan(values), starts, axis=0)
+    else:
+        missing_counts = np.zeros((0, len(value_cols)), dtype=int)
+    for i, col in enumerate(value_cols):
+        countries[f"missing_{col}"] = missing_counts[:, i]
+
+    # Row-level issues, each at the later row of the offending pair
+    iso_sorted = np.asarray(iso_codes)[codes]
+    later = np.arange(1, n)
+    parts = [
+        pd.DataFrame({"iso_code": iso_sorted[later[is_dup]], "year": years[later[is_dup]],
+                      "issue": "duplicate_key", "column": None, "value": np.nan}),
+        pd.DataFrame({"iso_code": iso_sorted[later[is_gap]], "year": years[later[is_gap]],
+                      "issue": "year_gap", "column": None, "value": (step[is_gap] - 1).astype(float)}),
+        pd.DataFrame({"iso_code": iso_sorted[later[is_outlier]], "year": years[later[is_outlier]],
+                      "issue": "growth_outlier", "column": growth_col, "value": growth[is_outlier]}),
+    ]
+    parts = [p for p in parts if not p.empty] or [pd.DataFrame(columns=ISSUE_COLUMNS)]
+    issues = pd.concat(parts, ignore_index=True)[ISSUE_COLUMNS]
+    issues = issues.sort_values(["iso_code", "year", "issue"], ignore_index=True)
+
+    summary = _summarise(countries, value_cols, max_abs_growth, step_rows)
+    return QualityReport(summary=summary, countries=countries, issues=issues)
+
+
+def _summarise(countries: pd.DataFrame, value_cols, max_abs_growth: float, step_rows: list) -> dict:
+    # Every panel-level figure is a reduction of the per-country table
+    n_c = len(countries)
+    return {
+        "n_rows": int(countries["n_rows"].sum()),
+        "n_countries": int(n_c),
+        "first_year": int(countries["first_year"].min()) if n_c else None,
+        "last_year": int(countries["last_year"].max()) if n_c else None,
+        "duplicate_keys": int(countries["duplicate_rows"].sum()),
+        "countries_with_gaps": int((countries["n_gaps"] > 0).sum()),
+        "missing_years": int(countries["missing_years"].sum()),
+        "non_monotonic_countries": int(countries["non_monotonic"].sum()),
+        "growth_outliers": int(countries["growth_outliers"].sum()),
+        "max_abs_growth": max_abs_growth,
+        "mean_coverage": float(countries["coverage"].mean()) if n_c else None,
+        "missing_values": {col: int(countries[f"missing_{col}"].sum()) for col in value_cols},
+        "cleaning_steps": cleaning_step_drops(step_rows) if step_rows else [],
+    }
+
+
+def combine_reports(reports: list, step_rows: list = None) -> QualityReport:
+    """
+    Combine profiles of panels that share no country (e.g. iso_code
+    partitions) into the profile of their union. Every check is per country,
+    so this equals profile_panel on the concatenated panel with the same
+    value_cols and max_abs_growth.
+    """
+    if not reports:
+        raise ValueError("No reports to combine")
+    first = reports[0].summary
+    value_cols = list(first["missing_values"])
+    filled = [r for r in reports if not r.countries.empty] or reports[:1]
+
+    countries = pd.concat([r.countries for r in filled], ignore_index=True)
+    if countries["iso_code"].duplicated().any():
+        examples = countries.loc[countries["iso_code"].duplicated(), "iso_code"].head(5).tolist()
+        raise ValueError(f"Countries profiled in more than one report: {examples}")
+    countries = countries.sort_values("iso_code", ignore_index=True)
+
+    issue_parts = [r.issues for r in reports if not r.issues.empty] or [reports[0].issues]
+    issues = pd.concat(issue_parts, ignore_index=True)
+    issues = issues.sort_values(["iso_code", "year", "issue"], ignore_index=True)
+
+    summary = _summarise(countries, value_cols, first["max_abs_growth"], step_rows)
+    return QualityReport(summary=summary, countries=countries, issues=issues)
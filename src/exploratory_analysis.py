@@ -2,42 +2,60 @@ import matplotlib.pyplot as plt
 import pandas as pd
 from pathlib import Path
 
+from src.async_io import save_figure
+from src.figure_cache import figure_fingerprint, figure_is_current
 
-def plot_global_trends(df: pd.DataFrame, output_dir: str):
+
+def plot_global_trends(df: pd.DataFrame, output_dir: str, trends: pd.DataFrame = None,
+                       stat_label: str = "Median"):
     """
     Plot global median CO2 per capita and GDP per capita over time.
+    A precomputed yearly series (columns year, co2_per_capita, gdp_per_capita),
+    e.g. the World rows from aggregate_by_group, can be passed as trends to
+    skip the groupby; stat_label names the statistic in the titles.
     """
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    summary = (
-        df.groupby("year")
-        .agg(
-            median_co2=("co2_per_capita", "median"),
-            median_gdp=("gdp_per_capita", "median"),
+    if trends is None:
+        summary = (
+            df.groupby("year")
+            .agg(
+                co2_per_capita=("co2_per_capita", "median"),
+                gdp_per_capita=("gdp_per_capita", "median"),
+            )
+            .reset_index()
         )
-        .reset_index()
-    )
+    else:
+        summary = trends.sort_values("year")
 
     # CO2 trend
-    plt.figure()
-    plt.plot(summary["year"], summary["median_co2"])
-    plt.xlabel("Year")
-    plt.ylabel("CO₂ emissions per capita (tonnes per person)")
-    plt.title("Global Median CO₂ Emissions per Capita Over Time")
-    plt.tight_layout()
-    plt.savefig(output_dir / "global_co2_trend.png")
-    plt.close()
+    path = output_dir / "global_co2_trend.png"
+    ylabel = "CO₂ emissions per capita (tonnes per person)"
+    title = f"Global {stat_label} CO₂ Emissions per Capita Over Time"
+    key = figure_fingerprint(summary[["year", "co2_per_capita"]], "Year", ylabel, title)
+    if not figure_is_current(path, key):
+        plt.figure()
+        plt.plot(summary["year"], summary["co2_per_capita"])
+        plt.xlabel("Year")
+        plt.ylabel(ylabel)
+        plt.title(title)
+        plt.tight_layout()
+        save_figure(path, cache_key=key)
 
     # GDP trend
-    plt.figure()
-    plt.plot(summary["year"], summary["median_gdp"])
-    plt.xlabel("Year")
-    plt.ylabel("GDP per capita (constant international $)")
-    plt.title("Global Median GDP per Capita Over Time")
-    plt.tight_layout()
-    plt.savefig(output_dir / "global_gdp_trend.png")
-    plt.close()
+    path = output_dir / "global_gdp_trend.png"
+    ylabel = "GDP per capita (constant international $)"
+    title = f"Global {stat_label} GDP per Capita Over Time"
+    key = figure_fingerprint(summary[["year", "gdp_per_capita"]], "Year", ylabel, title)
+    if not figure_is_current(path, key):
+        plt.figure()
+        plt.plot(summary["year"], summary["gdp_per_capita"])
+        plt.xlabel("Year")
+        plt.ylabel(ylabel)
+        plt.title(title)
+        plt.tight_layout()
+        save_figure(path, cache_key=key)
 
 def plot_scatter_co2_vs_gdp(df: pd.DataFrame, output_dir: str):
     """
@@ -48,14 +66,22 @@ def plot_scatter_co2_vs_gdp(df: pd.DataFrame, output_dir: str):
 
     sample = df.dropna(subset=["co2_per_capita", "gdp_per_capita"])
 
+    path = output_dir / "co2_vs_gdp_scatter.png"
+    xlabel = "CO₂ emissions per capita (tonnes per person)"
+    ylabel = "GDP per capita (constant international $)"
+    title = "CO₂ Emissions vs GDP per Capita"
+    alpha = 0.3
+    key = figure_fingerprint(sample[["co2_per_capita", "gdp_per_capita"]], xlabel, ylabel, title, alpha)
+    if figure_is_current(path, key):
+        return
+
     plt.figure()
-    plt.scatter(sample["co2_per_capita"], sample["gdp_per_capita"], alpha=0.3)
-    plt.xlabel("CO₂ emissions per capita (tonnes per person)")
-    plt.ylabel("GDP per capita (constant international $)")
-    plt.title("CO₂ Emissions vs GDP per Capita")
+    plt.scatter(sample["co2_per_capita"], sample["gdp_per_capita"], alpha=alpha)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
     plt.tight_layout()
-    plt.savefig(output_dir / "co2_vs_gdp_scatter.png")
-    plt.close()
+    save_figure(path, cache_key=key)
 
 def plot_volatility_by_emission_group(df: pd.DataFrame, output_dir: str):
     """
@@ -67,24 +93,33 @@ def plot_volatility_by_emission_group(df: pd.DataFrame, output_dir: str):
     data = df.dropna(subset=["gdp_growth_volatility_5y", "emission_group"])
 
     groups = ["low", "mid", "high"]
+    present = [g for g in groups if g in data["emission_group"].unique()]
     values = [
         data.loc[data["emission_group"] == g, "gdp_growth_volatility_5y"]
-        for g in groups
-        if g in data["emission_group"].unique()
+        for g in present
     ]
 
+    path = output_dir / "volatility_by_emission_group.png"
+    xlabel = "Emission Group"
+    ylabel = "GDP Growth Volatility (5-year rolling std)"
+    title = "GDP Growth Volatility by CO₂ Emission Group"
+    key = figure_fingerprint(present, [v.reset_index(drop=True) for v in values], xlabel, ylabel, title)
+    if figure_is_current(path, key):
+        return
+
     plt.figure()
-    plt.boxplot(values, labels=[g for g in groups if g in data["emission_group"].unique()])
-    plt.xlabel("Emission Group")
-    plt.ylabel("GDP Growth Volatility (5-year rolling std)")
-    plt.title("GDP Growth Volatility by CO₂ Emission Group")
+    plt.boxplot(values, tick_labels=present)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
     plt.tight_layout()
-    plt.savefig(output_dir / "volatility_by_emission_group.png")
-    plt.close()
+    save_figure(path, cache_key=key)
 
 def plot_country_trajectories(df: pd.DataFrame, iso_codes: list, output_dir: str):
     """
     Plot CO2 and GDP per capita trajectories for selected countries.
+    Each country's figure is fingerprinted on its own rows only, so a
+    revision to another country does not trigger a re-render.
     """
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -95,12 +130,19 @@ def plot_country_trajectories(df: pd.DataFrame, iso_codes: list, output_dir: str
         if subset.empty:
             continue
 
+        path = output_dir / f"{iso}_trajectory.png"
+        title = f"{subset.iloc[0]['country']}: CO₂ and GDP Trends"
+        co2_label = "CO₂ per capita (tonnes per person)"
+        gdp_label = "GDP per capita (constant international $)"
+        key = figure_fingerprint(subset[["year", "co2_per_capita", "gdp_per_capita"]], title, co2_label, gdp_label)
+        if figure_is_current(path, key):
+            continue
+
         plt.figure()
-        plt.plot(subset["year"], subset["co2_per_capita"], label="CO₂ per capita (tonnes per person)")
-        plt.plot(subset["year"], subset["gdp_per_capita"], label="GDP per capita (constant international $)")
+        plt.plot(subset["year"], subset["co2_per_capita"], label=co2_label)
+        plt.plot(subset["year"], subset["gdp_per_capita"], label=gdp_label)
         plt.xlabel("Year")
-        plt.title(f"{subset.iloc[0]['country']}: CO₂ and GDP Trends")
+        plt.title(title)
         plt.legend()
         plt.tight_layout()
-        plt.savefig(output_dir / f"{iso}_trajectory.png")
-        plt.close()
\ No newline at end of file
+        save_figure(path, cache_key=key)
@@ -57,24 +57,23 @@ def add_baseline_gdp(df: pd.DataFrame, baseline_year: int = 2000) -> pd.DataFram
     return out
 
 
-def add_emission_groups(df: pd.DataFrame, n_groups: int = 3) -> pd.DataFrame:
+def _group_labels(n_groups: int) -> list:
+    return ["low", "mid", "high"] if n_groups == 3 else [f"g{i+1}" for i in range(n_groups)]
+
+
+def label_emission_groups(country_avg: pd.DataFrame, n_groups: int = 3) -> pd.DataFrame:
     """
-    Assign emission group labels based on average CO2 per capita per country.
-    If there are fewer unique countries than groups, assign a single group.
+    Add an emission_group column to a one-row-per-country table holding
+    avg_co2_per_capita, using quantile cut points across countries.
+    If there are fewer countries than groups, assign everything to 'mid'.
     """
-    out = df.copy()
-
-    country_avg = (
-        out.groupby("iso_code", as_index=False)["co2_per_capita"]
-        .mean()
-        .rename(columns={"co2_per_capita": "avg_co2_per_capita"})
-    )
+    country_avg = country_avg.copy()
 
     # If too few countries to form quantiles, assign all to 'mid'
     if country_avg.shape[0] < n_groups:
         country_avg["emission_group"] = "mid"
     else:
-        labels = ["low", "mid", "high"] if n_groups == 3 else [f"g{i+1}" for i in range(n_groups)]
+        labels = _group_labels(n_groups)
         country_avg["emission_group"] = pd.qcut(
             country_avg["avg_co2_per_capita"],
             q=n_groups,
@@ -82,6 +81,88 @@ def add_emission_groups(df: pd.DataFrame, n_groups: int = 3) -> pd.DataFrame:
             duplicates="drop",
         )
 
+    return country_avg
+
+
+def _quantile_groups_by_year(values: np.ndarray, years: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    Quantile group code (0..n_groups-1, -1 for NaN) of every value within its
+    year, for all years in one lexsort.
+    Reproduces pd.qcut(q=n_groups) per year: with 0-based sorted position r
+    (ties take the first position of their run) among N values,
+    group = max(0, ceil(r * n_groups / (N - 1)) - 1).
+    Years with fewer than n_groups values are assigned the middle group
+    ('mid' for three groups, as in the static mode).
+    """
+    codes = np.full(len(values), -1, dtype=np.int64)
+    valid = np.flatnonzero(~np.isnan(values))
+    if valid.size == 0:
+        return codes
+
+    v, y = values[valid], years[valid]
+    order = np.lexsort((v, y))
+    v, y = v[order], y[order]
+
+    new_year = np.r_[True, y[1:] != y[:-1]]
+    year_start = np.maximum.accumulate(np.where(new_year, np.arange(len(y)), 0))
+    year_id = np.cumsum(new_year) - 1
+    n_in_year = np.bincount(year_id)[year_id]
+
+    new_run = new_year | np.r_[True, v[1:] != v[:-1]]
+    r_min = np.maximum.accumulate(np.where(new_run, np.arange(len(y)), 0)) - year_start
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        group = np.maximum(0, -(-(r_min * n_groups) // np.maximum(n_in_year - 1, 1)) - 1)
+    group = np.where(n_in_year < n_groups, n_groups // 2, group)
+
+    codes[valid[order]] = group
+    return codes
+
+
+def add_emission_groups(df: pd.DataFrame, n_groups: int = 3, mode: str = "static", window: int = 5) -> pd.DataFrame:
+    """
+    Assign emission group labels based on CO2 per capita.
+
+    mode='static' (default): one label per country from its whole-period
+    average. If there are fewer unique countries than groups, assign a single group.
+    mode='yearly': countries are ranked against each other within every year,
+    so a country's group can change over time.
+    mode='rolling': as 'yearly', but ranking each country's trailing mean CO2
+    over up to window years.
+    Time-varying modes sort the whole panel once (no per-year qcut loop) and
+    give the same cut points as pd.qcut within each year.
+    """
+    if mode not in {"static", "yearly", "rolling"}:
+        raise ValueError(f"Unknown emission group mode: {mode}")
+
+    if mode != "static":
+        out = df.copy()
+        out = out.sort_values(["iso_code", "year"])
+
+        values = out["co2_per_capita"]
+        if mode == "rolling":
+            values = (
+                out.groupby("iso_code")["co2_per_capita"]
+                .rolling(window=window, min_periods=1)
+                .mean()
+                .reset_index(level=0, drop=True)
+            )
+
+        codes = _quantile_groups_by_year(
+            values.to_numpy(dtype=np.float64), out["year"].to_numpy(), n_groups
+        )
+        out["emission_group"] = pd.Categorical.from_codes(codes, categories=_group_labels(n_groups), ordered=True)
+        return out
+
+    out = df.copy()
+
+    country_avg = (
+        out.groupby("iso_code", as_index=False)["co2_per_capita"]
+        .mean()
+        .rename(columns={"co2_per_capita": "avg_co2_per_capita"})
+    )
+    country_avg = label_emission_groups(country_avg, n_groups=n_groups)
+
     out = out.merge(
         country_avg[["iso_code", "emission_group"]],
         on="iso_code",
@@ -90,6 +171,49 @@ def add_emission_groups(df: pd.DataFrame, n_groups: int = 3) -> pd.DataFrame:
     return out
 
 
+def emission_group_transitions(df: pd.DataFrame, group_col: str = "emission_group", lag: int = 1,
+                               normalise: bool = False) -> pd.DataFrame:
+    """
+    Transition matrix of group membership between year t - lag and year t,
+    pooled over countries (rows = from, columns = to).
+    Only pairs exactly lag calendar years apart are counted, so gaps in a
+    country's series are skipped. All pairs are tallied with one bincount.
+    normalise=True turns counts into row probabilities.
+    """
+    required = {"iso_code", "year", group_col}
+    missing = required - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    data = df.sort_values(["iso_code", "year"])
+    groups = data[group_col]
+    if not isinstance(groups.dtype, pd.CategoricalDtype):
+        groups = groups.astype("category")
+    labels = list(groups.cat.categories)
+    codes = groups.cat.codes.to_numpy()
+
+    iso = data["iso_code"].to_numpy()
+    years = data["year"].to_numpy()
+    key = pd.MultiIndex.from_arrays([iso, years])
+    if key.has_duplicates:
+        raise ValueError("Duplicate (iso_code, year) rows")
+
+    # Row of the same country exactly lag calendar years earlier (-1 if absent)
+    back = key.get_indexer(pd.MultiIndex.from_arrays([iso, years - lag]))
+    has_prev = (back >= 0) & (codes >= 0)
+    from_codes = codes[back[has_prev]]
+    to_codes = codes[has_prev]
+    keep = from_codes >= 0
+
+    n = len(labels)
+    counts = np.bincount(from_codes[keep] * n + to_codes[keep], minlength=n * n).reshape(n, n)
+    matrix = pd.DataFrame(counts, index=pd.Index(labels, name="from"), columns=pd.Index(labels, name="to"))
+
+    if normalise:
+        matrix = matrix.div(matrix.sum(axis=1).replace(0, np.nan), axis=0)
+    return matrix
+
+
 def summarise_country_metrics(df: pd.DataFrame) -> pd.DataFrame:
     """
     Produce one-row-per-country dataset for modelling.
@@ -120,4 +244,174 @@ def summarise_country_metrics(df: pd.DataFrame) -> pd.DataFrame:
         )
         summary = summary.merge(baseline, on="iso_code", how="left")
 
-    return summary
\ No newline at end of file
+    return summary
+
+
+def add_lag_features(
+    df: pd.DataFrame,
+    columns: list = ("co2_per_capita", "gdp_pc_growth"),
+    lags: list = (1,),
+    leads: list = (),
+    diff_lags: list = (1,),
+    log_diff_lags: list = (),
+) -> pd.DataFrame:
+    """
+    Add lagged, lead, differenced and log-differenced versions of columns
+    per country, in one vectorised pass.
+
+    Values are scattered into a dense (column x country x year) grid, so every
+    shift is a single gather by calendar year. This is gap-aware: if a country
+    has no row for year t-k, the lag-k value is NaN rather than the value from
+    an earlier row.
+
+    New columns (k = shift):
+    - {col}_lag{k}, {col}_lead{k}
+    - {col}_diff{k}     = x_t - x_(t-k)
+    - {col}_logdiff{k}  = log(x_t) - log(x_(t-k)), NaN for non-positive values
+    """
+    columns = list(columns)
+    required = {"iso_code", "year", *columns}
+    missing = required - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    out = df.copy()
+    out = out.sort_values(["iso_code", "year"])
+
+    if out.duplicated(["iso_code", "year"]).any():
+        raise ValueError("Duplicate (iso_code, year) rows; cannot build lag features")
+
+    country_idx, _ = pd.factorize(out["iso_code"], sort=True)
+    years = out["year"].to_numpy(dtype=np.int64)
+    year_idx = years - years.min() if len(years) else years
+    n_years = int(year_idx.max()) + 1 if len(years) else 0
+
+    values = out[columns].to_numpy(dtype=np.float64).T
+    grid = np.full((len(columns), country_idx.max() + 1 if len(years) else 0, n_years), np.nan)
+    grid[:, country_idx, year_idx] = values
+
+    # Signed shifts: positive = lag (look back), negative = lead (look ahead)
+    shifts = sorted(set(lags) | set(diff_lags) | set(log_diff_lags)) + [-k for k in leads]
+    target = year_idx[None, :] - np.asarray(shifts, dtype=np.int64)[:, None]
+    inside = (target >= 0) & (target < n_years)
+    shifted = np.where(
+        inside[None, :, :],
+        grid[:, country_idx[None, :], np.clip(target, 0, max(n_years - 1, 0))],
+        np.nan,
+    )  # (column, shift, row)
+    pos = {k: i for i, k in enumerate(shifts)}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_values = np.log(np.where(values > 0, values, np.nan))
+        log_shifted = np.log(np.where(shifted > 0, shifted, np.nan))
+
+    new_cols = {}
+    for c, col in enumerate(columns):
+        for k in lags:
+            new_cols[f"{col}_lag{k}"] = shifted[c, pos[k]]
+        for k in leads:
+            new_cols[f"{col}_lead{k}"] = shifted[c, pos[-k]]
+        for k in diff_lags:
+            new_cols[f"{col}_diff{k}"] = values[c] - shifted[c, pos[k]]
+        for k in log_diff_lags:
+            new_cols[f"{col}_logdiff{k}"] = log_values[c] - log_shifted[c, pos[k]]
+
+    return out.assign(**new_cols)
+
+
+def _ewm_kernel(values: np.ndarray, halflives: list):
+    """
+    Recursive, bias-corrected EWMA mean and std for many series at once.
+    values is (n_series, T), NaN-padded; returns two (n_halflives, n_series, T)
+    arrays. One scan over T updates decayed weight sums for every series and
+    half-life together, reproducing pandas ewm(halflife=h, adjust=True) with
+    ignore_na=False: missing values still age the earlier weights.
+    The weighted variance is updated around the running mean (West's
+    incremental form), so large levels do not cancel in sum(w x^2) - mean^2.
+    """
+    decay = np.exp(-np.log(2) / np.asarray(halflives, dtype=np.float64))[:, None]
+    n_series, n_steps = values.shape
+    shape = (len(halflives), n_series)
+
+    sum_w = np.zeros(shape)
+    sum_w2 = np.zeros(shape)
+    m = np.zeros(shape)
+    sum_sq = np.zeros(shape)  # weighted sum of squared deviations from m
+    mean = np.full(shape + (n_steps,), np.nan)
+    std = np.full(shape + (n_steps,), np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for t in range(n_steps):
+            x = values[:, t]
+            observed = ~np.isnan(x)
+
+            old_w = sum_w * decay
+            sum_w = old_w + observed
+            sum_w2 = sum_w2 * decay ** 2 + observed
+            delta = np.where(observed, x - m, 0.0)
+            m = np.where(observed, m + delta / sum_w, m)
+            sum_sq = sum_sq * decay + np.where(observed, old_w * delta * delta / sum_w, 0.0)
+
+            biased_var = np.maximum(sum_sq / sum_w, 0.0)
+            correction = sum_w ** 2 / (sum_w ** 2 - sum_w2)
+            mean[:, :, t] = np.where(sum_w > 0, m, np.nan)
+            std[:, :, t] = np.sqrt(np.where(sum_w ** 2 > sum_w2 * (1 + 1e-12), biased_var * correction, np.nan))
+
+    return mean, std
+
+
+def add_ewm_features(
+    df: pd.DataFrame,
+    columns: list = ("co2_per_capita", "gdp_pc_growth"),
+    halflives: list = (2, 5),
+) -> pd.DataFrame:
+    """
+    Add exponentially weighted mean and volatility (bias-corrected std)
+    per country for each column and half-life (in years).
+    Unlike the flat rolling window, values are available from a country's
+    first observation (volatility from its second).
+
+    Weights decay with calendar time, not row position: a missing year
+    (gap in a country's years) ages the earlier weights like a missing
+    value would, instead of treating the rows either side as adjacent.
+
+    New columns: {col}_ewm_mean_hl{h}, {col}_ewm_vol_hl{h}
+    Matches groupby(iso_code)[col].ewm(halflife=h).mean() / .std() on each
+    country's rows reindexed to consecutive years.
+    """
+    columns = list(columns)
+    required = {"iso_code", "year", *columns}
+    missing = required - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    out = df.copy()
+    out = out.sort_values(["iso_code", "year"])
+
+    # Lay the sorted panel out as (country, years since the country's first
+    # year) so the recursion runs over calendar years for all countries at once
+    country_idx, _ = pd.factorize(out["iso_code"], sort=True)
+    n_rows = len(out)
+    years = out["year"].to_numpy(dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, country_idx[1:] != country_idx[:-1]]) if n_rows else np.array([], int)
+    lengths = np.diff(np.r_[starts, n_rows])
+    pos = years - np.repeat(years[starts], lengths)
+    if n_rows and pd.MultiIndex.from_arrays([country_idx, pos]).has_duplicates:
+        raise ValueError("Duplicate (iso_code, year) rows; cannot build EWM features")
+    n_countries = len(starts)
+    n_steps = int(pos.max()) + 1 if n_rows else 0
+
+    grid = np.full((len(columns) * n_countries, n_steps), np.nan)
+    values = out[columns].to_numpy(dtype=np.float64).T
+    series_idx = np.arange(len(columns))[:, None] * n_countries + country_idx[None, :]
+    grid[series_idx, pos[None, :]] = values
+
+    mean, std = _ewm_kernel(grid, list(halflives))
+
+    new_cols = {}
+    for c, col in enumerate(columns):
+        for h_i, h in enumerate(halflives):
+            new_cols[f"{col}_ewm_mean_hl{h:g}"] = mean[h_i][series_idx[c], pos]
+            new_cols[f"{col}_ewm_vol_hl{h:g}"] = std[h_i][series_idx[c], pos]
+
+    return out.assign(**new_cols)
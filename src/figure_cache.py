@@ -0,0 +1,135 @@
+"""
+Content-addressed cache for rendered figures.
+
+Each plotting function fingerprints exactly what it draws (the data slice,
+labels, titles and style parameters, plus the matplotlib version) and skips
+rendering when the file on disk was produced from the same fingerprint.
+Fingerprints are kept in a per-directory manifest (.figure_manifest.json).
+Figures tracked in a manifest but not produced or reused in the current
+process can be garbage-collected with remove_stale_figures.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+MANIFEST_NAME = ".figure_manifest.json"
+
+CACHE_ENABLED = True
+
+_lock = threading.Lock()
+_used = set()
+
+
+def set_cache_enabled(enabled: bool) -> None:
+    """
+    Turn the figure cache on or off (off = always re-render).
+    """
+    global CACHE_ENABLED
+    CACHE_ENABLED = enabled
+
+
+def _update_digest(digest, part) -> None:
+    if isinstance(part, (pd.DataFrame, pd.Series)):
+        frame = part.to_frame() if isinstance(part, pd.Series) else part
+        digest.update(repr([(str(c), str(t)) for c, t in frame.dtypes.items()]).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    elif isinstance(part, np.ndarray):
+        arr = np.ascontiguousarray(part)
+        digest.update(f"{arr.dtype}{arr.shape}".encode())
+        digest.update(arr.tobytes() if arr.dtype != object else repr(arr.tolist()).encode())
+    elif isinstance(part, (list, tuple)):
+        digest.update(f"seq{len(part)}".encode())
+        for item in part:
+            _update_digest(digest, item)
+    else:
+        digest.update(repr(part).encode())
+    digest.update(b"\x00")
+
+
+def figure_fingerprint(*parts) -> str:
+    """
+    SHA-256 over the plotted data and the parameters that shape the figure.
+    DataFrames/Series are hashed by value (not index), arrays by bytes,
+    anything else by repr.
+    """
+    digest = hashlib.sha256()
+    _update_digest(digest, ("matplotlib", matplotlib.__version__))
+    for part in parts:
+        _update_digest(digest, part)
+    return digest.hexdigest()
+
+
+def _manifest_path(directory: Path) -> Path:
+    return directory / MANIFEST_NAME
+
+
+def load_manifest(directory: str | Path) -> dict:
+    path = _manifest_path(Path(directory))
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text()).get("figures", {})
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def _save_manifest(directory: Path, figures: dict) -> None:
+    path = _manifest_path(directory)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": 1, "figures": figures}, indent=2, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def figure_is_current(path: str | Path, fingerprint: str) -> bool:
+    """
+    True if path exists and was rendered from this fingerprint.
+    Marks the figure as used either way, so it survives garbage collection.
+    """
+    path = Path(path)
+    _used.add(path.resolve())
+    if not CACHE_ENABLED or not path.exists():
+        return False
+    entry = load_manifest(path.parent).get(path.name)
+    return entry is not None and entry.get("fingerprint") == fingerprint
+
+
+def record_figure(path: str | Path, fingerprint: str) -> None:
+    """
+    Store the fingerprint of a freshly written figure in its manifest.
+    """
+    path = Path(path)
+    with _lock:
+        figures = load_manifest(path.parent)
+        figures[path.name] = {
+            "fingerprint": fingerprint,
+            "rendered_at": datetime.now(timezone.utc).isoformat(),
+        }
+        _save_manifest(path.parent, figures)
+
+
+def remove_stale_figures(directory: str | Path, dry_run: bool = False) -> list:
+    """
+    Delete figures tracked in directory's manifest that were neither rendered
+    nor reused in this process, and drop them from the manifest.
+    Files the cache never wrote are left alone. Returns the stale paths.
+    """
+    directory = Path(directory)
+    with _lock:
+        figures = load_manifest(directory)
+        stale = [directory / name for name in figures if (directory / name).resolve() not in _used]
+        if dry_run or not stale:
+            return stale
+        for path in stale:
+            path.unlink(missing_ok=True)
+            figures.pop(path.name, None)
+        _save_manifest(directory, figures)
+    return stale
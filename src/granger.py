@@ -0,0 +1,121 @@
+"""
+Vectorised per-country Granger causality tests.
+
+For lag order p, the unrestricted model regresses effect_t on a constant,
+effect_{t-1..t-p} and cause_{t-1..t-p}; the restricted model drops the
+cause lags. The F-test on the restricted vs unrestricted residual sums of
+squares is statsmodels' grangercausalitytests 'ssr_ftest'.
+
+The sorted panel is placed on a dense (country x year) grid once. Lags are
+grid shifts, so a gap in a country's years makes the affected rows
+unusable instead of silently pairing non-adjacent years. For each lag
+order, every country's design is a slice of one (country x year x column)
+tensor with unusable rows zeroed, and all restricted and unrestricted
+regressions are solved in one stacked pseudo-inverse.
+"""
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def _panel_grid(df: pd.DataFrame, columns: list):
+    country_idx, iso_codes = pd.factorize(df["iso_code"], sort=True)
+    years = df["year"].to_numpy(dtype=np.int64)
+    first = years.min() if len(years) else 0
+    n_years = years.max() - first + 1 if len(years) else 0
+    if pd.MultiIndex.from_arrays([country_idx, years]).has_duplicates:
+        raise ValueError("Duplicate (iso_code, year) rows; cannot build lagged designs")
+
+    grid = np.full((len(columns), len(iso_codes), n_years), np.nan)
+    for i, col in enumerate(columns):
+        grid[i, country_idx, years - first] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.asarray(iso_codes), grid
+
+
+def _lagged(values: np.ndarray, lag: int) -> np.ndarray:
+    """
+    values shifted lag years later along the last axis (NaN-padded).
+    """
+    out = np.full(values.shape, np.nan)
+    out[..., lag:] = values[..., :-lag]
+    return out
+
+
+def _batched_ssr(X: np.ndarray, y: np.ndarray):
+    """
+    Residual sum of squares and rank of y ~ X for every country at once.
+    X is (C, T, k), y is (C, T); unusable rows are all-zero.
+    """
+    beta = np.linalg.pinv(X) @ y[..., None]
+    resid = y - (X @ beta)[..., 0]
+    return (resid ** 2).sum(axis=1), np.linalg.matrix_rank(X)
+
+
+def granger_causality(df: pd.DataFrame, cause_col: str = "co2_per_capita",
+                      effect_col: str = "gdp_growth_volatility_5y", max_lag: int = 3,
+                      reverse: bool = False) -> pd.DataFrame:
+    """
+    Test, per iso_code and lag order 1..max_lag, whether lags of cause_col
+    help predict effect_col beyond effect_col's own lags.
+    reverse=True also tests the opposite direction (lead-lag check).
+    Returns iso_code, cause, effect, lag, n_obs, f_stat, df_num, df_denom,
+    p_value; statistics are NaN where a country has too few usable years.
+    """
+    required = {"iso_code", "year", cause_col, effect_col}
+    missing = required - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+    if max_lag < 1:
+        raise ValueError(f"max_lag must be at least 1, got {max_lag}")
+
+    iso_codes, grid = _panel_grid(df, [cause_col, effect_col])
+    directions = [(cause_col, effect_col, grid[0], grid[1])]
+    if reverse:
+        directions.append((effect_col, cause_col, grid[1], grid[0]))
+
+    n_c = len(iso_codes)
+    frames = []
+    for cause_name, effect_name, cause, effect in directions:
+        own_lags = [_lagged(effect, k) for k in range(1, max_lag + 1)]
+        cause_lags = [_lagged(cause, k) for k in range(1, max_lag + 1)]
+
+        for p in range(1, max_lag + 1):
+            # (C, T, 1 + 2p): constant, own lags, then cause lags
+            X = np.stack([np.ones_like(effect), *own_lags[:p], *cause_lags[:p]], axis=-1)
+            usable = ~np.isnan(effect) & ~np.isnan(X).any(axis=-1)
+            X = np.where(usable[..., None], X, 0.0)
+            y = np.where(usable, effect, 0.0)
+
+            ssr_u, rank_u = _batched_ssr(X, y)
+            ssr_r, _ = _batched_ssr(X[..., : 1 + p], y)
+
+            n_obs = usable.sum(axis=1)
+            df_denom = n_obs - rank_u
+            with np.errstate(divide="ignore", invalid="ignore"):
+                f_stat = ((ssr_r - ssr_u) / p) / (ssr_u / df_denom)
+            valid = (df_denom > 0) & (rank_u == X.shape[-1])
+            f_stat = np.where(valid, f_stat, np.nan)
+            p_value = np.where(valid, stats.f.sf(f_stat, p, np.maximum(df_denom, 1)), np.nan)
+
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "iso_code": iso_codes,
+                        "cause": cause_name,
+                        "effect": effect_name,
+                        "lag": p,
+                        "n_obs": n_obs,
+                        "f_stat": f_stat,
+                        "df_num": p,
+                        "df_denom": np.where(valid, df_denom, np.nan),
+                        "p_value": p_value,
+                    }
+                )
+            )
+
+    if not frames or n_c == 0:
+        return pd.DataFrame(
+            columns=["iso_code", "cause", "effect", "lag", "n_obs", "f_stat", "df_num", "df_denom", "p_value"]
+        )
+    out = pd.concat(frames, ignore_index=True)
+    return out.sort_values(["cause", "iso_code", "lag"], ignore_index=True)
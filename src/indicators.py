@@ -0,0 +1,227 @@
+"""
+Generic multi-indicator loading into a dense (country x year x indicator) array.
+
+Indicators are registered once with the OWID export they live in and the
+source column header. load_indicator_panel reads each file once, however many
+indicators it provides, and scatters every value into one float64 array.
+Growth, rolling statistics and country-level aggregates then run over all
+indicators at once along the array axes instead of one groupby per column.
+
+Because the year axis is calendar-dense, growth and rolling windows are
+gap-aware: a missing year yields NaN rather than bridging the gap.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.data_loading import (
+    drop_non_country_rows,
+    load_csv,
+    standardise_owid_columns,
+    validate_required_columns,
+)
+
+
+@dataclass(frozen=True)
+class Indicator:
+    name: str
+    filename: str
+    column: str
+
+
+INDICATORS = {
+    "co2_per_capita": Indicator("co2_per_capita", "owid_co2.csv", "Annual CO₂ emissions (per capita)"),
+    "gdp_per_capita": Indicator("gdp_per_capita", "owid_gdp_per_capita.csv", "GDP per capita"),
+}
+
+
+def register_indicator(name: str, filename: str, column: str) -> Indicator:
+    """
+    Register (or replace) an indicator so it can be loaded by name.
+    """
+    indicator = Indicator(name=name, filename=filename, column=column)
+    INDICATORS[name] = indicator
+    return indicator
+
+
+@dataclass(frozen=True)
+class IndicatorPanel:
+    iso_codes: np.ndarray
+    countries: np.ndarray
+    years: np.ndarray
+    indicators: list
+    values: np.ndarray  # (country, year, indicator)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Long panel: one row per (country, year) with at least one observed
+        indicator, one column per indicator.
+        """
+        n_c, n_y, n_i = self.values.shape
+        flat = self.values.reshape(n_c * n_y, n_i)
+        keep = ~np.isnan(flat).all(axis=1)
+
+        df = pd.DataFrame(
+            {
+                "country": np.repeat(self.countries, n_y)[keep],
+                "iso_code": np.repeat(self.iso_codes, n_y)[keep],
+                "year": np.tile(self.years, n_c)[keep],
+            }
+        )
+        for i, name in enumerate(self.indicators):
+            df[name] = flat[keep, i]
+        return df
+
+    def join(self, other: "IndicatorPanel") -> "IndicatorPanel":
+        """
+        Concatenate along the indicator axis (same countries and years).
+        """
+        if not (np.array_equal(self.iso_codes, other.iso_codes) and np.array_equal(self.years, other.years)):
+            raise ValueError("Panels must share countries and years to be joined")
+        return IndicatorPanel(
+            iso_codes=self.iso_codes,
+            countries=self.countries,
+            years=self.years,
+            indicators=list(self.indicators) + list(other.indicators),
+            values=np.concatenate([self.values, other.values], axis=2),
+        )
+
+    def _derive(self, values: np.ndarray, suffix: str) -> "IndicatorPanel":
+        return IndicatorPanel(
+            iso_codes=self.iso_codes,
+            countries=self.countries,
+            years=self.years,
+            indicators=[f"{name}_{suffix}" for name in self.indicators],
+            values=values,
+        )
+
+
+def panel_from_frame(df: pd.DataFrame, indicators: list) -> IndicatorPanel:
+    """
+    Scatter a long (country, iso_code, year, indicators...) frame into an
+    IndicatorPanel. Countries are sorted by iso_code; years span min..max.
+    Raises ValueError on duplicate (iso_code, year) rows rather than
+    keeping whichever row is scattered last.
+    """
+    validate_required_columns(df, ["country", "iso_code", "year", *indicators])
+
+    iso_idx, iso_codes = pd.factorize(df["iso_code"], sort=True)
+    years = df["year"].to_numpy(dtype=np.int64)
+    duplicated = pd.MultiIndex.from_arrays([iso_idx, years]).duplicated()
+    if duplicated.any():
+        examples = sorted({(iso_codes[i], int(y)) for i, y in zip(iso_idx[duplicated], years[duplicated])})[:5]
+        raise ValueError(f"Duplicate (iso_code, year) rows: {examples}")
+    first_year = int(years.min()) if len(years) else 0
+    all_years = np.arange(first_year, int(years.max()) + 1 if len(years) else 0)
+
+    values = np.full((len(iso_codes), len(all_years), len(indicators)), np.nan)
+    values[iso_idx, years - first_year] = df[list(indicators)].to_numpy(dtype=np.float64)
+
+    # First country name seen for each iso_code
+    names = pd.Series(df["country"].to_numpy(dtype=object)).groupby(iso_idx).first()
+    countries = names.reindex(range(len(iso_codes))).to_numpy(dtype=object)
+
+    return IndicatorPanel(
+        iso_codes=np.asarray(iso_codes, dtype=object),
+        countries=countries,
+        years=all_years,
+        indicators=list(indicators),
+        values=values,
+    )
+
+
+def load_indicator_panel(names: list, data_dir: str | Path = "data/raw",
+                         start_year: int | None = None, end_year: int | None = None) -> IndicatorPanel:
+    """
+    Load registered indicators into a single IndicatorPanel.
+    Each source file is read once, however many indicators it provides.
+    Aggregate rows without an iso_code are dropped, as in load_co2_data.
+    """
+    unknown = set(names) - set(INDICATORS)
+    if unknown:
+        raise ValueError(f"Unknown indicators: {sorted(unknown)}")
+
+    by_file = {}
+    for name in names:
+        by_file.setdefault(INDICATORS[name].filename, []).append(INDICATORS[name])
+
+    frames = []
+    for filename, indicators in by_file.items():
+        df = standardise_owid_columns(load_csv(Path(data_dir) / filename))
+        validate_required_columns(df, ["country", "iso_code", "year", *[ind.column for ind in indicators]])
+        df = drop_non_country_rows(df)
+        df = df.rename(columns={ind.column: ind.name for ind in indicators})
+        df = df[["country", "iso_code", "year", *[ind.name for ind in indicators]]]
+
+        df["year"] = df["year"].astype(int)
+        for ind in indicators:
+            df[ind.name] = pd.to_numeric(df[ind.name], errors="coerce")
+        if start_year is not None:
+            df = df[df["year"] >= start_year]
+        if end_year is not None:
+            df = df[df["year"] <= end_year]
+        frames.append(df.set_index(["iso_code", "year"]))
+
+    # Outer-align all files on (iso_code, year), keeping the first country name
+    combined = pd.concat(frames, axis=1)
+    country = combined["country"]
+    if isinstance(country, pd.DataFrame):
+        country = country.bfill(axis=1).iloc[:, 0]
+    combined = combined.drop(columns="country").assign(country=country).reset_index()
+
+    return panel_from_frame(combined, list(names))
+
+
+def panel_growth(panel: IndicatorPanel) -> IndicatorPanel:
+    """
+    Year-on-year growth (pct change) for every indicator at once.
+    """
+    values = panel.values
+    growth = np.full(values.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth[:, 1:, :] = values[:, 1:, :] / values[:, :-1, :] - 1
+    return panel._derive(growth, "growth")
+
+
+def panel_rolling(panel: IndicatorPanel, window: int = 5) -> IndicatorPanel:
+    """
+    Rolling mean and std (ddof=1) over window years for every indicator.
+    A window is NaN unless all its years are observed.
+    Returns a panel with {name}_rolling_mean_{w}y then {name}_rolling_std_{w}y.
+    """
+    values = panel.values
+    mean = np.full(values.shape, np.nan)
+    std = np.full(values.shape, np.nan)
+    if values.shape[1] >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=1)
+        mean[:, window - 1:, :] = windows.mean(axis=-1)
+        if window > 1:
+            std[:, window - 1:, :] = windows.std(axis=-1, ddof=1)
+
+    return panel._derive(mean, f"rolling_mean_{window}y").join(panel._derive(std, f"rolling_std_{window}y"))
+
+
+def summarise_indicators(panel: IndicatorPanel) -> pd.DataFrame:
+    """
+    One row per country with avg_{name}, std_{name} (ddof=1) and
+    n_years_{name} for every indicator, computed in one pass.
+    """
+    values = panel.values
+    counts = (~np.isnan(values)).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg = np.nansum(values, axis=1) / counts
+        sq_dev = np.nansum((values - avg[:, None, :]) ** 2, axis=1)
+        std = np.sqrt(sq_dev / (counts - 1))
+    avg[counts == 0] = np.nan
+    std[counts < 2] = np.nan
+
+    summary = pd.DataFrame({"iso_code": panel.iso_codes, "country": panel.countries})
+    for i, name in enumerate(panel.indicators):
+        summary[f"avg_{name}"] = avg[:, i]
+        summary[f"std_{name}"] = std[:, i]
+        summary[f"n_years_{name}"] = counts[:, i]
+    return summary
@@ -1,8 +1,10 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
 import statsmodels.api as sm
 
+from src.correlation import all_pairs_correlations
+from src.robust_regression import run_robust_regression
+
 def compute_country_level_dataset(df: pd.DataFrame) -> pd.DataFrame:
     """
     Create one-row-per-country dataset for modelling.
@@ -36,34 +38,28 @@ def run_correlations(country_df: pd.DataFrame) -> pd.DataFrame:
     Compute Pearson and Spearman correlations between CO2 exposure
     and economic stability metrics.
     """
-    results = []
-
     pairs = [
         ("avg_co2_per_capita", "mean_gdp_growth"),
         ("avg_co2_per_capita", "gdp_growth_volatility"),
     ]
 
-    for x, y in pairs:
-        pearson_r, pearson_p = stats.pearsonr(country_df[x], country_df[y])
-        spearman_r, spearman_p = stats.spearmanr(country_df[x], country_df[y])
-
-        results.append(
-            {
-                "x": x,
-                "y": y,
-                "pearson_r": pearson_r,
-                "pearson_p": pearson_p,
-                "spearman_r": spearman_r,
-                "spearman_p": spearman_p,
-            }
-        )
+    results = all_pairs_correlations(country_df, pairs=pairs)
+    return results[["x", "y", "pearson_r", "pearson_p", "spearman_r", "spearman_p"]]
 
-    return pd.DataFrame(results)
-
-def run_regression(country_df: pd.DataFrame, y_col: str, x_cols: list):
+def run_regression(country_df: pd.DataFrame, y_col: str, x_cols: list, estimator: str = "ols",
+                   cov_type: str = "nonrobust", quantile: float = 0.5, cluster_col: str = None):
     """
     Run OLS regression with specified dependent and independent variables.
+    Robust alternatives (see src/robust_regression.py): cov_type 'HC0'-'HC3'
+    or 'cluster' (with cluster_col), estimator 'huber' or 'quantile'.
+    Every variant works with summarise_model().
     """
+    if estimator != "ols" or cov_type != "nonrobust":
+        return run_robust_regression(
+            country_df, y_col, x_cols, estimator=estimator, cov_type=cov_type,
+            quantile=quantile, cluster_col=cluster_col,
+        )
+
     X = country_df[x_cols]
     X = sm.add_constant(X)
     y = country_df[y_col]
@@ -3,6 +3,9 @@ from pathlib import Path
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from src.async_io import save_figure
+from src.figure_cache import figure_fingerprint, figure_is_current
+
 
 def plot_scatter_with_fit(country_df: pd.DataFrame, x: str, y: str, model, output_path: str, title: str,
                           x_label: str, y_label: str) -> None:
@@ -15,13 +18,6 @@ def plot_scatter_with_fit(country_df: pd.DataFrame, x: str, y: str, model, outpu
     # Clean
     df = country_df[[x, y]].dropna()
 
-    # Scatter
-    plt.figure()
-    plt.scatter(df[x], df[y], alpha=0.5)
-    plt.xlabel(x_label)
-    plt.ylabel(y_label)
-    plt.title(title)
-
     # Fit line (hold other predictors constant at their mean)
     x_min, x_max = df[x].min(), df[x].max()
     x_vals = pd.Series([x_min, x_max])
@@ -45,10 +41,21 @@ def plot_scatter_with_fit(country_df: pd.DataFrame, x: str, y: str, model, outpu
     pred_df = pd.DataFrame(pred_rows)[exog_names]
     y_pred = model.predict(pred_df)
 
+    # Skip rendering if the points, fit line and labels are unchanged
+    key = figure_fingerprint(df, x_vals, pd.Series(y_pred), title, x_label, y_label, 0.5)
+    if figure_is_current(outpath, key):
+        return
+
+    # Scatter
+    plt.figure()
+    plt.scatter(df[x], df[y], alpha=0.5)
+    plt.xlabel(x_label)
+    plt.ylabel(y_label)
+    plt.title(title)
+
     plt.plot(x_vals, y_pred)
     plt.tight_layout()
-    plt.savefig(outpath)
-    plt.close()
+    save_figure(outpath, cache_key=key)
 
 
 def plot_residuals_vs_fitted(model, output_path: str, title: str) -> None:
@@ -61,15 +68,19 @@ def plot_residuals_vs_fitted(model, output_path: str, title: str) -> None:
     fitted = model.fittedvalues
     resid = model.resid
 
+    x_label, y_label = "Fitted values", "Residuals"
+    key = figure_fingerprint(pd.Series(fitted), pd.Series(resid), title, x_label, y_label)
+    if figure_is_current(outpath, key):
+        return
+
     plt.figure()
     plt.scatter(fitted, resid, alpha=0.5)
     plt.axhline(0)
-    plt.xlabel("Fitted values")
-    plt.ylabel("Residuals")
+    plt.xlabel(x_label)
+    plt.ylabel(y_label)
     plt.title(title)
     plt.tight_layout()
-    plt.savefig(outpath)
-    plt.close()
+    save_figure(outpath, cache_key=key)
 
 
 def plot_coefficients(summary_df: pd.DataFrame, output_path: str, title: str) -> None:
@@ -85,12 +96,16 @@ def plot_coefficients(summary_df: pd.DataFrame, output_path: str, title: str) ->
     # Drop intercept for a cleaner plot (optional)
     df = df[df["variable"] != "const"]
 
+    x_label, y_label = "Predictor", "Coefficient (±1 SE)"
+    key = figure_fingerprint(df[["variable", "coefficient", "std_error"]], title, x_label, y_label)
+    if figure_is_current(outpath, key):
+        return
+
     plt.figure()
     plt.errorbar(df["variable"], df["coefficient"], yerr=df["std_error"], fmt="o")
     plt.axhline(0)
-    plt.xlabel("Predictor")
-    plt.ylabel("Coefficient (±1 SE)")
+    plt.xlabel(x_label)
+    plt.ylabel(y_label)
     plt.title(title)
     plt.tight_layout()
-    plt.savefig(outpath)
-    plt.close()
\ No newline at end of file
+    save_figure(outpath, cache_key=key)
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+Load test for the query service.
+
+Starts the service in-process on a free port (or targets --url), then
+sends a mix of /panel and /countries queries from several client threads
+and reports latency percentiles and throughput. The first pass uses
+distinct queries (cache misses); the second repeats them (cache hits).
+
+    python -m src.query_load_test --requests 2000 --concurrency 8
+    python -m src.query_load_test --url http://127.0.0.1:8765
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+
+import numpy as np
+
+from src.query_service import COUNTRIES_PATH, PANEL_PATH, QueryService, make_server
+
+
+def build_queries(base_url: str, n: int, seed: int = 0) -> list:
+    """
+    n request URLs built from the metrics and countries the service reports.
+    """
+    with urlopen(f"{base_url}/metrics") as resp:
+        meta = json.load(resp)
+    with urlopen(f"{base_url}/countries") as resp:
+        iso_codes = [r["iso_code"] for r in json.load(resp)["data"]]
+
+    rng = np.random.default_rng(seed)
+    groups = meta["emission_groups"]
+    queries = []
+    for i in range(n):
+        kind = rng.random()
+        if kind < 0.5:
+            isos = ",".join(rng.choice(iso_codes, size=min(3, len(iso_codes)), replace=False))
+            start = int(rng.integers(2000, 2016))
+            metric = ",".join(rng.choice(meta["panel"], size=min(2, len(meta["panel"])), replace=False))
+            queries.append(f"{base_url}/panel?iso_code={isos}&start_year={start}&end_year={start + 5}&metric={metric}")
+        elif kind < 0.8 and groups:
+            group = rng.choice(groups)
+            metric = rng.choice(meta["countries"])
+            queries.append(f"{base_url}/countries?emission_group={group}&metric={metric}")
+        else:
+            isos = ",".join(rng.choice(iso_codes, size=min(5, len(iso_codes)), replace=False))
+            queries.append(f"{base_url}/countries?iso_code={isos}")
+    return queries
+
+
+def run_load(urls: list, concurrency: int = 8) -> dict:
+    """
+    Fetch every URL from concurrency threads; returns latency and throughput stats.
+    """
+    latencies = np.empty(len(urls))
+    errors = []
+    lock = threading.Lock()
+
+    def fetch(i):
+        t0 = time.perf_counter()
+        try:
+            with urlopen(urls[i]) as resp:
+                resp.read()
+        except Exception as exc:
+            with lock:
+                errors.append(str(exc))
+        latencies[i] = time.perf_counter() - t0
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fetch, range(len(urls))))
+    elapsed = time.perf_counter() - start
+
+    ms = latencies * 1000
+    return {
+        "requests": len(urls),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "throughput_rps": len(urls) / elapsed if elapsed else float("nan"),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Load-test the query service.")
+    parser.add_argument("--url", help="Existing service to target (default: start one in-process)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--panel", default=PANEL_PATH)
+    parser.add_argument("--countries", default=COUNTRIES_PATH)
+    args = parser.parse_args(argv)
+
+    server = service = None
+    base_url = args.url
+    if base_url is None:
+        service = QueryService(args.panel, args.countries)
+        server = make_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        # Unique queries: the service's response cache is cold for every URL
+        urls = list(dict.fromkeys(build_queries(base_url, args.requests)))
+        cold = run_load(urls, args.concurrency)
+        warm = run_load(urls, args.concurrency)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print(f"{'pass':<6}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, stats in (("cold", cold), ("cached", warm)):
+        print(
+            f"{name:<6}{stats['requests']:>10}{stats['errors']:>8}{stats['throughput_rps']:>10.0f}"
+            f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['max_ms']:>9.2f}"
+        )
+    if service is not None:
+        info = service.cache_info()
+        print(f"response cache: {info.hits} hits, {info.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Local read-only HTTP/JSON service over the processed outputs.
+
+The panel (data/processed/panel.csv) and country summary
+(data/processed/country_summary.csv) are loaded once into a MetricsIndex:
+the panel sorted by (iso_code, year) as numpy arrays with a row range per
+country, the summary as one row per country, and an emission_group ->
+countries lookup. Queries slice those arrays instead of scanning frames.
+Rendered responses are kept in an LRU cache keyed by the index version and
+the normalised query. When the pipeline rewrites either file, the next
+request after it has settled triggers a reload, which swaps in a new index
+and clears the cache. Each request reads the (version, index) pair once, so
+a response never mixes two versions; /health is never cached.
+
+Endpoints (all GET, comma-separated lists allowed):
+    /health
+    /metrics
+    /countries?iso_code=USA,CHN&emission_group=high&metric=avg_co2_per_capita
+    /panel?iso_code=USA&start_year=2005&end_year=2010&emission_group=high&metric=co2_per_capita
+
+Run with:
+    python -m src.query_service --port 8765
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+PANEL_PATH = "data/processed/panel.csv"
+COUNTRIES_PATH = "data/processed/country_summary.csv"
+
+
+class MetricsIndex:
+    """
+    Immutable in-memory index of the panel and country summary.
+    """
+
+    def __init__(self, panel: pd.DataFrame, countries: pd.DataFrame):
+        missing = {"iso_code", "year"} - set(panel.columns)
+        if missing:
+            raise ValueError(f"Missing required columns: {missing}")
+        if "iso_code" not in countries.columns:
+            raise ValueError("Missing required columns: {'iso_code'}")
+
+        panel = panel.sort_values(["iso_code", "year"], ignore_index=True)
+        self.panel_metrics = [
+            c for c in panel.select_dtypes("number").columns if c != "year"
+        ]
+        self.iso = panel["iso_code"].to_numpy(dtype=object)
+        self.year = panel["year"].to_numpy(dtype=np.int64)
+        self.values = panel[self.panel_metrics].to_numpy(dtype=np.float64)
+
+        starts = np.flatnonzero(np.r_[True, self.iso[1:] != self.iso[:-1]]) if len(panel) else np.array([], dtype=int)
+        stops = np.r_[starts[1:], len(panel)]
+        self.rows = {self.iso[s]: (s, e) for s, e in zip(starts, stops)}
+
+        # Emission group per country (first label; static groups are constant)
+        groups = {}
+        if "emission_group" in panel.columns:
+            labels = panel["emission_group"].to_numpy(dtype=object)
+            for iso, (s, _) in self.rows.items():
+                if pd.notna(labels[s]):
+                    groups.setdefault(str(labels[s]), []).append(iso)
+        self.groups = groups
+
+        countries = countries.drop_duplicates("iso_code").set_index("iso_code").sort_index()
+        self.country_metrics = list(countries.select_dtypes("number").columns)
+        self.countries = countries
+        self.n_rows = len(panel)
+
+    def _select_countries(self, iso_codes: list, emission_groups: list, universe) -> list:
+        selected = list(universe) if not iso_codes else [c for c in iso_codes if c in universe]
+        if emission_groups:
+            allowed = {iso for g in emission_groups for iso in self.groups.get(g, [])}
+            selected = [c for c in selected if c in allowed]
+        return sorted(selected)
+
+    def query_countries(self, iso_codes: list = (), emission_groups: list = (), metrics: list = ()) -> list:
+        unknown = set(metrics) - set(self.country_metrics)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {sorted(unknown)}")
+        selected = self._select_countries(iso_codes, emission_groups, self.countries.index)
+        cols = [c for c in self.countries.columns if c not in self.country_metrics]
+        cols += list(metrics) or self.country_metrics
+        out = self.countries.loc[selected, cols].reset_index()
+        return json.loads(out.to_json(orient="records"))
+
+    def query_panel(self, iso_codes: list = (), emission_groups: list = (), metrics: list = (),
+                    start_year: int = None, end_year: int = None) -> list:
+        unknown = set(metrics) - set(self.panel_metrics)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {sorted(unknown)}")
+        metrics = list(metrics) or self.panel_metrics
+        cols = [self.panel_metrics.index(m) for m in metrics]
+
+        lo = -np.inf if start_year is None else start_year
+        hi = np.inf if end_year is None else end_year
+        pieces = []
+        for iso in self._select_countries(iso_codes, emission_groups, self.rows):
+            s, e = self.rows[iso]
+            # Years are sorted within a country: binary-search the range
+            a = s + np.searchsorted(self.year[s:e], lo, side="left")
+            b = s + np.searchsorted(self.year[s:e], hi, side="right")
+            if b > a:
+                pieces.append(np.arange(a, b))
+        idx = np.concatenate(pieces) if pieces else np.array([], dtype=np.int64)
+
+        out = pd.DataFrame(self.values[np.ix_(idx, cols)], columns=metrics)
+        out.insert(0, "year", self.year[idx])
+        out.insert(0, "iso_code", self.iso[idx])
+        return json.loads(out.to_json(orient="records"))
+
+
+def load_index(panel_path: str | Path = PANEL_PATH, countries_path: str | Path = COUNTRIES_PATH) -> MetricsIndex:
+    return MetricsIndex(pd.read_csv(panel_path), pd.read_csv(countries_path))
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """
+    A version and its index. Equality and hashing use the version only, so
+    the response cache is keyed on it while rendering reads this index.
+    """
+    version: int
+    index: MetricsIndex = field(compare=False)
+
+
+def _file_state(paths) -> tuple:
+    return tuple((p.stat().st_mtime_ns, p.stat().st_size) if p.exists() else None for p in paths)
+
+
+class QueryService:
+    """
+    Holds the current MetricsIndex, the response cache and the reload logic.
+    Request handling is independent of HTTP so it can be tested directly.
+    """
+
+    def __init__(self, panel_path: str | Path = PANEL_PATH, countries_path: str | Path = COUNTRIES_PATH,
+                 cache_size: int = 1024, check_interval: float = 2.0, settle_seconds: float = 1.0):
+        self.paths = (Path(panel_path), Path(countries_path))
+        self.check_interval = check_interval
+        self.settle_seconds = settle_seconds
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._next_check = 0.0
+        self.version = 0
+        self.reload_errors = 0
+        self._render = lru_cache(maxsize=cache_size)(self._render_uncached)
+        self.reload()
+
+    def reload(self) -> None:
+        """
+        Build a new index from disk and swap it in; the cache is cleared.
+        """
+        state = _file_state(self.paths)
+        index = load_index(*self.paths)
+        with self._lock:
+            self.index = index
+            self._state = state
+            self.version += 1
+            self.loaded_at = time.time()
+            self._snapshot = _Snapshot(self.version, index)
+            self._render.cache_clear()
+
+    def maybe_reload(self) -> bool:
+        """
+        Reload if either file changed and has not been modified for
+        settle_seconds (so half-written outputs are not picked up).
+        Checks at most every check_interval seconds. A failed reload keeps
+        serving the previous index.
+        """
+        now = time.time()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.check_interval
+
+        state = _file_state(self.paths)
+        if state == self._state or None in state:
+            return False
+        newest = max(s[0] for s in state) / 1e9
+        if now - newest < self.settle_seconds:
+            self._next_check = now  # check again on the next request
+            return False
+        # One reloading thread at a time; others keep serving the current index
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self.reload()
+        except (OSError, ValueError, pd.errors.ParserError):
+            self.reload_errors += 1
+            self._state = state
+            return False
+        finally:
+            self._reload_lock.release()
+        return True
+
+    def handle(self, path: str, params: dict) -> tuple:
+        """
+        Answer a request; returns (status, body bytes).
+        params maps each query parameter to its list of values.
+        """
+        self.maybe_reload()
+        with self._lock:
+            snapshot, loaded_at = self._snapshot, self.loaded_at
+        items = tuple(sorted((k, tuple(v)) for k, v in params.items()))
+        try:
+            if path == "/health":
+                _parse_params(items)
+                return 200, self._health(snapshot, loaded_at)
+            return 200, self._render(snapshot, path, items)
+        except ValueError as exc:
+            return 400, json.dumps({"error": str(exc)}).encode()
+        except LookupError as exc:
+            return 404, json.dumps({"error": str(exc)}).encode()
+
+    def _health(self, snapshot: _Snapshot, loaded_at: float) -> bytes:
+        body = {
+            "status": "ok",
+            "version": snapshot.version,
+            "loaded_at": loaded_at,
+            "n_rows": snapshot.index.n_rows,
+            "n_countries": len(snapshot.index.countries),
+            "reload_errors": self.reload_errors,
+        }
+        return json.dumps(body).encode()
+
+    def _render_uncached(self, snapshot: _Snapshot, path: str, items: tuple) -> bytes:
+        index, version = snapshot.index, snapshot.version
+        params = _parse_params(items)
+
+        if path == "/metrics":
+            body = {
+                "panel": index.panel_metrics,
+                "countries": index.country_metrics,
+                "emission_groups": sorted(index.groups),
+            }
+        elif path in ("/countries", "/panel"):
+            selection = dict(
+                iso_codes=params.get("iso_code", []),
+                emission_groups=params.get("emission_group", []),
+                metrics=params.get("metric", []),
+            )
+            if path == "/countries":
+                records = index.query_countries(**selection)
+            else:
+                years = {k: _single_int(params, k) for k in ("start_year", "end_year")}
+                records = index.query_panel(**selection, **years)
+            body = {"version": version, "count": len(records), "data": records}
+        else:
+            raise LookupError(f"Unknown endpoint: {path}")
+        return json.dumps(body).encode()
+
+    def cache_info(self):
+        return self._render.cache_info()
+
+
+def _parse_params(items: tuple) -> dict:
+    """
+    Split comma-separated values and reject unknown parameters.
+    """
+    params = {k: [x for v in values for x in v.split(",") if x] for k, values in items}
+    unknown = set(params) - {"iso_code", "emission_group", "metric", "start_year", "end_year"}
+    if unknown:
+        raise ValueError(f"Unknown query parameters: {sorted(unknown)}")
+    return params
+
+
+def _single_int(params: dict, name: str):
+    values = params.get(name)
+    if not values:
+        return None
+    try:
+        return int(values[-1])
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {values[-1]!r}") from None
+
+
+def make_handler(service: QueryService):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            status, body = service.handle(url.path.rstrip("/") or "/", parse_qs(url.query))
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops connections under bursts of clients
+    request_queue_size = 128
+
+
+def make_server(service: QueryService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """
+    Threaded HTTP server bound to host:port (port 0 = any free port).
+    """
+    server = _Server((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve processed country metrics as JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--panel", default=PANEL_PATH)
+    parser.add_argument("--countries", default=COUNTRIES_PATH)
+    parser.add_argument("--cache-size", type=int, default=1024)
+    args = parser.parse_args(argv)
+
+    service = QueryService(args.panel, args.countries, cache_size=args.cache_size)
+    server = make_server(service, args.host, args.port)
+    print(f"Serving {args.panel} and {args.countries} on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Local SQLite store for pipeline results, so runs can be compared across data
+vintages and parameter choices instead of overwriting CSVs.
+
+Tables: runs (parameters, input hashes, timings), correlations, coefficients
+and country_metrics (country-level datasets in long form). Child tables are
+indexed on run_id and on variable / iso_code, and every save is one batched
+executemany. Saves made inside store.transaction() are committed together,
+so a failed run leaves no partial rows behind.
+
+CLI:
+    python -m src.results_store runs
+    python -m src.results_store coefficients --variable avg_co2_per_capita
+    python -m src.results_store correlations --x avg_co2_per_capita --y gdp_growth_volatility
+    python -m src.results_store country --iso USA --metric gdp_growth_volatility
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_DB = "outputs/results.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    label TEXT,
+    params TEXT NOT NULL,
+    input_hashes TEXT NOT NULL,
+    timings TEXT
+);
+CREATE TABLE IF NOT EXISTS correlations (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    x TEXT NOT NULL,
+    y TEXT NOT NULL,
+    pearson_r REAL,
+    pearson_p REAL,
+    spearman_r REAL,
+    spearman_p REAL
+);
+CREATE TABLE IF NOT EXISTS coefficients (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    model TEXT NOT NULL,
+    variable TEXT NOT NULL,
+    coefficient REAL,
+    std_error REAL,
+    p_value REAL,
+    r_squared REAL
+);
+CREATE TABLE IF NOT EXISTS country_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    dataset TEXT NOT NULL,
+    iso_code TEXT NOT NULL,
+    country TEXT,
+    metric TEXT NOT NULL,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS idx_correlations_run ON correlations(run_id);
+CREATE INDEX IF NOT EXISTS idx_correlations_xy ON correlations(x, y, run_id);
+CREATE INDEX IF NOT EXISTS idx_coefficients_run ON coefficients(run_id);
+CREATE INDEX IF NOT EXISTS idx_coefficients_variable ON coefficients(variable, model, run_id);
+CREATE INDEX IF NOT EXISTS idx_country_metrics_run ON country_metrics(run_id);
+CREATE INDEX IF NOT EXISTS idx_country_metrics_iso ON country_metrics(iso_code, metric, run_id);
+"""
+
+
+def file_sha256(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    """
+    SHA-256 of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _none_if_nan(value):
+    """
+    SQLite-friendly value: NaN -> NULL, numpy scalars -> Python scalars.
+    """
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+class ResultsStore:
+    """
+    Thin wrapper around a SQLite connection with the results schema.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_DB):
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        # WAL + NORMAL sync: one cheap commit per batch instead of a full fsync
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._depth = 0
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Commit every write made inside the block at once, or roll all of
+        them back if the block raises. Nested blocks join the outer one.
+        """
+        outer = self._depth == 0
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            if outer:
+                self.conn.rollback()
+            raise
+        else:
+            if outer:
+                self.conn.commit()
+        finally:
+            self._depth -= 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- writes -----------------------------------------------------------
+
+    def start_run(self, params: dict, input_paths: list = (), label: str = None) -> int:
+        """
+        Register a run with its parameters and the SHA-256 of each input file.
+        Returns the new run_id.
+        """
+        hashes = {str(p): file_sha256(p) for p in input_paths}
+        with self.transaction():
+            cur = self.conn.execute(
+                "INSERT INTO runs (created_at, label, params, input_hashes) VALUES (?, ?, ?, ?)",
+                (
+                    datetime.now(timezone.utc).isoformat(),
+                    label,
+                    json.dumps(params, sort_keys=True, default=str),
+                    json.dumps(hashes, sort_keys=True),
+                ),
+            )
+        return cur.lastrowid
+
+    def record_timings(self, run_id: int, timings: dict) -> None:
+        with self.transaction():
+            self.conn.execute(
+                "UPDATE runs SET timings = ? WHERE run_id = ?",
+                (json.dumps(timings, sort_keys=True), run_id),
+            )
+
+    def save_correlations(self, run_id: int, corr_df: pd.DataFrame) -> None:
+        """
+        Save run_correlations() output.
+        """
+        cols = ["x", "y", "pearson_r", "pearson_p", "spearman_r", "spearman_p"]
+        rows = [(run_id, *map(_none_if_nan, r)) for r in corr_df[cols].itertuples(index=False)]
+        with self.transaction():
+            self.conn.executemany(f"INSERT INTO correlations VALUES (?, {', '.join('?' * len(cols))})", rows)
+
+    def save_regression(self, run_id: int, model_name: str, summary_df: pd.DataFrame) -> None:
+        """
+        Save summarise_model() output under a model name (e.g. 'volatility').
+        """
+        cols = ["variable", "coefficient", "std_error", "p_value", "r_squared"]
+        rows = [(run_id, model_name, *map(_none_if_nan, r)) for r in summary_df[cols].itertuples(index=False)]
+        with self.transaction():
+            self.conn.executemany("INSERT INTO coefficients VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def save_country_dataset(self, run_id: int, country_df: pd.DataFrame, dataset: str = "country_level") -> None:
+        """
+        Save a one-row-per-country table; every numeric column becomes a metric.
+        """
+        metrics = [c for c in country_df.select_dtypes("number").columns if c != "year"]
+        country = country_df["country"] if "country" in country_df.columns else pd.Series(None, index=country_df.index)
+        long = (
+            country_df.assign(country=country)[["iso_code", "country", *metrics]]
+            .melt(id_vars=["iso_code", "country"], var_name="metric", value_name="value")
+        )
+        rows = [
+            (run_id, dataset, str(iso), _none_if_nan(name), metric, _none_if_nan(value))
+            for iso, name, metric, value in long.itertuples(index=False)
+        ]
+        with self.transaction():
+            self.conn.executemany("INSERT INTO country_metrics VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    # --- queries ----------------------------------------------------------
+
+    def _query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def list_runs(self) -> pd.DataFrame:
+        return self._query("SELECT * FROM runs ORDER BY run_id")
+
+    def compare_coefficients(self, variable: str, model: str = None) -> pd.DataFrame:
+        """
+        One row per (run, model) for a regression variable.
+        """
+        sql = (
+            "SELECT c.run_id, r.created_at, r.label, c.model, c.variable, c.coefficient, "
+            "c.std_error, c.p_value, c.r_squared "
+            "FROM coefficients c JOIN runs r USING (run_id) WHERE c.variable = ?"
+        )
+        params = (variable,)
+        if model is not None:
+            sql += " AND c.model = ?"
+            params += (model,)
+        return self._query(sql + " ORDER BY c.run_id, c.model", params)
+
+    def compare_correlations(self, x: str, y: str) -> pd.DataFrame:
+        sql = (
+            "SELECT c.run_id, r.created_at, r.label, c.x, c.y, c.pearson_r, c.pearson_p, "
+            "c.spearman_r, c.spearman_p "
+            "FROM correlations c JOIN runs r USING (run_id) WHERE c.x = ? AND c.y = ? ORDER BY c.run_id"
+        )
+        return self._query(sql, (x, y))
+
+    def country_history(self, iso_code: str, metric: str = None, dataset: str = "country_level") -> pd.DataFrame:
+        """
+        A country's metrics across runs.
+        """
+        sql = (
+            "SELECT run_id, iso_code, country, metric, value FROM country_metrics "
+            "WHERE iso_code = ? AND dataset = ?"
+        )
+        params = (iso_code, dataset)
+        if metric is not None:
+            sql += " AND metric = ?"
+            params += (metric,)
+        return self._query(sql + " ORDER BY run_id, metric", params)
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Query the pipeline results store.")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Path to the SQLite results store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("runs", help="List recorded runs")
+
+    p_coef = sub.add_parser("coefficients", help="Compare a regression coefficient across runs")
+    p_coef.add_argument("--variable", required=True)
+    p_coef.add_argument("--model")
+
+    p_corr = sub.add_parser("correlations", help="Compare a correlation pair across runs")
+    p_corr.add_argument("--x", required=True)
+    p_corr.add_argument("--y", required=True)
+
+    p_country = sub.add_parser("country", help="Show a country's metrics across runs")
+    p_country.add_argument("--iso", required=True)
+    p_country.add_argument("--metric")
+
+    args = parser.parse_args(argv)
+    with ResultsStore(args.db) as store:
+        if args.command == "runs":
+            out = store.list_runs()
+        elif args.command == "coefficients":
+            out = store.compare_coefficients(args.variable, args.model)
+        elif args.command == "correlations":
+            out = store.compare_correlations(args.x, args.y)
+        else:
+            out = store.country_history(args.iso, args.metric)
+
+    print(out.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
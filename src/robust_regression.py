@@ -0,0 +1,367 @@
+"""
+Batched robust and quantile regression for the country-level models.
+
+All specifications share one design matrix (constant + x_cols). Each
+dependent variable is one specification, with its own missing-value mask,
+and they are solved together:
+
+- OLS once per specification. The nonrobust, HC0-HC3 and cluster-robust
+  covariances are then all sandwiches built from the same (X'X)^-1 and
+  residuals.
+- Huber M-estimation by IRLS with MAD scale, every specification iterating
+  in lockstep (H1 covariance, as statsmodels RLM).
+- Quantile regression by IRLS for every (specification, quantile) pair at
+  once, with the Hall-Sheather / Epanechnikov sandwich (as statsmodels
+  QuantReg's robust covariance).
+
+Inference follows statsmodels: t-tests for nonrobust OLS and quantile fits,
+normal tests for sandwich and Huber covariances.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+COV_TYPES = ("nonrobust", "HC0", "HC1", "HC2", "HC3", "cluster")
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+HUBER_T = 1.345
+
+
+@dataclass(frozen=True)
+class RegressionResult:
+    """
+    Fitted model exposing the attributes summarise_model() reads.
+    """
+    params: pd.Series
+    bse: pd.Series
+    pvalues: pd.Series
+    rsquared: float
+    nobs: int
+    fittedvalues: pd.Series
+    resid: pd.Series
+    estimator: str
+    cov_type: str
+    quantile: float = None
+
+
+def _design(df: pd.DataFrame, y_cols: list, x_cols: list, cluster_col: str = None):
+    """
+    Shared design X (n, k) with a constant, stacked outcomes Y (S, n) and
+    per-specification masks (S, n). Rows missing any regressor (or the
+    cluster label) are dropped for all specifications.
+    """
+    required = {*y_cols, *x_cols} | ({cluster_col} if cluster_col else set())
+    missing = required - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    keep = df[list(x_cols)].notna().all(axis=1)
+    if cluster_col:
+        keep &= df[cluster_col].notna()
+    data = df[keep]
+
+    X = np.column_stack([np.ones(len(data)), data[list(x_cols)].to_numpy(dtype=np.float64)])
+    Y = data[list(y_cols)].to_numpy(dtype=np.float64).T
+    mask = ~np.isnan(Y)
+    Y = np.where(mask, Y, 0.0)
+    groups = pd.factorize(data[cluster_col])[0] if cluster_col else None
+    return data.index, X, Y, mask, groups
+
+
+def _weighted_solve(X, Y, W):
+    """
+    Weighted least squares for every row of Y / W at once.
+    Returns coefficients (S, k) and (X'WX)^-1 (S, k, k).
+    """
+    XtWX = np.einsum("sn,nk,nl->skl", W, X, X)
+    XtWy = np.einsum("sn,nk,sn->sk", W, X, Y)
+    inv = np.linalg.pinv(XtWX)
+    return np.einsum("skl,sl->sk", inv, XtWy), inv
+
+
+def _ols_batch(X, Y, mask, cov_types, groups=None):
+    """
+    OLS per specification and the requested covariance matrices.
+    Returns (beta, {cov_type: cov}, resid, n_obs, r_squared).
+    """
+    W = mask.astype(np.float64)
+    beta, xtx_inv = _weighted_solve(X, Y, W)
+    resid = (Y - beta @ X.T) * W
+    n = W.sum(axis=1)
+    k = X.shape[1]
+
+    y_mean = (Y * W).sum(axis=1) / n
+    sst = (((Y - y_mean[:, None]) * W) ** 2).sum(axis=1)
+    ssr = (resid ** 2).sum(axis=1)
+    r_squared = 1 - ssr / sst
+
+    covs = {}
+    if "nonrobust" in cov_types:
+        covs["nonrobust"] = xtx_inv * (ssr / (n - k))[:, None, None]
+
+    hc = [c for c in cov_types if c.startswith("HC")]
+    if hc:
+        # Leverage h_i = x_i' (X'X)^-1 x_i, then one stacked meat for all HC types
+        h = np.einsum("nk,skl,nl->sn", X, xtx_inv, X) * W
+        e2 = resid ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            omegas = {
+                "HC0": e2,
+                "HC1": e2 * (n / (n - k))[:, None],
+                "HC2": np.where(mask, e2 / (1 - h), 0.0),
+                "HC3": np.where(mask, e2 / (1 - h) ** 2, 0.0),
+            }
+        omega = np.stack([omegas[c] for c in hc])
+        meat = np.einsum("tsn,nk,nl->tskl", omega, X, X)
+        bread = xtx_inv[None]
+        sandwiches = bread @ meat @ bread
+        covs.update(zip(hc, sandwiches))
+
+    if "cluster" in cov_types:
+        if groups is None:
+            raise ValueError("cluster_col is required for cluster-robust covariance")
+        one_hot = np.zeros((groups.max() + 1, len(groups)))
+        one_hot[groups, np.arange(len(groups))] = 1.0
+        scores = np.einsum("gn,sn,nk->sgk", one_hot, resid, X)
+        meat = np.einsum("sgk,sgl->skl", scores, scores)
+        n_groups = (np.einsum("gn,sn->sg", one_hot, W) > 0).sum(axis=1)
+        correction = n_groups / (n_groups - 1) * (n - 1) / (n - k)
+        covs["cluster"] = xtx_inv @ meat @ xtx_inv * correction[:, None, None]
+
+    return beta, covs, resid, n, r_squared
+
+
+def _masked_mad(values, mask):
+    """
+    Normalised median absolute deviation about zero, per row.
+    """
+    return np.nanmedian(np.where(mask, np.abs(values), np.nan), axis=1) / stats.norm.ppf(0.75)
+
+
+def _huber_batch(X, Y, mask, t: float = HUBER_T, max_iter: int = 100, tol: float = 1e-10):
+    """
+    Huber M-estimates for every specification by IRLS, starting from OLS,
+    with the scale re-estimated (MAD) after each step.
+    Returns (beta, cov, resid, n_obs).
+    """
+    W = mask.astype(np.float64)
+    beta, _ = _weighted_solve(X, Y, W)
+    scale = _masked_mad(Y - beta @ X.T, mask)
+
+    for _ in range(max_iter):
+        z = (Y - beta @ X.T) / scale[:, None]
+        weights = np.where(np.abs(z) <= t, 1.0, t / np.maximum(np.abs(z), t)) * W
+        new_beta, _ = _weighted_solve(X, Y, weights)
+        scale = _masked_mad(Y - new_beta @ X.T, mask)
+        change = np.abs(new_beta - beta).max()
+        beta = new_beta
+        if change < tol * max(1.0, np.abs(beta).max()):
+            break
+
+    resid = (Y - beta @ X.T) * W
+    n = W.sum(axis=1)
+    k = X.shape[1]
+    z = resid / scale[:, None]
+    inside = (np.abs(z) <= t) & mask
+    psi = np.clip(z, -t, t) * W
+
+    # H1 covariance (Huber 1981), as statsmodels RLM
+    m = inside.sum(axis=1) / n
+    var_deriv = m - m ** 2
+    kappa = 1 + k / n * var_deriv / m ** 2
+    xtx_inv = np.linalg.pinv(np.einsum("sn,nk,nl->skl", W, X, X))
+    factor = kappa ** 2 * ((psi ** 2).sum(axis=1) / (n - k) * scale ** 2) / m ** 2
+    return beta, xtx_inv * factor[:, None, None], resid, n
+
+
+def _row_percentile(values, pct):
+    """
+    Linearly interpolated percentile of each row, ignoring NaN; pct may be a
+    scalar or one value per row.
+    """
+    ordered = np.sort(values, axis=1)  # NaN sorts last
+    n = (~np.isnan(values)).sum(axis=1)
+    pos = np.broadcast_to(np.asarray(pct, dtype=np.float64), n.shape) / 100 * (n - 1)
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, n - 1)
+    rows = np.arange(len(values))
+    return ordered[rows, lo] + (pos - lo) * (ordered[rows, hi] - ordered[rows, lo])
+
+
+def _hall_sheather(n, q, alpha: float = 0.05):
+    z = stats.norm.ppf(q)
+    return (
+        n ** (-1 / 3)
+        * stats.norm.ppf(1 - alpha / 2) ** (2 / 3)
+        * (1.5 * stats.norm.pdf(z) ** 2 / (2 * z ** 2 + 1)) ** (1 / 3)
+    )
+
+
+def _quantile_batch(X, Y, mask, quantiles, max_iter: int = 1000, tol: float = 1e-6):
+    """
+    Quantile regression for every (specification, quantile) pair by IRLS,
+    all pairs updated in one batched solve per iteration.
+    Inputs are already expanded so row b of Y / mask goes with quantiles[b].
+    Returns (beta, cov, resid, n_obs, pseudo_r_squared).
+    """
+    q = np.asarray(quantiles, dtype=np.float64)[:, None]
+    W = mask.astype(np.float64)
+    beta = np.ones((len(Y), X.shape[1]))
+    active = np.ones(len(Y), dtype=bool)
+    weights = W.copy()
+
+    for _ in range(max_iter):
+        new_beta, _ = _weighted_solve(X, Y[active], weights[active])
+        change = np.abs(new_beta - beta[active]).max(axis=1)
+        beta[active] = new_beta
+
+        resid = Y[active] - new_beta @ X.T
+        resid = np.where(np.abs(resid) < 1e-6, np.where(resid >= 0, 1e-6, -1e-6), resid)
+        # Check-loss IRLS weights: q / |r| above the fit, (1 - q) / |r| below
+        qa = q[active]
+        weights[active] = np.where(resid > 0, qa, 1 - qa) / np.abs(resid) * W[active]
+
+        done = np.flatnonzero(active)[change <= tol]
+        active[done] = False
+        if not active.any():
+            break
+
+    resid = (Y - beta @ X.T) * W
+    n = W.sum(axis=1)
+    e = np.where(mask, resid, np.nan)
+    y = np.where(mask, Y, np.nan)
+
+    # Sparsity at the quantile: Epanechnikov kernel, Hall-Sheather bandwidth
+    iqr = _row_percentile(e, 75) - _row_percentile(e, 25)
+    qv = q[:, 0]
+    h = _hall_sheather(n, qv)
+    h = np.minimum(np.nanstd(y, axis=1), iqr / 1.34) * (stats.norm.ppf(qv + h) - stats.norm.ppf(qv - h))
+    u = e / h[:, None]
+    kernel = np.where(np.abs(u) <= 1, 0.75 * (1 - u ** 2), 0.0)
+    fhat = np.nansum(kernel, axis=1) / (n * h)
+
+    d = np.where(resid > 0, (q / fhat[:, None]) ** 2, ((1 - q) / fhat[:, None]) ** 2) * W
+    xtx_inv = np.linalg.pinv(np.einsum("sn,nk,nl->skl", W, X, X))
+    cov = xtx_inv @ np.einsum("sn,nk,nl->skl", d, X, X) @ xtx_inv
+
+    # Koenker-Machado pseudo R^2 against the unconditional quantile
+    def check_loss(r):
+        return np.nansum(np.where(r < 0, (q - 1) * r, q * r), axis=1)
+
+    pseudo_r2 = 1 - check_loss(e) / check_loss(y - _row_percentile(y, qv * 100)[:, None])
+    return beta, cov, resid, n, pseudo_r2
+
+
+def _inference(beta, cov, dof=None):
+    se = np.sqrt(np.diagonal(cov, axis1=-2, axis2=-1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.abs(beta / se)
+    if dof is None:
+        p = 2 * stats.norm.sf(z)
+    else:
+        p = 2 * stats.t.sf(z, np.asarray(dof)[:, None])
+    return se, p
+
+
+def fit_regressions(country_df: pd.DataFrame, y_cols: list, x_cols: list, cov_types: tuple = COV_TYPES,
+                    huber: bool = True, quantiles: tuple = QUANTILES, cluster_col: str = None) -> pd.DataFrame:
+    """
+    Fit OLS (with every covariance in cov_types), Huber and quantile
+    regressions of each y in y_cols on x_cols, batched across specifications.
+    'cluster' is skipped unless cluster_col is given.
+    Returns the summarise_model() columns plus model (the y column),
+    estimator, cov_type, quantile and n_obs, one row per coefficient.
+    """
+    if cluster_col is None:
+        cov_types = tuple(c for c in cov_types if c != "cluster")
+    unknown = set(cov_types) - set(COV_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown covariance types: {sorted(unknown)}")
+
+    _, X, Y, mask, groups = _design(country_df, y_cols, x_cols, cluster_col)
+    k = X.shape[1]
+    variables = ["const", *x_cols]
+    frames = []
+
+    def add(beta, se, p, r2, n, estimator, cov_type, quantile_values, models):
+        for b in range(len(beta)):
+            frames.append(pd.DataFrame({
+                "model": models[b],
+                "estimator": estimator,
+                "cov_type": cov_type,
+                "quantile": quantile_values[b],
+                "variable": variables,
+                "coefficient": beta[b],
+                "std_error": se[b],
+                "p_value": p[b],
+                "r_squared": r2[b],
+                "n_obs": int(n[b]),
+            }))
+
+    no_q = [np.nan] * len(y_cols)
+    if cov_types:
+        beta, covs, _, n, r2 = _ols_batch(X, Y, mask, cov_types, groups)
+        for cov_type in cov_types:
+            se, p = _inference(beta, covs[cov_type], n - k if cov_type == "nonrobust" else None)
+            add(beta, se, p, r2, n, "ols", cov_type, no_q, list(y_cols))
+
+    if huber:
+        beta, cov, _, n = _huber_batch(X, Y, mask)
+        se, p = _inference(beta, cov)
+        add(beta, se, p, np.full(len(beta), np.nan), n, "huber", "H1", no_q, list(y_cols))
+
+    if quantiles:
+        # One problem per (specification, quantile)
+        spec = np.repeat(np.arange(len(y_cols)), len(quantiles))
+        q = np.tile(np.asarray(quantiles, dtype=np.float64), len(y_cols))
+        beta, cov, _, n, r2 = _quantile_batch(X, Y[spec], mask[spec], q)
+        se, p = _inference(beta, cov, n - k)
+        add(beta, se, p, r2, n, "quantile", "robust", q, [y_cols[i] for i in spec])
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def run_robust_regression(country_df: pd.DataFrame, y_col: str, x_cols: list, estimator: str = "ols",
+                          cov_type: str = "HC3", quantile: float = 0.5, cluster_col: str = None) -> RegressionResult:
+    """
+    Single robust fit with the attributes summarise_model() expects.
+    estimator: 'ols' (with cov_type from COV_TYPES), 'huber' or 'quantile'.
+    """
+    if estimator not in {"ols", "huber", "quantile"}:
+        raise ValueError(f"Unknown estimator: {estimator}")
+    if estimator == "ols" and cov_type not in COV_TYPES:
+        raise ValueError(f"Unknown covariance type: {cov_type}")
+    if estimator == "quantile" and not 0 < quantile < 1:
+        raise ValueError(f"quantile must be strictly between 0 and 1, got {quantile}")
+
+    index, X, Y, mask, groups = _design(country_df, [y_col], x_cols, cluster_col)
+    k = X.shape[1]
+    if estimator == "ols":
+        beta, covs, resid, n, r2 = _ols_batch(X, Y, mask, (cov_type,), groups)
+        se, p = _inference(beta, covs[cov_type], n - k if cov_type == "nonrobust" else None)
+    elif estimator == "huber":
+        beta, cov, resid, n = _huber_batch(X, Y, mask)
+        se, p = _inference(beta, cov)
+        r2, cov_type = [np.nan], "H1"
+    else:
+        beta, cov, resid, n, r2 = _quantile_batch(X, Y, mask, [quantile])
+        se, p = _inference(beta, cov, n - k)
+        cov_type = "robust"
+
+    variables = pd.Index(["const", *x_cols])
+    rows = index[mask[0]]
+    return RegressionResult(
+        params=pd.Series(beta[0], index=variables),
+        bse=pd.Series(se[0], index=variables),
+        pvalues=pd.Series(p[0], index=variables),
+        rsquared=float(r2[0]),
+        nobs=int(n[0]),
+        fittedvalues=pd.Series((X @ beta[0])[mask[0]], index=rows),
+        resid=pd.Series(resid[0][mask[0]], index=rows),
+        estimator=estimator,
+        cov_type=cov_type,
+        quantile=quantile if estimator == "quantile" else None,
+    )
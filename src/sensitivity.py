@@ -0,0 +1,332 @@
+"""
+Monte Carlo sensitivity of the country-level results to sample construction.
+
+The pipeline builds its sample by deletion (drop_missing_core, then
+retain_countries_with_min_years) and treats GDP per capita as exact. Here the
+merged panel is laid out once as dense (country x year) arrays and every draw
+perturbs it:
+
+- imputation: missing CO2 / GDP values inside a country's observed year span
+  are drawn from the country's linear trend plus normal noise with the
+  country's residual standard deviation (stochastic regression imputation);
+- measurement error: GDP per capita is multiplied by mean-one lognormal noise;
+- subsampling: a random fraction of countries is kept.
+
+Features (growth, averages, volatility, baseline GDP), the minimum-years rule,
+the OLS regressions and the correlations are then recomputed for a whole block
+of draws at once with array kernels (masked normal equations, batched solves).
+Blocks run in a process pool. Every block has its own seed spawned from one
+SeedSequence, so results do not depend on the number of workers.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+Y_COLS = ("gdp_growth_volatility", "mean_gdp_growth")
+X_COLS = ("avg_co2_per_capita", "baseline_gdp_pc")
+
+
+@dataclass(frozen=True)
+class SensitivityResult:
+    draws: pd.DataFrame
+    summary: pd.DataFrame
+
+
+def _panel_grid(df: pd.DataFrame, start_year: int, end_year: int):
+    """
+    (country x year) arrays of CO2 and GDP per capita, NaN where missing,
+    plus a mask of the cells inside each country's observed year span.
+    """
+    required = {"iso_code", "year", "co2_per_capita", "gdp_per_capita"}
+    missing = required - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    df = df[(df["year"] >= start_year) & (df["year"] <= end_year)]
+    country_idx, iso_codes = pd.factorize(df["iso_code"], sort=True)
+    year_idx = df["year"].to_numpy(dtype=np.int64) - start_year
+    shape = (len(iso_codes), end_year - start_year + 1)
+
+    co2 = np.full(shape, np.nan)
+    gdp = np.full(shape, np.nan)
+    co2[country_idx, year_idx] = df["co2_per_capita"].to_numpy(dtype=np.float64, na_value=np.nan)
+    gdp[country_idx, year_idx] = df["gdp_per_capita"].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    cols = np.arange(shape[1])
+    listed = np.zeros(shape, dtype=bool)
+    listed[country_idx, year_idx] = True
+    first = np.where(listed, cols, shape[1]).min(axis=1, keepdims=True)
+    last = np.where(listed, cols, -1).max(axis=1, keepdims=True)
+    span = (cols >= first) & (cols <= last)
+    return np.asarray(iso_codes), co2, gdp, span
+
+
+def _trend_model(values: np.ndarray):
+    """
+    Per-country OLS trend of values on year position over observed cells.
+    Returns fitted values for every cell and the residual standard deviation
+    (NaN fit where a country has fewer than three observations).
+    """
+    t = np.arange(values.shape[1], dtype=np.float64)
+    obs = ~np.isnan(values)
+    n = obs.sum(axis=1)
+    v = np.where(obs, values, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_mean = (obs * t).sum(axis=1) / n
+        v_mean = v.sum(axis=1) / n
+        dt = np.where(obs, t - t_mean[:, None], 0.0)
+        slope = (dt * (v - v_mean[:, None])).sum(axis=1) / (dt ** 2).sum(axis=1)
+        slope = np.where(np.isfinite(slope), slope, 0.0)
+        fit = v_mean[:, None] + slope[:, None] * (t - t_mean[:, None])
+        resid = np.where(obs, values - fit, 0.0)
+        sd = np.sqrt((resid ** 2).sum(axis=1) / (n - 2))
+
+    fit[n < 3] = np.nan
+    return fit, sd
+
+
+def _impute(values, fit, sd, span, rng, n_draws):
+    """
+    Draws of values with missing in-span cells replaced by trend + noise
+    (clipped at zero). Shape (n_draws, country, year).
+    """
+    draws = np.broadcast_to(values, (n_draws, *values.shape)).copy()
+    fill = span & np.isnan(values) & ~np.isnan(fit)
+    c, y = np.nonzero(fill)
+    noise = rng.standard_normal((n_draws, len(c)))
+    draws[:, c, y] = np.maximum(fit[c, y] + sd[c] * noise, 0.0)
+    return draws
+
+
+def _country_features(co2, gdp, present, baseline_col):
+    """
+    Country-level averages, growth mean / volatility and baseline GDP for a
+    block of draws (arrays shaped draw x country x year). Growth follows
+    pct_change over the present rows, as add_gdp_growth does.
+    """
+    n_years = co2.shape[-1]
+    cols = np.arange(n_years)
+
+    # Index of the previous present year for every cell
+    last_seen = np.maximum.accumulate(np.where(present, cols, -1), axis=-1)
+    prev = np.concatenate([np.full(last_seen.shape[:-1] + (1,), -1), last_seen[..., :-1]], axis=-1)
+    prev_gdp = np.take_along_axis(gdp, np.maximum(prev, 0), axis=-1)
+    has_growth = present & (prev >= 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = np.where(has_growth, gdp / prev_gdp - 1, np.nan)
+    growth[~np.isfinite(growth)] = np.nan
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        n = present.sum(axis=-1)
+        avg_co2 = np.where(present, co2, 0.0).sum(axis=-1) / n
+        avg_gdp = np.where(present, gdp, 0.0).sum(axis=-1) / n
+        g_ok = ~np.isnan(growth)
+        n_g = g_ok.sum(axis=-1)
+        mean_growth = np.where(g_ok, growth, 0.0).sum(axis=-1) / n_g
+        dev = np.where(g_ok, growth - mean_growth[..., None], 0.0)
+        volatility = np.sqrt((dev ** 2).sum(axis=-1) / (n_g - 1))
+
+    if 0 <= baseline_col < n_years:
+        baseline = np.where(present[..., baseline_col], gdp[..., baseline_col], np.nan)
+    else:
+        baseline = np.full(avg_co2.shape, np.nan)
+
+    return {
+        "avg_co2_per_capita": avg_co2,
+        "mean_gdp_growth": mean_growth,
+        "gdp_growth_volatility": volatility,
+        "avg_gdp_per_capita": avg_gdp,
+        "baseline_gdp_pc": baseline,
+    }, n
+
+
+def _batched_ols(y, X, w):
+    """
+    OLS for every draw at once: y (D, C), X (D, C, K), w (D, C) 0/1 weights.
+    Returns coefficients and two-sided p-values, each (D, K).
+    """
+    Xw = X * w[..., None]
+    # Scale columns for a well-conditioned normal-equation solve
+    scale = np.abs(X).max(axis=(0, 1))
+    scale[scale == 0] = 1.0
+    Xs, Xws = X / scale, Xw / scale
+
+    XtX = np.einsum("dck,dcl->dkl", Xws, Xs)
+    Xty = np.einsum("dck,dc->dk", Xws, y * w)
+    n_obs = w.sum(axis=1)
+    k = X.shape[-1]
+
+    coef = np.full((len(y), k), np.nan)
+    p_value = np.full((len(y), k), np.nan)
+    ok = (n_obs > k) & (np.linalg.matrix_rank(XtX) == k)
+    if ok.any():
+        inv = np.linalg.inv(XtX[ok])
+        b = np.einsum("dkl,dl->dk", inv, Xty[ok])
+        resid = (y[ok] - np.einsum("dck,dk->dc", Xs[ok], b)) * w[ok]
+        dof = n_obs[ok] - k
+        sigma2 = (resid ** 2).sum(axis=1) / dof
+        se = np.sqrt(np.diagonal(inv, axis1=1, axis2=2) * sigma2[:, None])
+        coef[ok] = b / scale
+        p_value[ok] = 2 * stats.t.sf(np.abs(b / se), dof[:, None])
+    return coef, p_value
+
+
+def _masked_pearson(x, y, w):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        n = w.sum(axis=1)
+        mx = (x * w).sum(axis=1) / n
+        my = (y * w).sum(axis=1) / n
+        dx = (x - mx[:, None]) * w
+        dy = (y - my[:, None]) * w
+        return (dx * dy).sum(axis=1) / np.sqrt((dx ** 2).sum(axis=1) * (dy ** 2).sum(axis=1))
+
+
+def _simulate_block(seed, n_draws, co2, gdp, span, impute, gdp_noise, subsample,
+                    min_years, baseline_col, y_cols, x_cols):
+    """
+    Run n_draws perturbed pipelines. Returns a dict of arrays keyed by
+    statistic, each shaped (n_draws, ...).
+    """
+    rng = np.random.default_rng(seed)
+    n_c = co2.shape[0]
+
+    if impute:
+        co2_fit, co2_sd = _trend_model(co2)
+        gdp_fit, gdp_sd = _trend_model(gdp)
+        co2_d = _impute(co2, co2_fit, co2_sd, span, rng, n_draws)
+        gdp_d = _impute(gdp, gdp_fit, gdp_sd, span, rng, n_draws)
+    else:
+        co2_d = np.broadcast_to(co2, (n_draws, *co2.shape))
+        gdp_d = np.broadcast_to(gdp, (n_draws, *gdp.shape)).copy()
+
+    if gdp_noise > 0:
+        gdp_d = gdp_d * np.exp(gdp_noise * rng.standard_normal(gdp_d.shape) - gdp_noise ** 2 / 2)
+
+    present = ~np.isnan(co2_d) & ~np.isnan(gdp_d)
+    features, n_years = _country_features(co2_d, gdp_d, present, baseline_col)
+
+    keep = n_years >= min_years
+    if subsample < 1:
+        n_keep = max(1, int(round(subsample * n_c)))
+        chosen = np.argsort(rng.random((n_draws, n_c)), axis=1)[:, :n_keep]
+        sampled = np.zeros((n_draws, n_c), dtype=bool)
+        np.put_along_axis(sampled, chosen, True, axis=1)
+        keep &= sampled
+
+    # compute_country_level_dataset drops countries with any missing feature
+    for values in features.values():
+        keep &= np.isfinite(values)
+    w = keep.astype(np.float64)
+    clean = {name: np.where(keep, values, 0.0) for name, values in features.items()}
+
+    X = np.stack([np.ones((n_draws, n_c))] + [clean[c] for c in x_cols], axis=-1)
+    out = {"n_countries": keep.sum(axis=1)}
+    for y_col in y_cols:
+        coef, p_value = _batched_ols(clean[y_col], X, w)
+        out[("coefficient", y_col)] = coef
+        out[("p_value", y_col)] = p_value
+
+        x = clean[x_cols[0]]
+        out[("pearson_r", y_col)] = _masked_pearson(x, clean[y_col], w)
+        ranks_x = stats.rankdata(np.where(keep, x, np.nan), axis=1, nan_policy="omit")
+        ranks_y = stats.rankdata(np.where(keep, clean[y_col], np.nan), axis=1, nan_policy="omit")
+        out[("spearman_r", y_col)] = _masked_pearson(
+            np.nan_to_num(ranks_x), np.nan_to_num(ranks_y), w
+        )
+    return out
+
+
+def _to_long(block: dict, first_draw: int, x_cols) -> pd.DataFrame:
+    n_draws = len(block["n_countries"])
+    draw = np.arange(first_draw, first_draw + n_draws)
+    variables = ["const", *x_cols]
+    frames = []
+    for key, values in block.items():
+        if key == "n_countries":
+            continue
+        statistic, target = key
+        if values.ndim == 2:
+            for j, var in enumerate(variables):
+                frames.append(pd.DataFrame({"draw": draw, "statistic": statistic, "target": target,
+                                            "variable": var, "value": values[:, j]}))
+        else:
+            frames.append(pd.DataFrame({"draw": draw, "statistic": statistic, "target": target,
+                                        "variable": x_cols[0], "value": values}))
+    out = pd.concat(frames, ignore_index=True)
+    out["n_countries"] = np.tile(block["n_countries"], len(frames))
+    return out
+
+
+def summarise_draws(draws: pd.DataFrame) -> pd.DataFrame:
+    """
+    Distribution of each statistic across draws: mean, std, 2.5 / 50 / 97.5
+    percentiles and the share of positive draws. For p-values the share is
+    replaced by the share of draws significant at 5%.
+    """
+    grouped = draws.dropna(subset=["value"]).groupby(["statistic", "target", "variable"], sort=False)["value"]
+    summary = grouped.agg(
+        n_draws="count",
+        mean="mean",
+        std="std",
+        p2_5=lambda v: v.quantile(0.025),
+        median="median",
+        p97_5=lambda v: v.quantile(0.975),
+        share_positive=lambda v: (v > 0).mean(),
+        share_significant=lambda v: (v < 0.05).mean(),
+    ).reset_index()
+    is_p = summary["statistic"] == "p_value"
+    summary.loc[is_p, "share_positive"] = np.nan
+    summary.loc[~is_p, "share_significant"] = np.nan
+    return summary
+
+
+def run_sensitivity(df: pd.DataFrame, n_draws: int = 1000, impute: bool = True, gdp_noise: float = 0.05,
+                    subsample: float = 0.8, start_year: int = 2000, end_year: int = 2023,
+                    min_years: int = 20, baseline_year: int = 2000, y_cols: tuple = Y_COLS,
+                    x_cols: tuple = X_COLS, seed: int = 0, n_workers: int | None = None,
+                    block_size: int = 250) -> SensitivityResult:
+    """
+    Monte Carlo over perturbed versions of the merged panel (before
+    drop_missing_core). gdp_noise is the log-scale standard deviation of the
+    GDP measurement error; subsample the fraction of countries kept per draw.
+    With impute=False, gdp_noise=0 and subsample=1 every draw reproduces the
+    pipeline's regressions.
+    n_workers defaults to the CPU count; n_workers=1 runs in-process.
+    Returns one row per draw and statistic, plus summarise_draws() of them.
+    """
+    unknown = {*y_cols, *x_cols} - {"avg_co2_per_capita", "mean_gdp_growth", "gdp_growth_volatility",
+                                    "avg_gdp_per_capita", "baseline_gdp_pc"}
+    if unknown:
+        raise ValueError(f"Unknown country-level columns: {unknown}")
+    if not 0 < subsample <= 1:
+        raise ValueError(f"subsample must be in (0, 1], got {subsample}")
+
+    iso_codes, co2, gdp, span = _panel_grid(df, start_year, end_year)
+
+    sizes = [min(block_size, n_draws - start) for start in range(0, n_draws, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    firsts = np.cumsum([0] + sizes[:-1])
+    args = [
+        (s, size, co2, gdp, span, impute, gdp_noise, subsample, min_years,
+         baseline_year - start_year, tuple(y_cols), tuple(x_cols))
+        for s, size in zip(seeds, sizes)
+    ]
+
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1 or len(args) <= 1:
+        blocks = [_simulate_block(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(args))) as pool:
+            futures = [pool.submit(_simulate_block, *a) for a in args]
+            blocks = [f.result() for f in futures]
+
+    draws = pd.concat([_to_long(b, first, tuple(x_cols)) for b, first in zip(blocks, firsts)],
+                      ignore_index=True)
+    return SensitivityResult(draws=draws, summary=summarise_draws(draws))
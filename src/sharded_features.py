@@ -0,0 +1,225 @@
+"""
+Country-sharded, multi-process feature engineering.
+
+Every per-country feature (growth, rolling stats, baseline GDP) only looks at
+one country's rows, so the sorted panel is split into contiguous country
+segments, grouped into shards of roughly equal row count, and processed in a
+process pool. Input and output columns live in shared-memory float64 buffers,
+so workers only receive buffer names and segment offsets, never pickled frames.
+The cross-country emission-group quantile cut runs once in the parent after
+reducing per-country CO2 sums and counts.
+
+Output matches add_gdp_growth -> add_rolling_features -> add_baseline_gdp
+-> add_emission_groups run on the whole panel.
+"""
+from __future__ import annotations
+
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.feature_engineering import label_emission_groups
+
+# Row order of the shared input / output buffers
+_INPUT_COLS = ["year", "co2_per_capita", "gdp_per_capita"]
+_N_OUTPUTS = 4  # growth, rolling co2 mean, rolling growth std, baseline gdp
+
+
+def country_segments(iso_codes: np.ndarray) -> np.ndarray:
+    """
+    Return (start, stop) row offsets of each country's block in an
+    iso_code-sorted array, as an (n_countries, 2) int array.
+    """
+    n = len(iso_codes)
+    if n == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    starts = np.concatenate([[0], np.flatnonzero(iso_codes[1:] != iso_codes[:-1]) + 1])
+    stops = np.concatenate([starts[1:], [n]])
+    return np.column_stack([starts, stops])
+
+
+def balance_shards(segments: np.ndarray, n_shards: int) -> list:
+    """
+    Assign country segments to n_shards so row counts are as even as possible
+    (greedy longest-first onto the lightest shard).
+    Returns a list of segment-index lists, each sorted, empty shards dropped.
+    """
+    sizes = segments[:, 1] - segments[:, 0]
+    heap = [(0, shard) for shard in range(max(1, n_shards))]
+    shards = [[] for _ in heap]
+
+    # Stable sort so ties are resolved by original order (deterministic)
+    for seg in np.argsort(-sizes, kind="stable"):
+        load, shard = heapq.heappop(heap)
+        shards[shard].append(int(seg))
+        heapq.heappush(heap, (load + int(sizes[seg]), shard))
+
+    return [sorted(s) for s in shards if s]
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing block. Pool workers share the parent's resource
+    tracker, so the parent stays responsible for unlinking.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+def _rolling(values: np.ndarray, pos: np.ndarray, window: int):
+    """
+    Rolling mean and sample std over concatenated country segments.
+    pos is each row's offset within its segment; windows that would cross
+    into the previous country are masked. Any NaN in a window makes that
+    window NaN, matching pandas' min_periods=window.
+    """
+    mean = np.full(len(values), np.nan)
+    std = np.full(len(values), np.nan)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        valid = pos[window - 1:] >= window - 1
+        mean[window - 1:] = np.where(valid, windows.mean(axis=1), np.nan)
+        if window > 1:
+            std[window - 1:] = np.where(valid, windows.std(axis=1, ddof=1), np.nan)
+    return mean, std
+
+
+def _shard_features(year, co2, gdp, lengths: np.ndarray, window: int, baseline_year: int):
+    """
+    Features for one shard's rows, laid out as consecutive country segments
+    of the given lengths, in one vectorised pass.
+    Returns (features, co2 sums, co2 counts) with per-segment sums/counts.
+    """
+    n = len(year)
+    seg_id = np.repeat(np.arange(len(lengths)), lengths)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+    pos = np.arange(n) - starts[seg_id]
+
+    out = np.full((_N_OUTPUTS, n), np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[0, 1:] = gdp[1:] / gdp[:-1] - 1
+    out[0, pos == 0] = np.nan
+
+    out[1], _ = _rolling(co2, pos, window)
+    _, out[2] = _rolling(out[0], pos, window)
+
+    baseline = np.full(len(lengths), np.nan)
+    hits = np.flatnonzero(year == baseline_year)
+    first_seg, first_hit = np.unique(seg_id[hits], return_index=True)
+    baseline[first_seg] = gdp[hits[first_hit]]
+    out[3] = baseline[seg_id]
+
+    observed = ~np.isnan(co2)
+    sums = np.bincount(seg_id, weights=np.where(observed, co2, 0.0), minlength=len(lengths))
+    counts = np.bincount(seg_id, weights=observed, minlength=len(lengths))
+    return out, sums, counts
+
+
+def _shard_worker(in_name: str, out_name: str, n_rows: int, segments: list,
+                  window: int, baseline_year: int):
+    """
+    Compute features for the given (start, stop) segments, writing results
+    straight into the shared output buffer.
+    Returns per-segment (co2 sums, co2 counts) for the emission-group reduction.
+    """
+    shm_in = _attach(in_name)
+    shm_out = _attach(out_name)
+    try:
+        inputs = np.ndarray((len(_INPUT_COLS), n_rows), dtype=np.float64, buffer=shm_in.buf)
+        outputs = np.ndarray((_N_OUTPUTS, n_rows), dtype=np.float64, buffer=shm_out.buf)
+
+        segs = np.asarray(segments, dtype=np.int64).reshape(-1, 2)
+        lengths = segs[:, 1] - segs[:, 0]
+        rows = np.repeat(segs[:, 0] - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+        rows += np.arange(lengths.sum())
+
+        year, co2, gdp = inputs[:, rows]
+        features, sums, counts = _shard_features(year, co2, gdp, lengths, window, baseline_year)
+        outputs[:, rows] = features
+
+        del inputs, outputs
+        return sums, counts
+    finally:
+        shm_in.close()
+        shm_out.close()
+
+
+def run_sharded_features(df: pd.DataFrame, n_workers: int | None = None, window: int = 5,
+                         baseline_year: int = 2000, n_groups: int = 3) -> pd.DataFrame:
+    """
+    Sharded equivalent of add_gdp_growth, add_rolling_features,
+    add_baseline_gdp and add_emission_groups.
+    n_workers defaults to the CPU count; n_workers=1 runs in-process.
+    """
+    required = {"iso_code", *_INPUT_COLS}
+    missing = required - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    out = df.sort_values(["iso_code", "year"]).reset_index(drop=True)
+    n_rows = len(out)
+    segments = country_segments(out["iso_code"].to_numpy())
+
+    n_workers = n_workers or os.cpu_count() or 1
+    shards = balance_shards(segments, n_workers)
+    shard_segments = [[tuple(segments[i]) for i in shard] for shard in shards]
+
+    nbytes = max(1, n_rows * 8)
+    shm_in = shared_memory.SharedMemory(create=True, size=len(_INPUT_COLS) * nbytes)
+    shm_out = shared_memory.SharedMemory(create=True, size=_N_OUTPUTS * nbytes)
+    try:
+        inputs = np.ndarray((len(_INPUT_COLS), n_rows), dtype=np.float64, buffer=shm_in.buf)
+        for i, col in enumerate(_INPUT_COLS):
+            inputs[i] = out[col].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        args = [(shm_in.name, shm_out.name, n_rows, segs, window, baseline_year) for segs in shard_segments]
+        if n_workers == 1 or len(args) <= 1:
+            partials = [_shard_worker(*a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=min(n_workers, len(args))) as pool:
+                futures = [pool.submit(_shard_worker, *a) for a in args]
+                partials = [f.result() for f in futures]
+
+        features = np.ndarray((_N_OUTPUTS, n_rows), dtype=np.float64, buffer=shm_out.buf).copy()
+        del inputs
+    finally:
+        shm_in.close()
+        shm_in.unlink()
+        shm_out.close()
+        shm_out.unlink()
+
+    out["gdp_pc_growth"] = features[0]
+    out[f"co2_pc_rolling_{window}y"] = features[1]
+    out[f"gdp_growth_volatility_{window}y"] = features[2]
+    out["baseline_gdp_pc"] = features[3]
+
+    # Reduce per-country CO2 sums/counts, then cut quantiles once
+    sums = np.zeros(len(segments))
+    counts = np.zeros(len(segments))
+    for shard, (shard_sums, shard_counts) in zip(shards, partials):
+        sums[shard] = shard_sums
+        counts[shard] = shard_counts
+
+    with np.errstate(invalid="ignore"):
+        avg = sums / counts
+    country_avg = pd.DataFrame(
+        {
+            "iso_code": out["iso_code"].to_numpy()[segments[:, 0]] if len(segments) else [],
+            "avg_co2_per_capita": avg,
+        }
+    )
+    country_avg = label_emission_groups(country_avg, n_groups=n_groups)
+
+    out = out.merge(
+        country_avg[["iso_code", "emission_group"]],
+        on="iso_code",
+        how="left"
+    )
+    return out
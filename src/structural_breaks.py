@@ -0,0 +1,121 @@
+"""
+Vectorised per-country structural-break detection.
+
+For each country's series, every admissible break point is scored with a
+Chow F-test comparing one regression over the whole period with separate
+regressions before and after the break. Segment residual sums of squares are
+read off cumulative sums of y, t, y^2, t^2 and t*y, so scoring all candidates
+is one O(n) scan per series, done for every country at once on a padded
+(country x position) grid, with no refit per candidate.
+
+The best break is the one with the largest F (sup-F). Because it is chosen
+after looking at all candidates, the pointwise Chow p-value is optimistic;
+p_value applies a Bonferroni correction over the candidates tested, which is
+conservative.
+"""
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def _segment_ssr(n, s_t, s_tt, s_y, s_ty, s_yy, model: str):
+    """
+    Residual sum of squares of y ~ 1 (model='mean') or y ~ 1 + t
+    (model='trend') from a segment's sums.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if model == "mean":
+            ssr = s_yy - s_y ** 2 / n
+        else:
+            det = n * s_tt - s_t ** 2
+            ssr = s_yy - (s_tt * s_y ** 2 - 2 * s_t * s_y * s_ty + n * s_ty ** 2) / det
+    return np.maximum(ssr, 0.0)
+
+
+def detect_structural_breaks(df: pd.DataFrame, value_col: str = "gdp_pc_growth", model: str = "mean",
+                             trim: float = 0.15, min_segment: int = 3) -> pd.DataFrame:
+    """
+    Find the most likely single break year in value_col for every iso_code.
+
+    model: 'mean' tests a shift in level, 'trend' a shift in level and slope.
+    Candidate breaks leave at least max(min_segment, trim * n) observations
+    on each side. Missing values are dropped before scanning.
+
+    Returns one row per iso_code with n_obs, n_candidates, break_year (first
+    year of the new regime), f_stat, chow_p_value and p_value (Bonferroni).
+    """
+    if model not in {"mean", "trend"}:
+        raise ValueError(f"Unknown break model: {model}")
+
+    required = {"iso_code", "year", value_col}
+    missing = required - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    q = 1 if model == "mean" else 2
+    data = df[["iso_code", "year", value_col]].dropna().sort_values(["iso_code", "year"])
+
+    country_idx, iso_codes = pd.factorize(data["iso_code"], sort=True)
+    n_countries = len(iso_codes)
+    n_rows = len(data)
+    starts = np.flatnonzero(np.r_[True, country_idx[1:] != country_idx[:-1]]) if n_rows else np.array([], int)
+    lengths = np.diff(np.r_[starts, n_rows]).astype(np.int64)
+    pos = np.arange(n_rows) - np.repeat(starts, lengths)
+    width = int(lengths.max()) if n_rows else 0
+
+    # Centre y and t per country to keep the sums well conditioned
+    y = data[value_col].to_numpy(dtype=np.float64)
+    t = data["year"].to_numpy(dtype=np.float64)
+    if n_rows:
+        y = y - (np.bincount(country_idx, weights=y) / lengths)[country_idx]
+        t = t - (np.bincount(country_idx, weights=t) / lengths)[country_idx]
+
+    def grid(values):
+        out = np.zeros((n_countries, width + 1))
+        out[country_idx, pos + 1] = values
+        return np.cumsum(out, axis=1)  # column k = sum over first k observations
+
+    ones = np.ones(n_rows)
+    cum = [grid(v) for v in (ones, t, t * t, y, t * y, y * y)]
+    total = [c[:, -1:] for c in cum]
+    first = cum
+    second = [tot - c for tot, c in zip(total, cum)]
+
+    n = lengths[:, None].astype(np.float64)
+    ssr_full = _segment_ssr(*total, model=model)
+    ssr_split = _segment_ssr(*first, model=model) + _segment_ssr(*second, model=model)
+
+    k = np.arange(width + 1)[None, :]
+    min_size = np.maximum(min_segment, np.ceil(trim * n)).astype(np.int64)
+    min_size = np.maximum(min_size, q + 1)
+    valid = (k >= min_size) & (n - k >= min_size)
+
+    dof = n - 2 * q
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f_stat = ((ssr_full - ssr_split) / q) / (ssr_split / dof)
+    f_stat = np.where(valid & np.isfinite(f_stat), f_stat, -np.inf)
+
+    best_k = np.argmax(f_stat, axis=1)
+    best_f = f_stat[np.arange(n_countries), best_k]
+    n_candidates = valid.sum(axis=1)
+    found = np.isfinite(best_f)
+
+    years = data["year"].to_numpy()
+    break_row = np.where(found, starts + np.minimum(best_k, lengths - 1), 0)
+    break_year = np.where(found, years[break_row] if n_rows else np.nan, np.nan)
+
+    best_f = np.where(found, best_f, np.nan)
+    chow_p = stats.f.sf(best_f, q, dof[:, 0])
+    p_value = np.minimum(1.0, chow_p * n_candidates)
+
+    return pd.DataFrame(
+        {
+            "iso_code": np.asarray(iso_codes, dtype=object),
+            "n_obs": lengths,
+            "n_candidates": n_candidates,
+            "break_year": break_year,
+            "f_stat": best_f,
+            "chow_p_value": chow_p,
+            "p_value": p_value,
+        }
+    )
@@ -1,6 +1,29 @@
+import importlib.util
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add the project root directory to Python path so `import src...` works
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
-sys.path.insert(0, str(PROJECT_ROOT))
\ No newline at end of file
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.backends import get_backend
+
+BACKEND_NAMES = [
+    "pandas",
+    pytest.param(
+        "polars",
+        marks=pytest.mark.skipif(
+            importlib.util.find_spec("polars") is None, reason="polars not installed"
+        ),
+    ),
+]
+
+
+@pytest.fixture(params=BACKEND_NAMES)
+def backend(request):
+    """
+    Execution backend (see src/backends.py); tests using it run once per backend.
+    """
+    return get_backend(request.param)
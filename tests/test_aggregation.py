@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.aggregation import aggregate_by_group, build_membership_matrix, membership_from_panel
+
+
+def make_panel():
+    return pd.DataFrame(
+        {
+            "iso_code": ["AAA", "AAA", "BBB", "BBB", "CCC", "CCC"],
+            "year": [2000, 2001, 2000, 2001, 2000, 2001],
+            "co2_per_capita": [1.0, 2.0, 3.0, np.nan, 5.0, 6.0],
+            "population": [10.0, 10.0, 30.0, 30.0, 60.0, 60.0],
+            "emission_group": ["low", "low", "mid", "mid", "high", "high"],
+        }
+    )
+
+
+def test_build_membership_matrix_supports_overlapping_groups():
+    membership = pd.DataFrame(
+        {
+            "iso_code": ["AAA", "BBB", "CCC", "CCC"],
+            "region": ["North", "North", "South", "North"],  # CCC is in both regions
+        }
+    )
+    matrix, groups = build_membership_matrix(membership, ["AAA", "BBB", "CCC"], ["region"])
+    assert groups.values.tolist() == [["world", "World"], ["region", "North"], ["region", "South"]]
+    np.testing.assert_array_equal(matrix.toarray(), [[1, 1, 1], [1, 1, 1], [0, 0, 1]])
+
+
+def test_aggregate_by_group_matches_weighted_groupby():
+    df = make_panel()
+    membership = membership_from_panel(df, ["emission_group"])
+    out = aggregate_by_group(df, membership, ["co2_per_capita"], ["emission_group"], weight_col="population")
+
+    world = out[out["grouping"] == "world"].set_index("year")
+    sub = df.dropna(subset=["co2_per_capita"])
+    expected = sub.groupby("year").apply(
+        lambda g: np.average(g["co2_per_capita"], weights=g["population"]), include_groups=False
+    )
+    np.testing.assert_allclose(world["co2_per_capita"], expected)
+    assert world["n_countries"].tolist() == [3, 3]
+
+    mid = out[(out["grouping"] == "emission_group") & (out["group"] == "mid")].set_index("year")
+    assert mid.loc[2000, "co2_per_capita"] == pytest.approx(3.0)
+    assert pd.isna(mid.loc[2001, "co2_per_capita"])
+
+
+def test_aggregate_by_group_defaults_to_equal_weights():
+    df = make_panel()
+    out = aggregate_by_group(df, membership_from_panel(df, []), ["co2_per_capita"], [])
+    assert out.set_index("year").loc[2000, "co2_per_capita"] == pytest.approx(3.0)
+
+
+def test_aggregate_by_group_rejects_duplicate_country_years():
+    df = make_panel()
+    df = pd.concat([df, df.iloc[[0]].assign(co2_per_capita=100.0)], ignore_index=True)
+    with pytest.raises(ValueError, match="Duplicate"):
+        aggregate_by_group(df, membership_from_panel(df, ["emission_group"]), ["co2_per_capita"], ["emission_group"])
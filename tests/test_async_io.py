@@ -0,0 +1,51 @@
+import threading
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytest
+
+from src.async_io import BackgroundWriter, save_figure, write_csv
+
+
+def test_background_writer_writes_csv_and_figures(tmp_path: Path):
+    df = pd.DataFrame({"a": [1, 2]})
+    with BackgroundWriter(max_pending=2):
+        write_csv(df, tmp_path / "tables" / "a.csv")
+        plt.figure()
+        plt.plot([0, 1], [0, 1])
+        save_figure(tmp_path / "figures" / "line.png")
+
+    assert pd.read_csv(tmp_path / "tables" / "a.csv")["a"].tolist() == [1, 2]
+    assert (tmp_path / "figures" / "line.png").read_bytes()[:4] == b"\x89PNG"
+    assert plt.get_fignums() == []
+
+
+def test_background_writer_bounds_pending_jobs():
+    release = threading.Event()
+    writer = BackgroundWriter(max_pending=1, workers=1)
+    writer.submit(release.wait)
+
+    blocked = threading.Thread(target=writer.submit, args=(lambda: None,))
+    blocked.start()
+    blocked.join(timeout=0.2)
+    assert blocked.is_alive()  # second job waits for a free slot
+
+    release.set()
+    blocked.join(timeout=5)
+    writer.close()
+    assert not blocked.is_alive()
+
+
+def test_background_writer_raises_write_errors_on_exit(tmp_path: Path):
+    def fail():
+        raise OSError("disk full")
+
+    with pytest.raises(OSError, match="disk full"):
+        with BackgroundWriter() as writer:
+            writer.submit(fail)
+
+
+def test_write_csv_is_synchronous_without_writer(tmp_path: Path):
+    path = write_csv(pd.DataFrame({"a": [1]}), tmp_path / "a.csv")
+    assert path.exists()
@@ -0,0 +1,95 @@
+import pandas as pd
+import pytest
+
+from src.backends import get_backend
+
+
+def run_pipeline(backend):
+    co2 = backend.load_co2_data("data/raw/owid_co2.csv")
+    gdp = backend.load_gdp_data("data/raw/owid_gdp_per_capita.csv")
+
+    co2 = backend.filter_time_range(backend.coerce_types(co2), 2000, 2023)
+    gdp = backend.filter_time_range(backend.coerce_types(gdp), 2000, 2023)
+
+    df = backend.merge_datasets(co2, gdp)
+    df = backend.drop_missing_core(df, ["co2_per_capita", "gdp_per_capita"])
+    df = backend.retain_countries_with_min_years(df, 20)
+
+    df = backend.add_gdp_growth(df)
+    df = backend.add_rolling_features(df, window=5)
+    df = backend.add_baseline_gdp(df, baseline_year=2000)
+    df = backend.add_emission_groups(df, n_groups=3)
+    return backend.to_pandas(df)
+
+
+def normalise(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.sort_values(["iso_code", "year"]).reset_index(drop=True)
+    for col in ["country", "iso_code", "emission_group"]:
+        out[col] = out[col].astype(str)
+    return out
+
+
+def test_full_pipeline_matches_pandas_backend(backend):
+    expected = normalise(run_pipeline(get_backend("pandas")))
+    out = normalise(run_pipeline(backend))
+
+    assert list(out.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(out, expected, check_dtype=False)
+
+
+def test_cleaning_steps_on_small_frames(backend):
+    co2_df = pd.DataFrame(
+        {
+            "country": ["A", "A", "B", "B"],
+            "iso_code": ["AAA", "AAA", "BBB", "BBB"],
+            "year": ["1999", "2000", "2000", "2001"],
+            "co2_per_capita": ["1.0", "1.1", "x", "2.1"],
+        }
+    )
+    gdp_df = pd.DataFrame(
+        {
+            "country": ["A", "A", "B", "B"],
+            "iso_code": ["AAA", "AAA", "BBB", "BBB"],
+            "year": [1999, 2000, 2000, 2001],
+            "gdp_per_capita": [90.0, 100.0, 200.0, 210.0],
+        }
+    )
+    co2 = backend.coerce_types(backend.from_pandas(co2_df))
+    gdp = backend.coerce_types(backend.from_pandas(gdp_df))
+    co2 = backend.filter_time_range(co2, 2000, 2001)
+
+    df = backend.merge_datasets(co2, gdp)
+    df = backend.drop_missing_core(df, ["co2_per_capita", "gdp_per_capita"])
+    out = backend.to_pandas(backend.retain_countries_with_min_years(df, 1))
+
+    assert {"country", "iso_code", "year", "co2_per_capita", "gdp_per_capita"}.issubset(out.columns)
+    # AAA-1999 is outside the window and BBB-2000 has a non-numeric CO2 value
+    assert sorted(zip(out["iso_code"], out["year"])) == [("AAA", 2000), ("BBB", 2001)]
+
+
+def test_feature_steps_on_small_frame(backend):
+    df = pd.DataFrame(
+        {
+            "country": ["A"] * 6,
+            "iso_code": ["AAA"] * 6,
+            "year": [2000, 2001, 2002, 2003, 2004, 2005],
+            "co2_per_capita": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+            "gdp_per_capita": [100, 110, 121, 133.1, 146.41, 161.051],
+        }
+    )
+    out = backend.from_pandas(df)
+    out = backend.add_gdp_growth(out)
+    out = backend.add_rolling_features(out, window=5)
+    out = backend.add_baseline_gdp(out, baseline_year=2000)
+    out = backend.to_pandas(backend.add_emission_groups(out, n_groups=3))
+
+    assert pd.isna(out.iloc[0]["gdp_pc_growth"])
+    assert out["gdp_pc_growth"].iloc[1:].round(6).eq(0.1).all()
+    assert out["co2_pc_rolling_5y"].iloc[-1] == pytest.approx(4.0)
+    assert (out["baseline_gdp_pc"] == 100).all()
+    assert (out["emission_group"].astype(str) == "mid").all()
+
+
+def test_get_backend_rejects_unknown_name():
+    with pytest.raises(ValueError):
+        get_backend("spark")
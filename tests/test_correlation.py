@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from src.correlation import correlation_matrix, all_pairs_correlations
+
+
+def make_metrics_df():
+    rng = np.random.default_rng(0)
+    a = rng.normal(size=40)
+    return pd.DataFrame(
+        {
+            "a": a,
+            "b": a * 0.5 + rng.normal(size=40),
+            "c": rng.normal(size=40),
+            "d": np.exp(a) + rng.normal(scale=0.1, size=40),
+        }
+    )
+
+
+def test_all_pairs_correlations_matches_scipy():
+    df = make_metrics_df()
+    out = all_pairs_correlations(df)
+
+    assert len(out) == 6  # 4 choose 2
+    for row in out.itertuples():
+        pr, pp = stats.pearsonr(df[row.x], df[row.y])
+        sr, sp = stats.spearmanr(df[row.x], df[row.y])
+        assert row.pearson_r == pytest.approx(pr)
+        assert row.pearson_p == pytest.approx(pp)
+        assert row.spearman_r == pytest.approx(sr)
+        assert row.spearman_p == pytest.approx(sp)
+
+
+def test_correlation_matrix_handles_missing_values_pairwise():
+    df = make_metrics_df()
+    df.loc[[1, 5, 9], "a"] = np.nan
+    df.loc[[2, 5], "b"] = np.nan
+
+    r = correlation_matrix(df, ["a", "b", "c"])
+    n = correlation_matrix(df, ["a", "b", "c"], stat="n")
+
+    both = df[["a", "b"]].dropna()
+    assert r.loc["a", "b"] == pytest.approx(stats.pearsonr(both["a"], both["b"])[0])
+    assert n.loc["a", "b"] == len(both)
+    assert n.loc["b", "c"] == 38
+    assert np.allclose(np.diag(r), 1.0)
+
+
+def test_all_pairs_correlations_respects_pair_order():
+    df = make_metrics_df()
+    out = all_pairs_correlations(df, pairs=[("c", "a"), ("a", "b")])
+    assert list(zip(out["x"], out["y"])) == [("c", "a"), ("a", "b")]
+
+
+def test_correlation_matrix_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        correlation_matrix(make_metrics_df(), method="kendall")
+
+
+def test_correlation_matrix_is_stable_for_large_offsets():
+    rng = np.random.default_rng(1)
+    a = rng.normal(size=200)
+    df = pd.DataFrame({"a": 1e9 + a, "b": 1e9 + a + rng.normal(scale=0.12, size=200)})
+
+    r = correlation_matrix(df)
+    assert r.loc["a", "b"] < 1.0
+    assert r.loc["a", "b"] == pytest.approx(df.corr().loc["a", "b"], rel=1e-6)
+
+
+def test_spearman_with_missing_values_ranks_complete_pairs():
+    df = make_metrics_df()
+    df.loc[[1, 5, 9, 20], "a"] = np.nan
+    df.loc[[2, 5, 30], "d"] = np.nan
+
+    out = all_pairs_correlations(df)
+    expected = df.corr(method="spearman")
+    for row in out.itertuples():
+        both = df[[row.x, row.y]].dropna()
+        sr, sp = stats.spearmanr(both[row.x], both[row.y])
+        assert row.spearman_r == pytest.approx(expected.loc[row.x, row.y])
+        assert row.spearman_r == pytest.approx(sr)
+        assert row.spearman_p == pytest.approx(sp)
@@ -1,15 +1,7 @@
 import pandas as pd
 
-from src.data_cleaning import (
-    coerce_types,
-    filter_time_range,
-    drop_missing_core,
-    retain_countries_with_min_years,
-    merge_datasets,
-)
 
-
-def test_coerce_types_converts_year_to_int_and_metrics_to_numeric():
+def test_coerce_types_converts_year_to_int_and_metrics_to_numeric(backend):
     df = pd.DataFrame(
         {
             "country": ["A"],
@@ -18,47 +10,49 @@ def test_coerce_types_converts_year_to_int_and_metrics_to_numeric():
             "co2_per_capita": ["1.23"],
         }
     )
-    out = coerce_types(df)
+    out = backend.to_pandas(backend.coerce_types(backend.from_pandas(df)))
     assert out["year"].dtype.kind in {"i"}  # int
     assert out["co2_per_capita"].dtype.kind in {"f", "i"}  # numeric
 
 
-def test_filter_time_range_filters_years_inclusive():
+def test_filter_time_range_filters_years_inclusive(backend):
     df = pd.DataFrame(
         {
             "iso_code": ["AAA", "AAA", "AAA"],
             "year": [1999, 2000, 2001],
         }
     )
-    out = filter_time_range(df, 2000, 2001)
+    out = backend.to_pandas(backend.filter_time_range(backend.from_pandas(df), 2000, 2001))
     assert out["year"].min() == 2000
     assert out["year"].max() == 2001
     assert len(out) == 2
 
 
-def test_drop_missing_core_drops_rows_with_missing_core_cols():
+def test_drop_missing_core_drops_rows_with_missing_core_cols(backend):
     df = pd.DataFrame(
         {
             "co2_per_capita": [1.0, None],
             "gdp_per_capita": [100.0, 200.0],
         }
     )
-    out = drop_missing_core(df, ["co2_per_capita", "gdp_per_capita"])
+    out = backend.to_pandas(
+        backend.drop_missing_core(backend.from_pandas(df), ["co2_per_capita", "gdp_per_capita"])
+    )
     assert len(out) == 1
 
 
-def test_retain_countries_with_min_years_keeps_only_valid():
+def test_retain_countries_with_min_years_keeps_only_valid(backend):
     df = pd.DataFrame(
         {
             "iso_code": ["AAA"] * 3 + ["BBB"] * 1,
             "year": [2000, 2001, 2002, 2000],
         }
     )
-    out = retain_countries_with_min_years(df, min_years=2)
+    out = backend.to_pandas(backend.retain_countries_with_min_years(backend.from_pandas(df), min_years=2))
     assert set(out["iso_code"].unique()) == {"AAA"}
 
 
-def test_merge_datasets_inner_merge_on_iso_year():
+def test_merge_datasets_inner_merge_on_iso_year(backend):
     co2_df = pd.DataFrame(
         {
             "country": ["A", "A", "B"],
@@ -75,7 +69,7 @@ def test_merge_datasets_inner_merge_on_iso_year():
             "gdp_per_capita": [100.0, 200.0],
         }
     )
-    merged = merge_datasets(co2_df, gdp_df)
+    merged = backend.to_pandas(backend.merge_datasets(backend.from_pandas(co2_df), backend.from_pandas(gdp_df)))
     assert {"country", "iso_code", "year", "co2_per_capita", "gdp_per_capita"}.issubset(merged.columns)
     # only rows with matching iso_code+year remain (AAA-2000 and BBB-2000)
-    assert len(merged) == 2
\ No newline at end of file
+    assert len(merged) == 2
@@ -1,3 +1,5 @@
+from functools import partial
+
 import pandas as pd
 import pytest
 
@@ -5,8 +7,7 @@ from src.data_loading import (
     standardise_owid_columns,
     validate_required_columns,
     drop_non_country_rows,
-    load_co2_data,
-    load_gdp_data,
+    load_concurrently,
 )
 
 
@@ -43,15 +44,25 @@ def test_drop_non_country_rows_removes_missing_iso_code():
     assert out.iloc[0]["iso_code"] == "AFG"
 
 
-def test_load_co2_data_outputs_standard_schema():
-    df = load_co2_data("data/raw/owid_co2.csv")
+def test_load_co2_data_outputs_standard_schema(backend):
+    df = backend.to_pandas(backend.load_co2_data("data/raw/owid_co2.csv"))
     assert list(df.columns) == ["country", "iso_code", "year", "co2_per_capita"]
     assert df["iso_code"].notna().all()
     assert df["year"].notna().all()
 
 
-def test_load_gdp_data_outputs_standard_schema():
-    df = load_gdp_data("data/raw/owid_gdp_per_capita.csv")
+def test_load_gdp_data_outputs_standard_schema(backend):
+    df = backend.to_pandas(backend.load_gdp_data("data/raw/owid_gdp_per_capita.csv"))
     assert list(df.columns) == ["country", "iso_code", "year", "gdp_per_capita"]
     assert df["iso_code"].notna().all()
-    assert df["year"].notna().all()
\ No newline at end of file
+    assert df["year"].notna().all()
+
+def test_load_concurrently_returns_results_by_key(backend):
+    out = load_concurrently(
+        {
+            "co2": partial(backend.load_co2_data, "data/raw/owid_co2.csv"),
+            "gdp": partial(backend.load_gdp_data, "data/raw/owid_gdp_per_capita.csv"),
+        }
+    )
+    assert "co2_per_capita" in out["co2"].columns
+    assert "gdp_per_capita" in out["gdp"].columns
@@ -0,0 +1,72 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_quality import cleaning_step_drops, combine_reports, profile_panel
+
+
+def make_panel():
+    # BBB is given out of year order; AAA has a duplicate 2001, a gap after
+    # 2001 and a jump in GDP from 2000 to 2001
+    return pd.DataFrame(
+        {
+            "iso_code": ["BBB", "BBB", "BBB", "AAA", "AAA", "AAA", "AAA"],
+            "year": [2002, 2000, 2001, 2000, 2001, 2001, 2004],
+            "co2_per_capita": [1.0, 2.0, np.nan, 1.0, 1.0, 1.0, 1.0],
+            "gdp_per_capita": [100.0, 100.0, 100.0, 100.0, 200.0, 200.0, 210.0],
+        }
+    )
+
+
+def test_profile_panel_per_country_checks():
+    report = profile_panel(make_panel())
+    countries = report.countries.set_index("iso_code")
+
+    assert countries.loc["AAA", "duplicate_rows"] == 1
+    assert countries.loc["AAA", "n_gaps"] == 1
+    assert countries.loc["AAA", "missing_years"] == 2
+    assert countries.loc["AAA", "coverage"] == 3 / 5
+    assert countries.loc["AAA", "growth_outliers"] == 1
+    assert not countries.loc["AAA", "non_monotonic"]
+    assert countries.loc["BBB", "non_monotonic"]
+    assert countries.loc["BBB", "missing_co2_per_capita"] == 1
+
+    issues = set(report.issues[["iso_code", "year", "issue"]].itertuples(index=False, name=None))
+    assert issues == {
+        ("AAA", 2001, "duplicate_key"),
+        ("AAA", 2001, "growth_outlier"),
+        ("AAA", 2004, "year_gap"),
+    }
+
+
+def test_cleaning_step_drops_fractions():
+    steps = cleaning_step_drops([("input", 10), ("filter", 8), ("merge", 6)])
+
+    assert [s["step"] for s in steps] == ["filter", "merge"]
+    assert [s["dropped"] for s in steps] == [2, 2]
+    assert steps[1]["dropped_fraction"] == 2 / 8
+
+
+def test_quality_report_is_json_serialisable(tmp_path):
+    report = profile_panel(make_panel(), step_rows=[("input", 9), ("clean", 7)])
+    path = report.to_json(tmp_path / "quality.json")
+
+    loaded = json.loads(path.read_text())
+    assert loaded["summary"]["duplicate_keys"] == 1
+    assert loaded["summary"]["cleaning_steps"][0]["dropped"] == 2
+    assert len(loaded["countries"]) == 2
+
+
+def test_combine_reports_equals_profile_of_union():
+    panel = make_panel()
+    steps = [("input", 9), ("clean", 7)]
+    parts = [panel[panel["iso_code"] == code] for code in ["BBB", "AAA"]]
+
+    combined = combine_reports([profile_panel(p) for p in parts], step_rows=steps)
+    expected = profile_panel(panel, step_rows=steps)
+
+    assert combined.to_dict() == expected.to_dict()
+    with pytest.raises(ValueError):
+        combine_reports([profile_panel(panel), profile_panel(parts[0])])
@@ -1,11 +1,15 @@
+import numpy as np
 import pandas as pd
+import pytest
 
 from src.feature_engineering import (
     add_gdp_growth,
-    add_rolling_features,
     add_baseline_gdp,
     add_emission_groups,
     summarise_country_metrics,
+    add_lag_features,
+    add_ewm_features,
+    emission_group_transitions,
 )
 
 
@@ -21,30 +25,30 @@ def make_small_df():
     )
 
 
-def test_add_gdp_growth_creates_column_and_first_is_nan():
-    df = make_small_df()
-    out = add_gdp_growth(df)
+def test_add_gdp_growth_creates_column_and_first_is_nan(backend):
+    df = backend.from_pandas(make_small_df())
+    out = backend.to_pandas(backend.add_gdp_growth(df))
     assert "gdp_pc_growth" in out.columns
     assert pd.isna(out.sort_values("year").iloc[0]["gdp_pc_growth"])
 
 
-def test_add_rolling_features_creates_columns():
-    df = add_gdp_growth(make_small_df())
-    out = add_rolling_features(df, window=5)
+def test_add_rolling_features_creates_columns(backend):
+    df = backend.add_gdp_growth(backend.from_pandas(make_small_df()))
+    out = backend.to_pandas(backend.add_rolling_features(df, window=5))
     assert "co2_pc_rolling_5y" in out.columns
     assert "gdp_growth_volatility_5y" in out.columns
 
 
-def test_add_baseline_gdp_sets_baseline_value():
-    df = make_small_df()
-    out = add_baseline_gdp(df, baseline_year=2000)
+def test_add_baseline_gdp_sets_baseline_value(backend):
+    df = backend.from_pandas(make_small_df())
+    out = backend.to_pandas(backend.add_baseline_gdp(df, baseline_year=2000))
     assert "baseline_gdp_pc" in out.columns
     assert (out["baseline_gdp_pc"] == 100).all()
 
 
-def test_add_emission_groups_creates_group_labels():
-    df = make_small_df()
-    out = add_emission_groups(df, n_groups=3)
+def test_add_emission_groups_creates_group_labels(backend):
+    df = backend.from_pandas(make_small_df())
+    out = backend.to_pandas(backend.add_emission_groups(df, n_groups=3))
     assert "emission_group" in out.columns
     assert out["emission_group"].notna().all()
 
@@ -55,4 +59,100 @@ def test_summarise_country_metrics_outputs_one_row():
     summary = summarise_country_metrics(df)
     assert len(summary) == 1
     assert "avg_co2_per_capita" in summary.columns
-    assert "gdp_growth_volatility" in summary.columns
\ No newline at end of file
+    assert "gdp_growth_volatility" in summary.columns
+
+def test_add_lag_features_matches_groupby_shift():
+    df = pd.concat(
+        [make_small_df(), make_small_df().assign(iso_code="BBB", co2_per_capita=[6, 5, 4, 3, 2, 1])]
+    )
+    out = add_lag_features(df, columns=["co2_per_capita"], lags=[1, 2], leads=[1], log_diff_lags=[1])
+
+    grouped = out.groupby("iso_code")["co2_per_capita"]
+    pd.testing.assert_series_equal(out["co2_per_capita_lag2"], grouped.shift(2).astype(float), check_names=False)
+    pd.testing.assert_series_equal(out["co2_per_capita_lead1"], grouped.shift(-1).astype(float), check_names=False)
+    assert out["co2_per_capita_diff1"].iloc[1] == 1
+    assert out["co2_per_capita_logdiff1"].iloc[1] == pytest.approx(np.log(2))
+
+
+def test_add_lag_features_is_gap_aware():
+    df = make_small_df().drop(index=2)  # no row for 2002
+    out = add_lag_features(df, columns=["co2_per_capita"], lags=[1])
+    lag = out.set_index("year")["co2_per_capita_lag1"]
+    assert pd.isna(lag[2003])  # 2002 is missing, so no silent shift to 2001
+    assert lag[2004] == 4
+
+
+def test_add_ewm_features_matches_pandas_ewm():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "iso_code": ["AAA"] * 8 + ["BBB"] * 5,
+            "year": list(range(2000, 2008)) + list(range(2000, 2005)),
+            "co2_per_capita": rng.uniform(1, 10, 13),
+        }
+    )
+    df.loc[[0, 4], "co2_per_capita"] = np.nan
+    out = add_ewm_features(df, columns=["co2_per_capita"], halflives=[2, 3.5])
+
+    for h in [2, 3.5]:
+        ewm = out.groupby("iso_code")["co2_per_capita"].ewm(halflife=h)
+        expected_mean = ewm.mean().reset_index(level=0, drop=True)
+        expected_std = ewm.std().reset_index(level=0, drop=True)
+        np.testing.assert_allclose(out[f"co2_per_capita_ewm_mean_hl{h:g}"], expected_mean, rtol=1e-10)
+        np.testing.assert_allclose(out[f"co2_per_capita_ewm_vol_hl{h:g}"], expected_std, rtol=1e-8)
+
+
+def test_add_ewm_features_available_from_first_years():
+    df = add_gdp_growth(make_small_df())
+    out = add_ewm_features(df, halflives=[2])
+    assert out["co2_per_capita_ewm_mean_hl2"].iloc[0] == 1
+    assert out["gdp_pc_growth_ewm_vol_hl2"].notna().sum() == 4
+
+
+def make_group_panel():
+    rng = np.random.default_rng(3)
+    rows = [
+        (f"C{i:02d}", year, float(rng.integers(0, 8)))
+        for i in range(12)
+        for year in range(2000, 2006)
+    ]
+    return pd.DataFrame(rows, columns=["iso_code", "year", "co2_per_capita"])
+
+
+def test_yearly_emission_groups_match_per_year_qcut(backend):
+    df = backend.from_pandas(make_group_panel())
+    out = backend.to_pandas(backend.add_emission_groups(df, mode="yearly"))
+
+    for _, group in out.groupby("year"):
+        expected = pd.qcut(group["co2_per_capita"], q=3, labels=["low", "mid", "high"])
+        assert (group["emission_group"].astype(str) == expected.astype(str)).all()
+
+
+def test_emission_group_transitions_count_consecutive_years_only():
+    df = make_group_panel()
+    df = df[~((df["iso_code"] == "C00") & (df["year"] == 2003))]
+    out = add_emission_groups(df, mode="rolling", window=3)
+
+    counts = emission_group_transitions(out)
+    # 12 countries x 5 year pairs, minus the two pairs broken by C00's gap
+    assert counts.to_numpy().sum() == 12 * 5 - 2
+    assert list(counts.index) == ["low", "mid", "high"]
+
+    probs = emission_group_transitions(out, normalise=True)
+    assert np.allclose(probs.sum(axis=1), 1.0)
+
+
+def test_add_ewm_features_decays_over_gap_years():
+    df = pd.DataFrame(
+        {
+            "iso_code": ["AAA"] * 5,
+            "year": [2000, 2001, 2004, 2005, 2006],
+            "co2_per_capita": [1e9 + 1.0, 1e9 + 3.0, 1e9 + 2.0, 1e9 + 6.0, 1e9 + 4.0],
+        }
+    )
+    out = add_ewm_features(df, columns=["co2_per_capita"], halflives=[2])
+
+    full = df.set_index("year").reindex(range(2000, 2007))["co2_per_capita"]
+    ewm = full.ewm(halflife=2)
+    np.testing.assert_allclose(out["co2_per_capita_ewm_mean_hl2"], ewm.mean()[df["year"]], rtol=1e-12)
+    np.testing.assert_allclose(out["co2_per_capita_ewm_vol_hl2"], ewm.std()[df["year"]], rtol=1e-6)
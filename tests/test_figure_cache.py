@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pandas as pd
+
+from src import figure_cache
+from src.exploratory_analysis import plot_country_trajectories
+from src.figure_cache import figure_fingerprint, load_manifest, remove_stale_figures
+
+
+def make_panel(usa_gdp=100.0, chn_gdp=50.0):
+    return pd.DataFrame(
+        {
+            "country": ["United States"] * 2 + ["China"] * 2,
+            "iso_code": ["USA"] * 2 + ["CHN"] * 2,
+            "year": [2000, 2001] * 2,
+            "co2_per_capita": [20.0, 19.0, 2.0, 2.5],
+            "gdp_per_capita": [usa_gdp, usa_gdp + 1, chn_gdp, chn_gdp + 1],
+        }
+    )
+
+
+def test_figure_fingerprint_depends_on_data_and_labels():
+    df = pd.DataFrame({"a": [1.0, 2.0]})
+    assert figure_fingerprint(df, "title") == figure_fingerprint(df.copy(), "title")
+    assert figure_fingerprint(df, "title") != figure_fingerprint(df, "other title")
+    assert figure_fingerprint(df, "title") != figure_fingerprint(df * 2, "title")
+
+
+def test_unchanged_country_figure_is_not_rerendered(tmp_path: Path):
+    plot_country_trajectories(make_panel(), ["USA", "CHN"], tmp_path)
+    usa_mtime = (tmp_path / "USA_trajectory.png").stat().st_mtime_ns
+    chn_key = load_manifest(tmp_path)["CHN_trajectory.png"]["fingerprint"]
+
+    # Revise China only: USA is skipped, China is re-rendered
+    plot_country_trajectories(make_panel(chn_gdp=60.0), ["USA", "CHN"], tmp_path)
+    assert (tmp_path / "USA_trajectory.png").stat().st_mtime_ns == usa_mtime
+    assert load_manifest(tmp_path)["CHN_trajectory.png"]["fingerprint"] != chn_key
+
+
+def test_remove_stale_figures_only_deletes_unused_tracked_files(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(figure_cache, "_used", set())
+    (tmp_path / "untracked.png").write_bytes(b"x")
+    plot_country_trajectories(make_panel(), ["USA", "CHN"], tmp_path)
+
+    # Next "run" only plots USA
+    monkeypatch.setattr(figure_cache, "_used", set())
+    plot_country_trajectories(make_panel(), ["USA"], tmp_path)
+    stale = remove_stale_figures(tmp_path)
+
+    assert [p.name for p in stale] == ["CHN_trajectory.png"]
+    assert not (tmp_path / "CHN_trajectory.png").exists()
+    assert (tmp_path / "USA_trajectory.png").exists()
+    assert (tmp_path / "untracked.png").exists()
+    assert set(load_manifest(tmp_path)) == {"USA_trajectory.png"}
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.regression.linear_model import OLS
+
+from src.granger import granger_causality
+
+
+def make_panel(n_years=30, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for iso, strength in [("AAA", 0.8), ("BBB", 0.0)]:
+        x = rng.normal(size=n_years)
+        y = np.zeros(n_years)
+        for t in range(1, n_years):
+            y[t] = 0.3 * y[t - 1] + strength * x[t - 1] + rng.normal(scale=0.5)
+        rows += [(iso, 1990 + t, x[t], y[t]) for t in range(n_years)]
+    return pd.DataFrame(rows, columns=["iso_code", "year", "cause", "effect"])
+
+
+def reference_f(x, y, p):
+    # Restricted vs unrestricted OLS on rows p.. (statsmodels' ssr_ftest)
+    n = len(y)
+    target = y[p:]
+    own = np.column_stack([y[p - k:n - k] for k in range(1, p + 1)])
+    lags = np.column_stack([x[p - k:n - k] for k in range(1, p + 1)])
+    const = np.ones((n - p, 1))
+    unrestricted = OLS(target, np.hstack([const, own, lags])).fit()
+    restricted = OLS(target, np.hstack([const, own])).fit()
+    return ((restricted.ssr - unrestricted.ssr) / p) / (unrestricted.ssr / unrestricted.df_resid)
+
+
+def test_granger_matches_per_country_ols():
+    df = make_panel()
+    out = granger_causality(df, cause_col="cause", effect_col="effect", max_lag=3)
+
+    assert len(out) == 2 * 3
+    for iso, group in df.groupby("iso_code"):
+        for p in (1, 2, 3):
+            row = out[(out["iso_code"] == iso) & (out["lag"] == p)].iloc[0]
+            expected = reference_f(group["cause"].to_numpy(), group["effect"].to_numpy(), p)
+            assert row["f_stat"] == pytest.approx(expected, rel=1e-8)
+            assert row["n_obs"] == len(group) - p
+
+    strong = out[(out["iso_code"] == "AAA") & (out["lag"] == 1)]["p_value"].iloc[0]
+    assert strong < 1e-3
+
+
+def test_granger_skips_rows_across_year_gaps():
+    df = make_panel()
+    gappy = df[~((df["iso_code"] == "AAA") & (df["year"] == 2000))]
+    out = granger_causality(gappy, cause_col="cause", effect_col="effect", max_lag=1)
+
+    # Year 2000 is missing: it cannot be a target, nor a lag for 2001
+    assert out.loc[out["iso_code"] == "AAA", "n_obs"].iloc[0] == 30 - 1 - 2
+    assert out.loc[out["iso_code"] == "BBB", "n_obs"].iloc[0] == 30 - 1
+
+
+def test_reverse_direction_and_short_series():
+    df = make_panel()
+    short = pd.DataFrame({"iso_code": ["CCC"] * 3, "year": [2000, 2001, 2002],
+                          "cause": [1.0, 2.0, 3.0], "effect": [0.5, 0.1, 0.2]})
+    out = granger_causality(pd.concat([df, short]), cause_col="cause", effect_col="effect",
+                            max_lag=2, reverse=True)
+
+    assert set(out["cause"]) == {"cause", "effect"}
+    assert out.loc[out["iso_code"] == "CCC", "f_stat"].isna().all()
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import indicators
+from src.data_loading import load_co2_data
+from src.indicators import (
+    load_indicator_panel,
+    panel_from_frame,
+    panel_growth,
+    panel_rolling,
+    register_indicator,
+    summarise_indicators,
+)
+
+
+def make_long_df():
+    return pd.DataFrame(
+        {
+            "country": ["A"] * 4 + ["B"] * 3,
+            "iso_code": ["AAA"] * 4 + ["BBB"] * 3,
+            "year": [2000, 2001, 2002, 2003, 2000, 2001, 2003],  # BBB has no 2002
+            "x": [1.0, 2.0, 4.0, 8.0, 10.0, 11.0, 12.0],
+            "y": [5.0, 5.0, 5.0, 5.0, 1.0, 2.0, 3.0],
+        }
+    )
+
+
+def test_load_indicator_panel_matches_single_indicator_loader():
+    panel = load_indicator_panel(["co2_per_capita", "gdp_per_capita"])
+    assert panel.values.shape == (len(panel.iso_codes), len(panel.years), 2)
+
+    co2 = load_co2_data("data/raw/owid_co2.csv").dropna(subset=["co2_per_capita"])
+    long = panel.to_frame().dropna(subset=["co2_per_capita"])
+    assert len(long) == len(co2)
+    assert long["co2_per_capita"].sum() == pytest.approx(co2["co2_per_capita"].sum())
+
+
+def test_load_indicator_panel_reads_several_columns_from_one_file(tmp_path, monkeypatch):
+    # Keep test registrations out of the shared registry
+    monkeypatch.setattr(indicators, "INDICATORS", dict(indicators.INDICATORS))
+    pd.DataFrame(
+        {
+            "Entity": ["A", "A", "World"],
+            "Code": ["AAA", "AAA", None],
+            "Year": [2000, 2001, 2000],
+            "Methane": [1.0, 2.0, 9.0],
+            "Energy": [3.0, "n/a", 9.0],
+        }
+    ).to_csv(tmp_path / "extra.csv", index=False)
+    register_indicator("methane", "extra.csv", "Methane")
+    register_indicator("energy", "extra.csv", "Energy")
+
+    panel = load_indicator_panel(["methane", "energy"], data_dir=tmp_path)
+    assert list(panel.iso_codes) == ["AAA"]
+    np.testing.assert_array_equal(panel.values[0, :, 0], [1.0, 2.0])
+    assert np.isnan(panel.values[0, 1, 1])
+
+
+def test_panel_growth_and_rolling_are_gap_aware():
+    panel = panel_from_frame(make_long_df(), ["x", "y"])
+    growth = panel_growth(panel)
+    assert growth.indicators == ["x_growth", "y_growth"]
+    np.testing.assert_allclose(growth.values[0, 1:, 0], [1.0, 1.0, 1.0])
+    assert np.isnan(growth.values[1, 3, 0])  # 2003 vs missing 2002
+
+    rolling = panel_rolling(panel, window=2)
+    assert rolling.indicators == ["x_rolling_mean_2y", "y_rolling_mean_2y", "x_rolling_std_2y", "y_rolling_std_2y"]
+    assert rolling.values[0, 3, 0] == pytest.approx(6.0)
+    assert np.isnan(rolling.values[1, 2, 0])
+
+
+def test_panel_from_frame_rejects_duplicate_country_years():
+    df = make_long_df()
+    df = pd.concat([df, df.iloc[[1]].assign(x=99.0)], ignore_index=True)
+    with pytest.raises(ValueError, match="Duplicate"):
+        panel_from_frame(df, ["x", "y"])
+
+
+def test_summarise_indicators_matches_groupby():
+    df = make_long_df()
+    summary = summarise_indicators(panel_from_frame(df, ["x", "y"]))
+    expected = df.groupby("iso_code")["x"].agg(["mean", "std", "count"])
+    np.testing.assert_allclose(summary["avg_x"], expected["mean"])
+    np.testing.assert_allclose(summary["std_x"], expected["std"])
+    assert summary["n_years_x"].tolist() == [4, 3]
@@ -0,0 +1,196 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_cleaning import (
+    coerce_types,
+    drop_missing_core,
+    filter_time_range,
+    merge_datasets,
+    retain_countries_with_min_years,
+)
+from src.data_loading import load_co2_data, load_gdp_data
+from src.data_quality import profile_panel
+from src.feature_engineering import (
+    add_baseline_gdp,
+    add_emission_groups,
+    add_gdp_growth,
+    add_rolling_features,
+)
+from src.out_of_core import (
+    build_features_out_of_core,
+    exceeds_budget,
+    projected_memory,
+    read_spill,
+    write_spill,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def write_raw_panel(directory: Path, n_countries: int = 60, first_year: int = 1900, seed: int = 0):
+    """
+    OWID-shaped raw CO2 and GDP exports: most years outside the analysis
+    window, aggregate rows without a code, missing values, a short-lived
+    country and GDP rows missing at random.
+    """
+    rng = np.random.default_rng(seed)
+    years = np.arange(first_year, 2024)
+    iso = ["USA", "CHN"] + [f"C{i:03d}" for i in range(n_countries - 2)]
+    codes = np.repeat(np.array(iso, dtype=object), len(years))
+    codes[::37] = None
+    names = np.repeat([f"Country {c}" for c in iso], len(years))
+    year_col = np.tile(years, n_countries)
+
+    co2 = rng.lognormal(0.0, 1.0, len(year_col))
+    co2[rng.random(len(co2)) < 0.02] = np.nan
+    gdp = 1000 * np.exp(np.cumsum(rng.normal(0.02, 0.05, (n_countries, len(years))), axis=1)).ravel()
+
+    co2_df = pd.DataFrame(
+        {"Entity": names, "Code": codes, "Year": year_col, "Annual CO₂ emissions (per capita)": co2}
+    )
+    short = pd.DataFrame(
+        {"Entity": "Shortland", "Code": "SHT", "Year": [2019, 2020, 2021], "Annual CO₂ emissions (per capita)": 1.0}
+    )
+    gdp_df = pd.DataFrame(
+        {"Entity": names, "Code": codes, "Year": year_col, "GDP per capita": gdp, "900793-annotations": ""}
+    )[rng.random(len(year_col)) > 0.01]
+
+    directory.mkdir(parents=True, exist_ok=True)
+    pd.concat([co2_df, short]).to_csv(directory / "co2.csv", index=False)
+    gdp_df.to_csv(directory / "gdp.csv", index=False)
+    return directory / "co2.csv", directory / "gdp.csv"
+
+
+def in_memory_features(co2_path, gdp_path, start_year=2000, end_year=2023, min_years=20):
+    co2 = filter_time_range(coerce_types(load_co2_data(co2_path)), start_year, end_year)
+    gdp = filter_time_range(coerce_types(load_gdp_data(gdp_path)), start_year, end_year)
+    merged = merge_datasets(co2, gdp)
+    df = retain_countries_with_min_years(drop_missing_core(merged, ["co2_per_capita", "gdp_per_capita"]), min_years)
+    df = add_emission_groups(add_baseline_gdp(add_rolling_features(add_gdp_growth(df))))
+    return df, merged
+
+
+def test_spill_round_trip_keeps_values_and_dtypes(tmp_path):
+    df = pd.DataFrame(
+        {
+            "country": pd.Series(["A", None, "B"], dtype="str"),
+            "iso_code": pd.Series(["AAA", "BBB", pd.NA], dtype="string"),
+            "year": np.array([2000, 2001, 2002], dtype=np.int64),
+            "value": [1.5, np.nan, -2.0],
+            "group": pd.Categorical(["low", "high", "low"], categories=["low", "mid", "high"], ordered=True),
+        }
+    )
+    write_spill(df, tmp_path / "part.npz")
+    pd.testing.assert_frame_equal(read_spill(tmp_path / "part.npz"), df)
+
+
+def test_out_of_core_matches_in_memory_features(tmp_path):
+    co2_path, gdp_path = write_raw_panel(tmp_path)
+    expected, merged = in_memory_features(co2_path, gdp_path)
+
+    result = build_features_out_of_core(
+        co2_path, gdp_path, budget_bytes=1, start_year=2000, end_year=2023, min_years=20,
+        n_partitions=5, chunk_rows=700, spill_dir=tmp_path, keep_merged=True,
+    )
+
+    pd.testing.assert_frame_equal(result.panel, expected)
+    pd.testing.assert_frame_equal(
+        result.merged, merged.sort_values("iso_code", kind="stable", ignore_index=True)
+    )
+    assert dict(result.step_rows)["retain_countries_with_min_years"] == len(expected)
+    assert dict(result.step_rows)["merge_datasets"] == len(merged)
+    assert result.quality.to_dict() == profile_panel(merged, step_rows=result.step_rows).to_dict()
+    # Spill files are removed afterwards
+    assert not list(tmp_path.glob("spill-*"))
+
+
+def test_budget_projection_and_default_partitions(tmp_path):
+    co2_path, gdp_path = write_raw_panel(tmp_path)
+    projected = projected_memory([co2_path, gdp_path])
+    assert projected > os.path.getsize(co2_path) + os.path.getsize(gdp_path)
+    assert exceeds_budget([co2_path, gdp_path], projected // 2)
+    assert not exceeds_budget([co2_path, gdp_path], projected)
+
+    result = build_features_out_of_core(
+        co2_path, gdp_path, budget_bytes=projected // 4, start_year=2000, end_year=2023, min_years=20
+    )
+    assert result.n_partitions == 4
+    assert result.merged is None
+
+    with pytest.raises(ValueError):
+        build_features_out_of_core(co2_path, gdp_path, 0, 2000, 2023, 20)
+
+
+# Runs main.py on the synthetic inputs in a fresh working directory. With a
+# limit, the address space is capped that many MB above what is mapped after
+# imports.
+_RUN_PIPELINE = """
+import os, resource, sys
+import main
+
+workdir, budget_mb, limit_mb = sys.argv[1], sys.argv[2], int(sys.argv[3])
+os.chdir(workdir)
+for d in ("data/processed", "outputs/tables", "outputs/figures"):
+    os.makedirs(d, exist_ok=True)
+main.CO2_PATH, main.GDP_PATH = "raw/co2.csv", "raw/gdp.csv"
+main.MEMORY_BUDGET_MB = None if budget_mb == "none" else float(budget_mb)
+
+if limit_mb:
+    with open("/proc/self/status") as fh:
+        vm_size = next(int(l.split()[1]) * 1024 for l in fh if l.startswith("VmSize"))
+    resource.setrlimit(resource.RLIMIT_AS, (vm_size + limit_mb * 2**20, resource.RLIM_INFINITY))
+main.main()
+"""
+
+
+def _run_pipeline(workdir: Path, budget_mb: str, limit_mb: int) -> subprocess.CompletedProcess:
+    env = dict(os.environ, MALLOC_ARENA_MAX="2", OPENBLAS_NUM_THREADS="1", MPLBACKEND="Agg")
+    return subprocess.run(
+        [sys.executable, "-c", _RUN_PIPELINE, str(workdir), budget_mb, str(limit_mb)],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=600,
+    )
+
+
+@pytest.mark.skipif(not Path("/proc/self/status").exists(), reason="needs /proc and RLIMIT_AS")
+def test_pipeline_under_memory_limit_matches_in_memory_run(tmp_path):
+    # ~28 MB per CSV, almost all of it years before the analysis window. The
+    # in-memory load parses every row and needs ~110 MB over the post-import
+    # baseline; the out-of-core run peaks at ~70 MB (modelling and plots),
+    # so an 80 MB cap separates the two.
+    raw = write_raw_panel(tmp_path / "reference" / "raw", n_countries=400, first_year=200)
+    for name in ("memory", "budgeted"):
+        (tmp_path / name / "raw").mkdir(parents=True)
+        for path in raw:
+            (tmp_path / name / "raw" / path.name).write_bytes(path.read_bytes())
+
+    reference = _run_pipeline(tmp_path / "reference", "none", 0)
+    assert reference.returncode == 0, reference.stderr[-2000:]
+
+    in_memory = _run_pipeline(tmp_path / "memory", "none", 80)
+    assert in_memory.returncode != 0
+    assert "MemoryError" in in_memory.stderr
+
+    budgeted = _run_pipeline(tmp_path / "budgeted", "16", 80)
+    assert budgeted.returncode == 0, budgeted.stderr[-2000:]
+
+    quality = json.loads((tmp_path / "budgeted" / "outputs/tables/data_quality.json").read_text())
+    assert quality == json.loads((tmp_path / "reference" / "outputs/tables/data_quality.json").read_text())
+    for name in [
+        "data/processed/panel.csv",
+        "data/processed/country_level_model_dataset.csv",
+        "outputs/tables/correlations.csv",
+        "outputs/tables/regression_volatility_summary.csv",
+        "outputs/tables/regression_growth_summary.csv",
+        "outputs/tables/robust_regressions.csv",
+        "outputs/tables/granger_causality.csv",
+    ]:
+        pd.testing.assert_frame_equal(
+            pd.read_csv(tmp_path / "budgeted" / name), pd.read_csv(tmp_path / "reference" / name), obj=name
+        )
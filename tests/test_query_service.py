@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+from urllib.request import urlopen
+
+import pandas as pd
+
+from src.query_service import QueryService, make_server
+
+
+def write_outputs(tmp_path, scale=1.0):
+    panel = pd.DataFrame(
+        {
+            "country": ["A"] * 4 + ["B"] * 4,
+            "iso_code": ["AAA"] * 4 + ["BBB"] * 4,
+            "year": [2003, 2000, 2001, 2002] * 2,
+            "co2_per_capita": [4.0, 1.0, 2.0, 3.0, 14.0, 11.0, 12.0, 13.0],
+            "gdp_per_capita": [100.0 * scale] * 8,
+            "emission_group": ["low"] * 4 + ["high"] * 4,
+        }
+    )
+    countries = pd.DataFrame(
+        {
+            "iso_code": ["AAA", "BBB"],
+            "country": ["A", "B"],
+            "avg_co2_per_capita": [2.5, 12.5],
+            "avg_gdp_per_capita": [100.0 * scale] * 2,
+        }
+    )
+    panel_path, countries_path = tmp_path / "panel.csv", tmp_path / "countries.csv"
+    panel.to_csv(panel_path, index=False)
+    countries.to_csv(countries_path, index=False)
+    return panel_path, countries_path
+
+
+def body(response):
+    status, payload = response
+    return status, json.loads(payload)
+
+
+def test_panel_query_filters_country_years_and_metrics(tmp_path):
+    service = QueryService(*write_outputs(tmp_path))
+
+    status, out = body(service.handle("/panel", {
+        "iso_code": ["AAA,BBB"], "start_year": ["2001"], "end_year": ["2002"], "metric": ["co2_per_capita"],
+    }))
+    assert status == 200
+    assert out["data"] == [
+        {"iso_code": "AAA", "year": 2001, "co2_per_capita": 2.0},
+        {"iso_code": "AAA", "year": 2002, "co2_per_capita": 3.0},
+        {"iso_code": "BBB", "year": 2001, "co2_per_capita": 12.0},
+        {"iso_code": "BBB", "year": 2002, "co2_per_capita": 13.0},
+    ]
+
+    status, out = body(service.handle("/countries", {"emission_group": ["high"]}))
+    assert [r["iso_code"] for r in out["data"]] == ["BBB"]
+
+    status, out = body(service.handle("/panel", {"metric": ["unknown"]}))
+    assert status == 400
+
+
+def test_repeated_queries_are_served_from_cache(tmp_path):
+    service = QueryService(*write_outputs(tmp_path))
+    params = {"iso_code": ["AAA"], "metric": ["co2_per_capita"]}
+
+    first = service.handle("/panel", params)
+    second = service.handle("/panel", params)
+
+    assert first == second
+    assert service.cache_info().hits == 1
+
+
+def test_reloads_when_outputs_are_republished(tmp_path):
+    paths = write_outputs(tmp_path)
+    service = QueryService(*paths, check_interval=0, settle_seconds=0)
+    _, before = body(service.handle("/countries", {"iso_code": ["AAA"]}))
+
+    write_outputs(tmp_path, scale=2.0)
+    # Same size as before: make sure the mtime differs even on coarse clocks
+    stat = paths[1].stat()
+    os.utime(paths[1], ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+    _, after = body(service.handle("/countries", {"iso_code": ["AAA"]}))
+
+    assert after["version"] == before["version"] + 1
+    assert after["data"][0]["avg_gdp_per_capita"] == 200.0
+
+
+def test_http_endpoint_serves_json(tmp_path):
+    server = make_server(QueryService(*write_outputs(tmp_path)), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with urlopen(f"http://127.0.0.1:{server.server_port}/health") as resp:
+            health = json.load(resp)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert health["status"] == "ok"
+    assert health["n_countries"] == 2
+
+
+def test_health_reports_failed_reloads(tmp_path):
+    paths = write_outputs(tmp_path)
+    service = QueryService(*paths, check_interval=0, settle_seconds=0)
+    _, before = body(service.handle("/health", {}))
+
+    # A republished panel without iso_code cannot be indexed
+    pd.DataFrame({"year": [2000], "co2_per_capita": [1.0]}).to_csv(paths[0], index=False)
+    stat = paths[0].stat()
+    os.utime(paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+    status, after = body(service.handle("/health", {}))
+
+    assert status == 200
+    assert before["reload_errors"] == 0
+    assert after["reload_errors"] == 1
+    assert after["version"] == before["version"]
+    # The previous index keeps serving queries
+    _, out = body(service.handle("/countries", {"iso_code": ["AAA"]}))
+    assert out["version"] == before["version"]
@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from src.results_store import ResultsStore, main
+
+
+def make_summary(coef):
+    return pd.DataFrame(
+        {
+            "variable": ["const", "avg_co2_per_capita"],
+            "coefficient": [0.1, coef],
+            "std_error": [0.01, 0.002],
+            "p_value": [0.001, 0.2],
+            "r_squared": [0.3, 0.3],
+        }
+    )
+
+
+def test_results_store_compares_runs(tmp_path):
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("a,b\n1,2\n")
+
+    with ResultsStore(tmp_path / "results.sqlite") as store:
+        for coef in [0.004, 0.006]:
+            run_id = store.start_run({"start_year": 2000}, input_paths=[input_file])
+            store.save_regression(run_id, "volatility", make_summary(coef))
+            store.record_timings(run_id, {"total": 1.5})
+
+        runs = store.list_runs()
+        out = store.compare_coefficients("avg_co2_per_capita", model="volatility")
+
+    assert len(runs) == 2
+    assert runs["input_hashes"].nunique() == 1
+    assert out["coefficient"].tolist() == [0.004, 0.006]
+
+
+def test_results_store_saves_correlations_and_country_metrics(tmp_path):
+    corr = pd.DataFrame(
+        {"x": ["a"], "y": ["b"], "pearson_r": [0.5], "pearson_p": [0.01], "spearman_r": [0.4], "spearman_p": [float("nan")]}
+    )
+    country_df = pd.DataFrame(
+        {"iso_code": ["AAA", "BBB"], "country": ["A", "B"], "avg_co2_per_capita": [1.0, 2.0], "n_years": [20, 21]}
+    )
+    with ResultsStore(tmp_path / "results.sqlite") as store:
+        run_id = store.start_run({})
+        store.save_correlations(run_id, corr)
+        store.save_country_dataset(run_id, country_df)
+
+        corr_out = store.compare_correlations("a", "b")
+        history = store.country_history("BBB")
+
+    assert corr_out["pearson_r"].tolist() == [0.5]
+    assert corr_out["spearman_p"].isna().all()
+    assert dict(zip(history["metric"], history["value"])) == {"avg_co2_per_capita": 2.0, "n_years": 21}
+
+
+def test_results_store_transaction_rolls_back_partial_run(tmp_path):
+    db = tmp_path / "results.sqlite"
+    with pytest.raises(RuntimeError):
+        with ResultsStore(db) as store, store.transaction():
+            run_id = store.start_run({"window": 5})
+            store.save_regression(run_id, "volatility", make_summary(0.004))
+            raise RuntimeError("pipeline failed before the run was complete")
+
+    with ResultsStore(db) as store:
+        with store.transaction():
+            run_id = store.start_run({"window": 5})
+            store.save_regression(run_id, "volatility", make_summary(0.006))
+        runs = store.list_runs()
+        coefficients = store.compare_coefficients("avg_co2_per_capita")
+
+    assert len(runs) == 1
+    assert coefficients["coefficient"].tolist() == [0.006]
+
+
+def test_results_store_cli_lists_runs(tmp_path, capsys):
+    db = tmp_path / "results.sqlite"
+    with ResultsStore(db) as store:
+        store.start_run({"window": 5}, label="baseline")
+
+    main(["--db", str(db), "runs"])
+    assert "baseline" in capsys.readouterr().out
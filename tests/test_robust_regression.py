@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+from src.modelling import run_regression, summarise_model
+from src.robust_regression import fit_regressions
+
+
+def make_country_df(n=80, seed=0):
+    rng = np.random.default_rng(seed)
+    x1 = rng.uniform(0, 10, n)
+    x2 = rng.normal(5, 2, n)
+    # Heavy-tailed, heteroskedastic noise
+    noise = rng.standard_t(3, n) * (0.5 + 0.1 * x1)
+    df = pd.DataFrame(
+        {
+            "x1": x1,
+            "x2": x2,
+            "y1": 1 + 0.5 * x1 - 0.2 * x2 + noise,
+            "y2": 2 - 0.3 * x1 + rng.normal(0, 1, n),
+            "region": rng.integers(0, 8, n),
+        }
+    )
+    df.loc[:4, "y2"] = np.nan
+    return df
+
+
+def pick(summary, model, estimator, cov_type, quantile=None):
+    rows = summary[(summary["model"] == model) & (summary["estimator"] == estimator)
+                   & (summary["cov_type"] == cov_type)]
+    if quantile is not None:
+        rows = rows[np.isclose(rows["quantile"], quantile)]
+    return rows.set_index("variable")
+
+
+def test_sandwich_covariances_match_statsmodels():
+    df = make_country_df()
+    summary = fit_regressions(df, ["y1", "y2"], ["x1", "x2"], huber=False, quantiles=(), cluster_col="region")
+
+    for y in ["y1", "y2"]:
+        data = df.dropna(subset=[y])
+        X = sm.add_constant(data[["x1", "x2"]])
+        for cov_type in ["nonrobust", "HC0", "HC1", "HC2", "HC3"]:
+            ref = sm.OLS(data[y], X).fit(cov_type=cov_type)
+            ours = pick(summary, y, "ols", cov_type).loc[ref.params.index]
+            assert np.allclose(ours["coefficient"], ref.params)
+            assert np.allclose(ours["std_error"], ref.bse)
+            assert np.allclose(ours["p_value"], ref.pvalues)
+
+        ref = sm.OLS(data[y], X).fit(cov_type="cluster", cov_kwds={"groups": data["region"]})
+        ours = pick(summary, y, "ols", "cluster").loc[ref.params.index]
+        assert np.allclose(ours["std_error"], ref.bse)
+
+
+def test_huber_and_quantile_fits_match_statsmodels():
+    df = make_country_df()
+    summary = fit_regressions(df, ["y1", "y2"], ["x1", "x2"], cov_types=(), quantiles=(0.25, 0.5, 0.9))
+
+    X = sm.add_constant(df[["x1", "x2"]])
+    ref = sm.RLM(df["y1"], X, M=sm.robust.norms.HuberT()).fit()
+    ours = pick(summary, "y1", "huber", "H1").loc[ref.params.index]
+    assert np.allclose(ours["coefficient"], ref.params, rtol=1e-6)
+    assert np.allclose(ours["std_error"], ref.bse, rtol=1e-6)
+
+    for q in (0.25, 0.5, 0.9):
+        ref = sm.QuantReg(df["y1"], X).fit(q=q)
+        ours = pick(summary, "y1", "quantile", "robust", q).loc[ref.params.index]
+        assert np.allclose(ours["coefficient"], ref.params, rtol=1e-4, atol=1e-6)
+        assert np.allclose(ours["std_error"], ref.bse, rtol=1e-3)
+        assert np.isclose(ours["r_squared"].iloc[0], ref.prsquared, atol=1e-6)
+
+    # Rows with missing y2 are dropped for y2 only
+    assert pick(summary, "y2", "huber", "H1")["n_obs"].iloc[0] == len(df) - 5
+
+
+def test_run_regression_robust_variants_fit_summarise_model():
+    df = make_country_df()
+
+    for kwargs in [{"cov_type": "HC3"}, {"estimator": "huber"}, {"estimator": "quantile", "quantile": 0.75}]:
+        summary = summarise_model(run_regression(df, y_col="y1", x_cols=["x1", "x2"], **kwargs))
+        assert list(summary.columns) == ["variable", "coefficient", "std_error", "p_value", "r_squared"]
+        assert list(summary["variable"]) == ["const", "x1", "x2"]
+
+    ols = run_regression(df, y_col="y1", x_cols=["x1", "x2"])
+    hc3 = run_regression(df, y_col="y1", x_cols=["x1", "x2"], cov_type="HC3")
+    assert np.allclose(ols.params, hc3.params)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from src.feature_engineering import add_baseline_gdp, add_gdp_growth
+from src.modelling import compute_country_level_dataset, run_regression
+from src.sensitivity import run_sensitivity
+
+
+def make_merged_panel(n_countries=12, years=range(2000, 2010), seed=1):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n_countries):
+        level = rng.uniform(1_000, 40_000)
+        co2 = rng.uniform(0.5, 15)
+        for year in years:
+            level *= 1 + rng.normal(0.02, 0.03)
+            rows.append((f"C{i:02d}", f"Country {i}", year, co2 + rng.normal(0, 0.2), level))
+    return pd.DataFrame(rows, columns=["iso_code", "country", "year", "co2_per_capita", "gdp_per_capita"])
+
+
+def test_unperturbed_draws_reproduce_pipeline_regression():
+    df = make_merged_panel()
+    result = run_sensitivity(
+        df, n_draws=2, impute=False, gdp_noise=0, subsample=1, min_years=5, n_workers=1
+    )
+
+    panel = add_baseline_gdp(add_gdp_growth(df))
+    model = run_regression(
+        compute_country_level_dataset(panel),
+        y_col="gdp_growth_volatility",
+        x_cols=["avg_co2_per_capita", "baseline_gdp_pc"],
+    )
+
+    coefs = result.draws[
+        (result.draws["statistic"] == "coefficient") & (result.draws["target"] == "gdp_growth_volatility")
+    ]
+    for variable, expected in model.params.items():
+        values = coefs.loc[coefs["variable"] == variable, "value"]
+        assert np.allclose(values, expected)
+
+
+def test_imputation_restores_countries_dropped_for_missing_values():
+    df = make_merged_panel()
+    # Knock out four interior GDP values: C00 falls below min_years=8 by deletion
+    df.loc[(df["iso_code"] == "C00") & df["year"].between(2003, 2006), "gdp_per_capita"] = np.nan
+
+    kwargs = dict(n_draws=20, gdp_noise=0, subsample=1, min_years=8, n_workers=1)
+    deleted = run_sensitivity(df, impute=False, **kwargs)
+    imputed = run_sensitivity(df, impute=True, **kwargs)
+
+    assert (deleted.draws["n_countries"] == 11).all()
+    assert (imputed.draws["n_countries"] == 12).all()
+    # Imputed values differ between draws
+    slope = imputed.draws[
+        (imputed.draws["statistic"] == "coefficient") & (imputed.draws["variable"] == "avg_co2_per_capita")
+    ]
+    assert slope.groupby("target")["value"].std().gt(0).all()
+
+
+def test_results_do_not_depend_on_worker_count():
+    df = make_merged_panel()
+    kwargs = dict(n_draws=40, subsample=0.75, min_years=5, seed=7, block_size=10)
+
+    serial = run_sensitivity(df, n_workers=1, **kwargs)
+    parallel = run_sensitivity(df, n_workers=2, **kwargs)
+
+    pd.testing.assert_frame_equal(serial.draws, parallel.draws)
+    assert (serial.draws["n_countries"] == 9).all()
+    assert set(serial.summary["statistic"]) == {"coefficient", "p_value", "pearson_r", "spearman_r"}
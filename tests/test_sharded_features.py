@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from src.feature_engineering import (
+    add_gdp_growth,
+    add_rolling_features,
+    add_baseline_gdp,
+    add_emission_groups,
+)
+from src.sharded_features import balance_shards, country_segments, run_sharded_features
+
+
+def make_panel(n_countries=7, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n_countries):
+        years = np.arange(2000, 2000 + 6 + 3 * i)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "country": f"C{i}",
+                    "iso_code": f"C{i:02d}",
+                    "year": years,
+                    "co2_per_capita": rng.uniform(0.1, 10, len(years)),
+                    "gdp_per_capita": rng.uniform(500, 50000, len(years)),
+                }
+            )
+        )
+    # Shuffle so the function has to sort
+    return pd.concat(frames).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def sequential_features(df):
+    out = add_gdp_growth(df)
+    out = add_rolling_features(out, window=5)
+    out = add_baseline_gdp(out, baseline_year=2003)
+    return add_emission_groups(out, n_groups=3)
+
+
+def test_balance_shards_covers_all_segments_evenly():
+    iso = np.array(["A"] * 10 + ["B"] * 4 + ["C"] * 6 + ["D"] * 5)
+    segments = country_segments(iso)
+    assert segments.tolist() == [[0, 10], [10, 14], [14, 20], [20, 25]]
+
+    shards = balance_shards(segments, 2)
+    assert sorted(i for s in shards for i in s) == [0, 1, 2, 3]
+    loads = [sum(segments[i, 1] - segments[i, 0] for i in s) for s in shards]
+    assert sum(loads) == 25
+    # Greedy longest-first keeps shards within one segment of each other
+    assert max(loads) - min(loads) <= 4
+
+
+def test_run_sharded_features_matches_sequential_pipeline():
+    df = make_panel()
+    df.loc[3, "co2_per_capita"] = np.nan
+
+    expected = sequential_features(df)
+    out = run_sharded_features(df, n_workers=3, window=5, baseline_year=2003)
+
+    assert list(out.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(out, expected, check_dtype=False)
+
+
+def test_run_sharded_features_is_deterministic_across_worker_counts():
+    df = make_panel(n_countries=5, seed=1)
+    one = run_sharded_features(df, n_workers=1)
+    many = run_sharded_features(df, n_workers=4)
+    pd.testing.assert_frame_equal(one, many)
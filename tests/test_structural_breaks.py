@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.structural_breaks import detect_structural_breaks
+
+
+def make_break_panel():
+    rng = np.random.default_rng(0)
+    years = np.arange(2000, 2024)
+    shifted = np.where(years >= 2012, 0.08, 0.01) + rng.normal(scale=0.01, size=len(years))
+    flat = rng.normal(scale=0.01, size=len(years))
+    return pd.DataFrame(
+        {
+            "iso_code": ["AAA"] * len(years) + ["BBB"] * len(years),
+            "year": np.concatenate([years, years]),
+            "gdp_pc_growth": np.concatenate([shifted, flat]),
+        }
+    )
+
+
+def brute_force_sup_f(y, t, q, min_size):
+    """Refit OLS for every candidate (the slow reference)."""
+    def ssr(yy, tt):
+        X = np.ones((len(yy), 1)) if q == 1 else np.column_stack([np.ones(len(yy)), tt])
+        resid = yy - X @ np.linalg.lstsq(X, yy, rcond=None)[0]
+        return resid @ resid
+
+    n = len(y)
+    full = ssr(y, t)
+    best = max(
+        (((full - (ssr(y[:k], t[:k]) + ssr(y[k:], t[k:]))) / q) / ((ssr(y[:k], t[:k]) + ssr(y[k:], t[k:])) / (n - 2 * q)), k)
+        for k in range(min_size, n - min_size + 1)
+    )
+    return best
+
+
+def test_detect_structural_breaks_finds_level_shift():
+    out = detect_structural_breaks(make_break_panel()).set_index("iso_code")
+    assert out.loc["AAA", "break_year"] == 2012
+    assert out.loc["AAA", "p_value"] < 0.001
+    assert out.loc["BBB", "p_value"] > out.loc["AAA", "p_value"]
+
+
+@pytest.mark.parametrize("model,q", [("mean", 1), ("trend", 2)])
+def test_detect_structural_breaks_matches_refit_per_candidate(model, q):
+    df = make_break_panel()
+    df.loc[5, "gdp_pc_growth"] = np.nan
+    out = detect_structural_breaks(df, model=model).set_index("iso_code")
+
+    for iso, sub in df.dropna().groupby("iso_code"):
+        y = sub["gdp_pc_growth"].to_numpy()
+        t = sub["year"].to_numpy(dtype=float)
+        min_size = max(3, int(np.ceil(0.15 * len(y))), q + 1)
+        f, k = brute_force_sup_f(y, t, q, min_size)
+        assert out.loc[iso, "f_stat"] == pytest.approx(f, rel=1e-6)
+        assert out.loc[iso, "break_year"] == sub["year"].iloc[k]
+
+
+def test_detect_structural_breaks_short_series_has_no_break():
+    df = pd.DataFrame({"iso_code": ["AAA"] * 4, "year": [2000, 2001, 2002, 2003], "gdp_pc_growth": [0.1, 0.2, 0.1, 0.3]})
+    out = detect_structural_breaks(df)
+    assert out["n_candidates"].iloc[0] == 0
+    assert pd.isna(out["break_year"].iloc[0])